@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Deque, Iterator, Optional
+
+from .config import settings
+
+
+class Overloaded(RuntimeError):
+    """
+    Raised when a request cannot be admitted: the wait queue is full or the wait timed out.
+    """
+
+    def __init__(self, reason: str, retry_after: int) -> None:
+        super().__init__(f"overloaded ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Saturated(RuntimeError):
+    """
+    Raised when a dependency slot (LLM, providers) is not free within the call's timeout.
+    """
+
+
+class AdmissionController:
+    """
+    Concurrency limit with a bounded FIFO wait queue in front of the recipe pipeline.
+    Lives on the server's event loop; a finished request hands its slot straight to the
+    oldest waiter, so queued requests are admitted in arrival order.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout_seconds: float) -> None:
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.degraded = 0
+        self.max_queue_depth = 0
+
+    def _retry_after(self) -> int:
+        return max(1, settings.admission_retry_after_seconds)
+
+    def _release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    @asynccontextmanager
+    async def admit(self, max_wait: Optional[float] = None) -> AsyncIterator[None]:
+        """
+        Hold a pipeline slot for the duration of the block. Waits at most
+        min(`ADMISSION_QUEUE_TIMEOUT_SECONDS`, `max_wait`) in the queue, then raises `Overloaded`.
+        """
+        if self._active < self.max_concurrent and not self._waiters:
+            self._active += 1
+        else:
+            if len(self._waiters) >= self.max_queue:
+                self.rejected += 1
+                raise Overloaded("queue full", self._retry_after())
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            self.queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+            timeout = self.queue_timeout_seconds if max_wait is None else min(self.queue_timeout_seconds, max_wait)
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter), timeout)
+            except BaseException as exc:
+                if waiter.done() and not waiter.cancelled():
+                    # The slot was handed over just as we gave up; pass it on.
+                    self._release()
+                else:
+                    # Leave the queue now, so a dead waiter does not hold a queue place until the next release.
+                    waiter.cancel()
+                    self._waiters.remove(waiter)
+                if isinstance(exc, asyncio.TimeoutError):
+                    self.timed_out += 1
+                    raise Overloaded("queue timeout", self._retry_after()) from None
+                raise
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self._release()
+
+    def note_degraded(self) -> None:
+        self.degraded += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "in_flight": self._active,
+            "queue_depth": len(self._waiters),
+            "max_queue_depth": self.max_queue_depth,
+            "limit": self.max_concurrent,
+            "queue_limit": self.max_queue,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed": self.rejected + self.timed_out,
+            "rejected_queue_full": self.rejected,
+            "rejected_queue_timeout": self.timed_out,
+            "degraded": self.degraded,
+        }
+
+
+class DependencyLimiter:
+    """
+    Concurrency cap for one downstream dependency, shared by sync callers (threads) and
+    async callers (per event loop). Waiting for a slot counts against the call's timeout.
+    """
+
+    def __init__(self, name: str, limit: int) -> None:
+        self.name = name
+        self.limit = max(1, limit)
+        self._sync = threading.BoundedSemaphore(self.limit)
+        self._async: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.waiting = 0
+        self.saturated = 0
+
+    def _count(self, in_use: int = 0, waiting: int = 0) -> None:
+        with self._lock:
+            self.in_use += in_use
+            self.waiting += waiting
+
+    @contextmanager
+    def slot(self, timeout: Optional[float] = None) -> Iterator[None]:
+        self._count(waiting=1)
+        try:
+            acquired = self._sync.acquire(timeout=timeout)
+        finally:
+            self._count(waiting=-1)
+        if not acquired:
+            self.saturated += 1
+            raise Saturated(f"{self.name} concurrency limit reached")
+        self._count(in_use=1)
+        try:
+            yield
+        finally:
+            self._count(in_use=-1)
+            self._sync.release()
+
+    @asynccontextmanager
+    async def aslot(self, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        loop = asyncio.get_running_loop()
+        semaphore = self._async.get(loop)
+        if semaphore is None:
+            semaphore = self._async.setdefault(loop, asyncio.Semaphore(self.limit))
+        self._count(waiting=1)
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self.saturated += 1
+            raise Saturated(f"{self.name} concurrency limit reached") from None
+        finally:
+            self._count(waiting=-1)
+        self._count(in_use=1)
+        try:
+            yield
+        finally:
+            self._count(in_use=-1)
+            semaphore.release()
+
+    def stats(self) -> dict[str, Any]:
+        return {"limit": self.limit, "in_use": self.in_use, "waiting": self.waiting, "saturated": self.saturated}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, at most `burst` banked. Used to keep
+    calls to rate-limited third parties (DuckDuckGo) under their tolerance.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int) -> None:
+        self.name = name
+        self.rate = max(0.0, rate)
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.granted = 0
+        self.throttled = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _take(self) -> float:
+        # Take a token if one is banked; otherwise return the wait until the next one.
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        if self.rate <= 0:
+            return float("inf")
+        return (1 - self._tokens) / self.rate
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Take one token, sleeping for at most `timeout` seconds (None: as long as it takes,
+        0: don't wait). Returns False when no token became available in time.
+        """
+        deadline = None if timeout is None else time.monotonic() + max(0.0, timeout)
+        while True:
+            with self._lock:
+                wait = self._take()
+            if wait == 0.0:
+                self.granted += 1
+                return True
+            if wait == float("inf") or (deadline is not None and wait > deadline - time.monotonic()):
+                self.throttled += 1
+                return False
+            time.sleep(wait)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            self._refill()
+            tokens = self._tokens
+        return {
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "tokens": round(tokens, 3),
+            "granted": self.granted,
+            "throttled": self.throttled,
+        }
+
+
+admission = AdmissionController(
+    max_concurrent=settings.admission_max_concurrent,
+    max_queue=settings.admission_max_queue,
+    queue_timeout_seconds=settings.admission_queue_timeout_seconds,
+)
+llm_limiter = DependencyLimiter("llm", settings.llm_max_concurrency)
+provider_limiter = DependencyLimiter("providers", settings.provider_max_concurrency)
+
+
+def admission_stats() -> dict[str, Any]:
+    return {
+        "recipes": admission.stats(),
+        "dependencies": {limiter.name: limiter.stats() for limiter in (llm_limiter, provider_limiter)},
+    }
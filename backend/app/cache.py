@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterable, Optional, Tuple
+
+from .config import resolve_backend_path
+
+
+def make_cache_key(namespace: str, params: dict, exclude: Iterable[str] = ()) -> str:
+    """
+    Stable key from normalized params: excluded keys (e.g. API keys) dropped,
+    string values trimmed and lowercased, keys sorted.
+    """
+    skip = {name.lower() for name in exclude}
+    normalized = {
+        str(name): (value.strip().lower() if isinstance(value, str) else value)
+        for name, value in params.items()
+        if str(name).lower() not in skip
+    }
+    payload = json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{namespace}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]}"
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory LRU cache with per-entry expiry.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Any | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: float | None = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class SQLiteCache:
+    """
+    Size-bounded on-disk cache that survives restarts. Values are stored as JSON.
+    """
+
+    _PRUNE_EVERY = 256
+
+    def __init__(self, path: Path, max_entries: int = 10000, table: str = "cache") -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self._table = table
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed_at)")
+
+    def get_with_expiry(self, key: str) -> Tuple[Any, float] | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self._table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if row[1] <= now:
+                self._conn.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute(
+                f"UPDATE {self._table} SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+        return json.loads(row[0]), row[1]
+
+    def get(self, key: str) -> Any | None:
+        found = self.get_with_expiry(key)
+        return found[0] if found else None
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        if ttl_seconds <= 0:
+            return
+        now = time.time()
+        payload = json.dumps(value, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self._table} (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, payload, now + ttl_seconds, now),
+            )
+            self._writes += 1
+            if self._writes % self._PRUNE_EVERY == 0:
+                self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        self._conn.execute(f"DELETE FROM {self._table} WHERE expires_at <= ?", (now,))
+        count = self._conn.execute(f"SELECT COUNT(*) FROM {self._table}").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                f"DELETE FROM {self._table} WHERE key IN ("
+                f"SELECT key FROM {self._table} ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += overflow
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self._table}")
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            count = self._conn.execute(f"SELECT COUNT(*) FROM {self._table}").fetchone()[0]
+        return {
+            "path": str(self.path),
+            "entries": count,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class TieredCache:
+    """
+    In-memory LRU in front of an optional SQLite tier. Disk hits are promoted to memory.
+    """
+
+    def __init__(self, memory: TTLCache, disk: Optional[SQLiteCache] = None) -> None:
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Any | None:
+        value = self.memory.get(key)
+        if value is not None or self.disk is None:
+            return value
+        found = self.disk.get_with_expiry(key)
+        if found is None:
+            return None
+        value, expires_at = found
+        self.memory.set(key, value, ttl_seconds=expires_at - time.time())
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: float | None = None) -> None:
+        ttl = self.memory.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self.memory.set(key, value, ttl_seconds=ttl)
+        if self.disk is not None:
+            self.disk.set(key, value, ttl_seconds=ttl)
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "memory": self.memory.stats(),
+            "disk": self.disk.stats() if self.disk is not None else None,
+        }
+
+
+def build_cache(
+    max_entries: int,
+    ttl_seconds: float,
+    db_path: str | None = None,
+    table: str = "cache",
+    disk_max_entries: int | None = None,
+) -> TieredCache:
+    disk = None
+    if db_path:
+        disk = SQLiteCache(
+            resolve_backend_path(db_path),
+            max_entries=disk_max_entries or max_entries,
+            table=table,
+        )
+    return TieredCache(TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds), disk)
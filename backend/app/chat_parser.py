@@ -0,0 +1,424 @@
+"""
+One-pass parser for chat messages ("2 carrots, an onion and some chicken, vegan, 20 mins").
+
+Run from `backend/`:
+    python -m app.chat_parser "carrots, onions and chicken thighs, vegan, 20 mins"
+    python -m app.chat_parser --bench 100000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .ingredients import normalize_ingredient
+from .models import FridgeInput
+
+VEGETABLE = "vegetable"
+AROMATIC = "aromatic"
+SPICE = "spice"
+PROTEIN = "protein"
+STAPLE = "staple"
+DIETARY = "dietary"
+MOOD = "mood"
+
+# Canonical name -> synonyms. Plurals are generated; canonical names are already normalized.
+# When two entries claim a surface form, the earlier category wins ("peppers" are bell peppers,
+# a bare "pepper" is black pepper).
+_INGREDIENTS: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    VEGETABLE: {
+        "tomato": ("cherry tomato",),
+        "potato": (),
+        "sweet potato": ("yam",),
+        "carrot": (),
+        "bell pepper": ("peppers", "capsicum", "red pepper", "green pepper", "yellow pepper"),
+        "zucchini": ("courgette",),
+        "eggplant": ("aubergine",),
+        "broccoli": (),
+        "cauliflower": (),
+        "spinach": (),
+        "kale": (),
+        "cabbage": (),
+        "mushroom": (),
+        "pea": (),
+        "corn": ("sweetcorn", "sweet corn"),
+        "green bean": ("string bean",),
+        "asparagus": (),
+        "cucumber": (),
+        "lettuce": (),
+        "avocado": (),
+        "butternut squash": ("squash",),
+        "pumpkin": (),
+        "beetroot": ("beet",),
+        "celery": (),
+        "radish": (),
+        "bok choy": ("pak choi",),
+        "brussels sprout": (),
+        "okra": (),
+        "artichoke": (),
+        "fennel": (),
+    },
+    AROMATIC: {
+        "onion": ("red onion", "white onion", "yellow onion"),
+        "garlic": ("garlic clove",),
+        "ginger": (),
+        "shallot": (),
+        "spring onion": ("scallion", "green onion"),
+        "leek": (),
+        "lemongrass": (),
+    },
+    SPICE: {
+        "black pepper": ("pepper", "peppercorn", "ground pepper"),
+        "chili": ("chilli", "chile", "chili flake", "chilli flake", "red pepper flake", "pepper flake", "crushed red pepper"),
+        "cumin": (),
+        "paprika": ("smoked paprika",),
+        "turmeric": (),
+        "coriander": ("cilantro",),
+        "cinnamon": (),
+        "curry powder": (),
+        "garam masala": (),
+        "cayenne": (),
+        "nutmeg": (),
+        "oregano": (),
+        "basil": (),
+        "thyme": (),
+        "rosemary": (),
+        "parsley": (),
+        "five spice": (),
+    },
+    PROTEIN: {
+        "chicken": ("chicken breast", "chicken thigh"),
+        "beef": ("steak", "ground beef", "beef mince"),
+        "pork": ("pork chop",),
+        "lamb": (),
+        "turkey": (),
+        "bacon": (),
+        "sausage": (),
+        "ham": (),
+        "duck": (),
+        "salmon": (),
+        "tuna": (),
+        "cod": ("white fish",),
+        "shrimp": ("prawn",),
+        "egg": (),
+        "tofu": (),
+        "tempeh": (),
+        "paneer": (),
+        "halloumi": (),
+        "chickpea": ("garbanzo",),
+        "lentil": (),
+        "black bean": (),
+        "kidney bean": ("red kidney bean",),
+        "cannellini bean": ("white bean",),
+        "pinto bean": (),
+        "butter bean": ("lima bean",),
+        "bean": (),
+    },
+    # FridgeInput has no staples field; these go to `spices`, and the pantry matcher
+    # assumes the common ones are on hand anyway.
+    STAPLE: {
+        "salt": ("sea salt", "kosher salt"),
+        "olive oil": ("extra virgin olive oil",),
+        "vegetable oil": ("oil", "cooking oil", "sunflower oil"),
+        "sesame oil": (),
+        "soy sauce": ("soya sauce",),
+        "chicken stock": ("chicken broth",),
+        "vegetable stock": ("vegetable broth", "veg stock"),
+        "beef stock": ("beef broth",),
+        "stock": ("broth", "stock cube"),
+        "vinegar": (),
+    },
+}
+
+# Labels match `DIETARY_EXCLUSIONS` in ingredients.py.
+_DIETARY: Dict[str, Tuple[str, ...]] = {
+    "vegetarian": ("veggie",),
+    "vegan": ("plant based",),
+    "gluten-free": ("gluten free", "coeliac", "celiac"),
+    "dairy-free": ("dairy free", "lactose free"),
+    "keto": (),
+    "low-carb": ("low carb",),
+}
+
+# In priority order: when a message names several moods, the earliest listed wins.
+_MOODS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("spicy", ("spicy", "hot and spicy")),
+    ("comforting", ("comforting", "cozy", "cosy", "hearty")),
+    ("italian-ish", ("italian",)),
+    ("asian-ish", ("asian",)),
+    ("fresh", ("fresh", "light")),
+    ("quick and comforting", ("quick",)),
+)
+
+# Words that carry no ingredient in an otherwise unrecognized list item ("i have some ...").
+_FILLER = frozenset(
+    """
+    a an the i ive we have got has some few little bit of my our in fridge left leftover also plus
+    with want would like love something make cook can could you please for me us tonight dinner lunch
+    recipe recipes meal idea ideas easy tasty nice good just only maybe any what which that there it is
+    are do does need to use up about around hi hello hey thanks thank help hungry so
+    but not no too very really all this these those from on at by be was were will today tomorrow
+    people person persons guests kids family morning afternoon evening yes yeah ok okay well still
+    much more lot lots enough anything else stuff thing things craving crave fancy feel feeling looking mood
+    great awesome perfect cool sounds sure fine amazing lovely delicious nothing none everything yesterday
+    curry stew soup salad taco tacos stirfry stir fry bake casserole pie burger burgers sandwich wrap bowl roast dish
+    jar jars tin tins bag bags pack packs packet packets bunch bunches handful cup cups piece pieces
+    slice slices g kg ml lb lbs oz tbsp tsp
+    """.split()
+)
+# Number words: a count ("two carrots") or servings ("dinner for two"), never an ingredient.
+_NUMBERS = {
+    word: value
+    for value, word in enumerate(
+        "zero one two three four five six seven eight nine ten eleven twelve".split()
+    )
+}
+_NUMBERS.update({"couple": 2, "dozen": 12})
+# "i'd", "don't", "we've", "that's": never part of an ingredient name.
+_CONTRACTION = re.compile(r"[a-z]+(?:'(?:d|m|s|re|ve|ll)|n't)")
+# Curly and modifier apostrophes as typed on phones, folded to "'" before scanning.
+_APOSTROPHES = str.maketrans({"\u2019": "'", "\u2018": "'", "\u02bc": "'", "`": "'"})
+# Longest unrecognized item still taken as an ingredient name; longer ones are sentences.
+_MAX_UNKNOWN_WORDS = 3
+
+_FIELDS = {
+    VEGETABLE: "main_vegetables",
+    AROMATIC: "aromatics",
+    SPICE: "spices",
+    STAPLE: "spices",
+    PROTEIN: "proteins",
+}
+
+
+def _plurals(phrase: str) -> List[str]:
+    head, _, last = phrase.rpartition(" ")
+    prefix = f"{head} " if head else ""
+    forms = [phrase, f"{prefix}{last}s", f"{prefix}{last}es"]
+    if last.endswith("y") and len(last) > 2 and last[-2] not in "aeiou":
+        forms.append(f"{prefix}{last[:-1]}ies")
+    return forms
+
+
+def _build_lexicon() -> Dict[str, Tuple[str, str]]:
+    # surface form (lowercase, single spaces) -> (kind, canonical value)
+    lexicon: Dict[str, Tuple[str, str]] = {}
+    for category, entries in _INGREDIENTS.items():
+        for canonical, synonyms in entries.items():
+            for name in (canonical, *synonyms):
+                for form in _plurals(name):
+                    lexicon.setdefault(form, (category, canonical))
+    for label, synonyms in _DIETARY.items():
+        for name in (label.replace("-", " "), *synonyms):
+            lexicon[name] = (DIETARY, label)
+    for mood, words in _MOODS:
+        for word in words:
+            lexicon[word] = (MOOD, mood)
+    return lexicon
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    Regex for a set of literal phrases, factored as a character trie so the engine walks
+    shared prefixes once instead of trying every alternative; longer phrases win. Spaces
+    match any run of whitespace or hyphens ("gluten-free", "bell  pepper").
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = []
+        for char in sorted(char for char in node if char):
+            atom = r"[\s-]+" if char == " " else re.escape(char)
+            branches.append(atom + build(node[char]))
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+_LEXICON = _build_lexicon()
+_SEPARATORS = re.compile(r"[\s-]+")
+_SCANNER = re.compile(
+    r"(?P<time>\d{1,3})\s*(?:min|mins|minute|minutes)\b"
+    r"|\b(?P<hours>\d{1,2}(?:\.\d+)?|an?|one|half an)\s*(?:hours?|hrs?)\b"
+    r"|\b(?:serves?|serving|for)\s*(?P<servings>\d{1,2}|"
+    + "|".join(sorted(_NUMBERS, key=len, reverse=True))
+    + r")\b(?!\s*(?:hours?|hrs?|min|mins|minutes?)\b)"
+    rf"|\b(?P<term>{_trie_pattern(_LEXICON)})\b"
+    r"|(?P<sep>[,;.!?\n/+&]|\band\b|\bor\b)"
+    r"|(?P<word>[a-z][a-z'-]*)"
+)
+
+
+@dataclass
+class ParsedMessage:
+    main_vegetables: List[str] = field(default_factory=list)
+    aromatics: List[str] = field(default_factory=list)
+    spices: List[str] = field(default_factory=list)
+    proteins: List[str] = field(default_factory=list)
+    dietary: List[str] = field(default_factory=list)
+    cuisine_mood: Optional[str] = None
+    time_budget_minutes: Optional[int] = None
+    servings: Optional[int] = None
+
+    @property
+    def ingredients(self) -> List[str]:
+        return self.proteins + self.main_vegetables + self.aromatics + self.spices
+
+
+def _add_unique(values: List[str], value: str) -> None:
+    if value and value not in values:
+        values.append(value)
+
+
+def parse_message(text: str) -> ParsedMessage:
+    """
+    Extract ingredients (routed by category), dietary labels, mood, time budget and
+    servings in a single left-to-right scan. Unknown words are read English-style, with
+    the head noun last: after a known ingredient they name a different one ("chicken stock",
+    "egg noodles"), and the whole phrase is kept. Words before a known ingredient only
+    qualify it ("smoked tofu" -> "tofu"). A run of unknown words is kept as a vegetable when
+    it is short enough to be an ingredient name ("leftover rice" -> "rice").
+    """
+    parsed = ParsedMessage()
+    mood_rank: Optional[int] = None
+    term: Optional[Tuple[str, str, str]] = None  # last ingredient term: (surface, category, value)
+    run: List[str] = []  # unknown words since the last term or boundary
+
+    def add_unknown(words: List[str]) -> None:
+        _add_unique(parsed.main_vegetables, normalize_ingredient(" ".join(words)))
+
+    def flush() -> None:
+        nonlocal term
+        if term is not None:
+            surface, category, value = term
+            if run and len(run) <= _MAX_UNKNOWN_WORDS:
+                add_unknown([surface, *run])
+            else:
+                _add_unique(getattr(parsed, _FIELDS[category]), value)
+        elif 0 < len(run) <= _MAX_UNKNOWN_WORDS:
+            add_unknown(run)
+        term = None
+        run.clear()
+
+    for match in _SCANNER.finditer(text.lower().translate(_APOSTROPHES)):
+        kind = match.lastgroup
+        if kind == "word":
+            word = match.group()
+            if word in _FILLER or word in _NUMBERS or _CONTRACTION.fullmatch(word):
+                flush()
+            else:
+                run.append(word)
+            continue
+        if kind == "term":
+            surface = _SEPARATORS.sub(" ", match.group())
+            category, value = _LEXICON[surface]
+            if category in _FIELDS:
+                if term is not None:
+                    flush()
+                # Unknown words right before the term are its modifiers.
+                run.clear()
+                term = (surface, category, value)
+                continue
+        flush()
+        if kind == "term" and category == DIETARY:
+            _add_unique(parsed.dietary, value)
+        elif kind == "term":
+            rank = next(i for i, (mood, _) in enumerate(_MOODS) if mood == value)
+            if mood_rank is None or rank < mood_rank:
+                mood_rank, parsed.cuisine_mood = rank, value
+        elif kind == "time":
+            parsed.time_budget_minutes = max(10, min(60, int(match.group("time"))))
+        elif kind == "hours":
+            amount = match.group("hours")
+            hours = 0.5 if amount == "half an" else float(amount) if amount[0].isdigit() else 1.0
+            parsed.time_budget_minutes = max(10, min(60, round(hours * 60)))
+        elif kind == "servings":
+            amount = match.group("servings")
+            parsed.servings = max(1, min(10, int(amount) if amount.isdigit() else _NUMBERS[amount]))
+    flush()
+    return parsed
+
+
+def merge_ingredients(existing: List[str], extra: Iterable[str]) -> List[str]:
+    # Append new names, de-duplicated on their normalized form ("Onions" == "onion").
+    seen = {normalize_ingredient(value) for value in existing}
+    merged = list(existing)
+    for value in extra:
+        key = normalize_ingredient(value)
+        if key and key not in seen:
+            seen.add(key)
+            merged.append(value)
+    return merged
+
+
+def apply_message(fridge_input: FridgeInput, text: str) -> FridgeInput:
+    """
+    Merge a chat message into `fridge_input` (in place) and return it.
+    """
+    parsed = parse_message(text)
+    for name in dict.fromkeys(_FIELDS.values()):
+        values = getattr(parsed, name)
+        if values:
+            setattr(fridge_input, name, merge_ingredients(getattr(fridge_input, name), values))
+    if parsed.dietary:
+        fridge_input.dietary = merge_ingredients(fridge_input.dietary, parsed.dietary)
+    if parsed.cuisine_mood:
+        fridge_input.cuisine_mood = parsed.cuisine_mood
+    if parsed.time_budget_minutes:
+        fridge_input.time_budget_minutes = parsed.time_budget_minutes
+    if parsed.servings:
+        fridge_input.servings = parsed.servings
+    return fridge_input
+
+
+_BENCH_MESSAGES = (
+    "I have carrots, 2 red onions and some chicken thighs",
+    "tomatoes, zucchini, garlic and basil, vegan please, 20 mins",
+    "leftover rice, eggs, spring onions and soy sauce. something quick for 3",
+    "Aubergines & chickpeas with cumin, gluten-free, cozy dinner for 4, about 45 minutes",
+    "just potatoes and bacon",
+    "spicy! prawns, bell peppers, ginger, lemongrass and chilli flakes, dairy free",
+)
+
+
+def benchmark(messages: int) -> dict:
+    corpus = [_BENCH_MESSAGES[i % len(_BENCH_MESSAGES)] for i in range(messages)]
+    started = time.perf_counter()
+    for message in corpus:
+        parse_message(message)
+    elapsed = time.perf_counter() - started
+    size = sum(len(message) for message in corpus)
+    return {
+        "messages": messages,
+        "lexicon_terms": len(_LEXICON),
+        "seconds": round(elapsed, 3),
+        "messages_per_s": round(messages / elapsed),
+        "mb_per_s": round(size / elapsed / 2**20, 2),
+        "us_per_message": round(elapsed / messages * 1e6, 2),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Parse chat messages into fridge input fields.")
+    parser.add_argument("messages", nargs="*", help="messages to parse and print")
+    parser.add_argument("--bench", type=int, metavar="N", help="parse N sample messages and report throughput")
+    args = parser.parse_args(argv)
+
+    for message in args.messages:
+        print(json.dumps({"message": message, **asdict(parse_message(message))}))
+    if args.bench:
+        print(json.dumps(benchmark(args.bench)))
+
+
+if __name__ == "__main__":
+    main()
@@ -23,7 +23,19 @@ class Settings(BaseSettings):
     # LLM provider (optional)
     openai_api_key: str | None = None
     openai_model: str = "gpt-4o-mini"
+    openai_base_url: str | None = None  # OpenAI-compatible endpoint, e.g. the local stub server
+    llm_timeout_seconds: float = 30.0
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+
+    # LLM response cache (exact + normalized-prompt tiers)
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 2048
+    llm_cache_ttl_seconds: int = 86400
+    llm_cache_db_path: str | None = None  # e.g. .cache/llm.sqlite
     force_llm: bool = False
+    planner_max_concurrency: int = 3
+    planner_variant_timeout_seconds: float = 20.0
 
     # Arize AX tracing (optional)
     arize_space_id: str | None = None
@@ -33,17 +45,99 @@ class Settings(BaseSettings):
 
     # Recipe source providers (optional)
     recipe_source_enabled: bool = True
-    recipe_source_provider: str = "auto"  # auto | spoonacular | mealdb | none
+    recipe_source_provider: str = "auto"  # auto | spoonacular | mealdb | local | none
+    local_corpus_path: str = "data/local_recipes.jsonl"
     spoonacular_api_key: str | None = None
     mealdb_api_key: str = "1"
+    mealdb_max_filter_ingredients: int = 8
+    mealdb_top_k: int = 5
+    provider_timeout_seconds: float = 10.0
+    provider_pool_size: int = 16
+    provider_max_concurrency_per_host: int = 8
+
+    # Recipe provider response cache (memory LRU + optional SQLite tier)
+    provider_cache_enabled: bool = True
+    provider_cache_max_entries: int = 2048
+    provider_cache_db_path: str | None = None  # e.g. .cache/providers.sqlite
+    provider_cache_disk_max_entries: int = 50000
+    mealdb_filter_ttl_seconds: int = 21600
+    mealdb_lookup_ttl_seconds: int = 604800
+    spoonacular_ttl_seconds: int = 3600
 
     # RAG (optional)
     rag_enabled: bool = False
     rag_collection: str = "fridge-recipes"
     rag_top_k: int = 4
+    rag_chroma_path: str = ".chroma"
+    rag_embedding_model: str = "all-MiniLM-L6-v2"
+    rag_embedding_backend: str = "torch"  # torch (reference) | onnx | int8 (quantized ONNX); no PyTorch needed for the last two
+    rag_embedding_onnx_file: str | None = None  # file in the model repo; default onnx/model.onnx, int8: onnx/model_quint8_avx2.onnx
+    rag_embedding_max_length: int = 256  # tokens per text for the ONNX backends, as the model's max_seq_length
+    rag_embedding_threads: int = 0  # onnxruntime intra-op threads; 0 = runtime default
+    rag_warmup: bool = True  # load the model at startup instead of on the first RAG request
+    rag_load_retry_seconds: float = 30.0  # wait before retrying a failed load; doubles per failure
+    rag_load_retry_max_seconds: float = 600.0
+    rag_embedding_cache_size: int = 2048  # query -> vector LRU; 0 disables
+    rag_embedding_batch_window_ms: float = 2.0  # max wait to batch queries while others are in flight
+    rag_embedding_max_batch: int = 32
+    rag_retrieval_mode: str = "dense"  # dense | lexical (BM25 only) | hybrid (BM25 first, fused with dense when unsure)
+    rag_hybrid_min_coverage: float = 0.75  # share of query terms every lexical hit must match to skip the embedding
 
     # Web search fallback (optional)
     web_search_enabled: bool = True
+    web_search_backend: str = "ddgs"  # ddgs | fake (canned offline snippets for tests and benchmarks)
+    web_search_fake_latency_ms: int = 0
+    web_search_cache_enabled: bool = True
+    web_search_cache_max_entries: int = 1024
+    web_search_cache_ttl_seconds: int = 3600
+    web_search_cache_db_path: str | None = None  # e.g. .cache/web_search.sqlite
+    web_search_rate_per_second: float = 1.0  # DuckDuckGo calls, across the process
+    web_search_burst: int = 3
+    web_search_prefetch_enabled: bool = False  # background refresh of popular queries
+    web_search_prefetch_interval_seconds: float = 300.0
+    web_search_prefetch_top_k: int = 20
+
+    # Start recipe search, RAG and web search together instead of as a fallback chain
+    speculative_retrieval: bool = False
+
+    # Circuit breakers and adaptive timeouts for Spoonacular, TheMealDB, DuckDuckGo and the LLM
+    breaker_enabled: bool = True
+    breaker_window_seconds: float = 60.0
+    breaker_min_calls: int = 5
+    breaker_failure_rate: float = 0.5
+    breaker_open_seconds: float = 30.0
+    breaker_half_open_probes: int = 1
+    adaptive_timeout_enabled: bool = True
+    adaptive_timeout_multiplier: float = 2.0  # timeout = observed p99 x multiplier
+    adaptive_timeout_min_seconds: float = 0.5
+    adaptive_timeout_min_samples: int = 20
+
+    # Admission control in front of the recipe pipeline
+    admission_max_concurrent: int = 64
+    admission_max_queue: int = 256
+    admission_queue_timeout_seconds: float = 2.0  # also bounded by the request deadline
+    admission_overload_mode: str = "degrade"  # degrade (cache/local answer) | shed (503)
+    admission_retry_after_seconds: int = 2
+    llm_max_concurrency: int = 32  # concurrent LLM calls per process
+    provider_max_concurrency: int = 64  # concurrent recipe-provider calls per process, across hosts
+
+    # Request deadlines (seconds); clients may send X-Request-Deadline-Ms to override
+    recipe_deadline_seconds: float = 8.0  # options, choose and their streaming variants
+    chat_deadline_seconds: float = 8.0
+    max_request_deadline_seconds: float = 30.0
+    retrieval_budget_share: float = 0.6  # of the time left; the rest stays with the planner
+
+    # Whole-response cache in front of the recipe graph
+    response_cache_enabled: bool = True
+    response_cache_max_entries: int = 512
+    response_cache_ttl_seconds: int = 600  # responses with API-sourced options
+    response_cache_generated_ttl_seconds: int = 120  # all options generated; 0 disables
+    response_cache_db_path: str | None = None  # e.g. .cache/responses.sqlite
+
+    # Option sessions: server-side copy of returned options for /api/recipes/choose
+    option_session_ttl_seconds: int = 1800
+    option_session_max_entries: int = 1000
+    option_session_db_path: str | None = None  # e.g. .cache/sessions.sqlite
 
     # Tracing (optional)
     langchain_tracing_v2: str | None = None
@@ -51,4 +145,12 @@ class Settings(BaseSettings):
     langsmith_api_key: str | None = None
 
 
+def resolve_backend_path(value: str) -> Path:
+    # Relative data paths are anchored at `backend/`, like the env file.
+    path = Path(value)
+    if not path.is_absolute():
+        path = _BACKEND_DIR / path
+    return path
+
+
 settings = Settings()
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import math
+import time
+from typing import Mapping, Optional
+
+from .config import settings
+
+# Header a client can send to tighten (or, up to the configured maximum, relax) the deadline.
+DEADLINE_HEADER = "X-Request-Deadline-Ms"
+
+# Time kept back from every stage so local generation and response assembly still fit.
+FINALIZE_RESERVE_SECONDS = 0.05
+
+
+class Deadline:
+    """
+    Absolute, monotonic request deadline. Stages ask it for a timeout instead of using
+    fixed values, so a slow early stage leaves less time for the later ones.
+    """
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, seconds: float) -> None:
+        self.expires_at = time.monotonic() + max(0.0, seconds)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= FINALIZE_RESERVE_SECONDS
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """
+        Seconds a stage may spend: the time left minus the finalize reserve, capped at `cap`.
+        Returns 0 when there is no time left for the stage at all.
+        """
+        budget = max(0.0, self.remaining() - FINALIZE_RESERVE_SECONDS)
+        if cap is not None:
+            budget = min(budget, cap)
+        return budget
+
+    def stage(self, share: float = 1.0) -> "Deadline":
+        """
+        Sub-deadline for a stage that may use only `share` of the time left, so later
+        stages (e.g. the planner after retrieval) keep a budget of their own.
+        """
+        stage = Deadline(0)
+        stage.expires_at = min(self.expires_at, time.monotonic() + self.remaining() * max(0.0, min(share, 1.0)))
+        return stage
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f}s)"
+
+
+def stage_timeout(deadline: Optional[Deadline], cap: float) -> float:
+    # `cap` alone when the caller has no deadline (scripts, sync API).
+    return deadline.timeout(cap) if deadline is not None else cap
+
+
+def request_deadline(headers: Mapping[str, str], default_seconds: float) -> Deadline:
+    """
+    Deadline for an incoming request: the endpoint default, or the `X-Request-Deadline-Ms`
+    header when present, clamped to `MAX_REQUEST_DEADLINE_SECONDS`.
+    """
+    seconds = default_seconds
+    raw = headers.get(DEADLINE_HEADER)
+    if raw:
+        try:
+            requested = float(raw) / 1000
+        except ValueError:
+            requested = math.nan
+        # Malformed or non-finite ("nan", "inf") headers fall back to the default.
+        if math.isfinite(requested):
+            seconds = requested
+    return Deadline(min(max(seconds, 0.0), settings.max_request_deadline_seconds))
@@ -0,0 +1,158 @@
+"""
+Parity check and benchmark for the RAG embedding backends.
+
+Run from `backend/`:
+    python -m app.embedding_bench --backends torch onnx int8
+Each backend is compared with the reference (`torch` by default) on a fixed set of
+templated RAG queries: cosine agreement of the vectors, and overlap of the top-k
+neighbours among a fixed set of recipe snippets (a recall proxy). It also reports load
+time, resident memory, single-query latency and batched throughput. Exits non-zero when
+a backend's minimum cosine is below `--min-cosine`, so it can gate a backend switch.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import math
+import os
+import statistics
+import sys
+import time
+from itertools import product
+from typing import Dict, List, Optional, Sequence
+
+from .config import settings
+from .embeddings import EMBEDDING_BACKENDS, EmbeddingBackend, Vector, build_embedding_backend
+
+_CUISINES = ("Italian", "Thai", "Mexican", "Indian", "Japanese", "French")
+_VEGETABLES = (
+    "tomato, zucchini",
+    "carrot, bell pepper",
+    "spinach, mushroom",
+    "potato, onion",
+    "broccoli, garlic",
+    "eggplant, chickpea",
+)
+
+# Same template as the graph's RAG query, so the check covers what production encodes.
+PARITY_QUERIES = [f"{cuisine} recipes with {vegetables}" for cuisine, vegetables in product(_CUISINES, _VEGETABLES)]
+
+PARITY_DOCUMENTS = [
+    f"{cuisine} {style} with {vegetables}: {method}."
+    for (cuisine, vegetables), (style, method) in zip(
+        product(_CUISINES, _VEGETABLES),
+        [
+            ("stir-fry", "sear over high heat and finish with soy and lime"),
+            ("soup", "simmer everything in stock until tender, then blend"),
+            ("bake", "layer in a dish, top with cheese and bake for 30 minutes"),
+            ("curry", "fry the spices, add the vegetables and coconut milk"),
+            ("salad", "roast the vegetables and toss with a sharp dressing"),
+            ("pasta", "cook a quick sauce and toss with the drained pasta"),
+        ]
+        * len(_CUISINES),
+    )
+]
+
+
+def _rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as handle:
+            pages = int(handle.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _neighbours(queries: List[Vector], documents: List[Vector], k: int) -> List[set]:
+    return [
+        set(sorted(range(len(documents)), key=lambda i: -_cosine(query, documents[i]))[:k]) for query in queries
+    ]
+
+
+def _percentile(values: List[float], share: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(share * len(ordered)) - 1)]
+
+
+def measure(backend: EmbeddingBackend, batch_size: int, repeat: int) -> Dict[str, float]:
+    backend.encode(PARITY_QUERIES[:2])  # warm-up: lazy kernels, allocator
+    latencies = []
+    for _ in range(repeat):
+        for query in PARITY_QUERIES:
+            started = time.perf_counter()
+            backend.encode([query])
+            latencies.append(time.perf_counter() - started)
+    corpus = PARITY_DOCUMENTS * max(1, repeat)
+    started = time.perf_counter()
+    backend.encode(corpus, batch_size=batch_size)
+    elapsed = time.perf_counter() - started
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "texts_per_s": len(corpus) / elapsed if elapsed else float("inf"),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare RAG embedding backends for parity and speed.")
+    parser.add_argument("--backends", nargs="+", choices=EMBEDDING_BACKENDS, default=list(EMBEDDING_BACKENDS))
+    parser.add_argument("--reference", choices=EMBEDDING_BACKENDS, default="torch")
+    parser.add_argument("--model", default=settings.rag_embedding_model)
+    parser.add_argument("--batch-size", type=int, default=64, help="batch size for the throughput run")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the query set for latency")
+    parser.add_argument("--top-k", type=int, default=5, help="neighbours compared for the recall proxy")
+    parser.add_argument("--min-cosine", type=float, default=0.99, help="fail below this per-query cosine")
+    args = parser.parse_args(argv)
+
+    order = [args.reference] + [name for name in args.backends if name != args.reference]
+    reference: Optional[tuple[List[Vector], List[Vector]]] = None
+    failed = False
+    print(
+        f"{'backend':<8} {'load_s':>7} {'rss_mb':>7} {'p50_ms':>7} {'p95_ms':>7} {'texts/s':>9} "
+        f"{'cos_mean':>8} {'cos_min':>8} {'top' + str(args.top_k):>6}"
+    )
+    for name in order:
+        gc.collect()
+        rss_before = _rss_mb()
+        started = time.perf_counter()
+        try:
+            backend = build_embedding_backend(name, args.model)
+        except Exception as exc:
+            print(f"{name:<8} unavailable: {type(exc).__name__}: {exc}", file=sys.stderr)
+            failed = True
+            continue
+        load_seconds = time.perf_counter() - started
+        rss_after = _rss_mb()
+        queries = backend.encode(PARITY_QUERIES)
+        documents = backend.encode(PARITY_DOCUMENTS)
+        timings = measure(backend, args.batch_size, args.repeat)
+
+        parity = "reference"
+        if name == args.reference:
+            reference = (queries, documents)
+        elif reference is not None:
+            cosines = [_cosine(a, b) for a, b in zip(queries, reference[0])]
+            mine = _neighbours(queries, documents, args.top_k)
+            theirs = _neighbours(reference[0], reference[1], args.top_k)
+            overlap = statistics.mean(len(a & b) / args.top_k for a, b in zip(mine, theirs))
+            parity = f"{statistics.mean(cosines):8.4f} {min(cosines):8.4f} {overlap:6.2f}"
+            failed = failed or min(cosines) < args.min_cosine
+        else:
+            parity = "no reference"
+        rss = f"{rss_after - rss_before:7.0f}" if rss_before is not None and rss_after is not None else f"{'n/a':>7}"
+        print(
+            f"{name:<8} {load_seconds:7.2f} {rss} {timings['p50_ms']:7.2f} {timings['p95_ms']:7.2f} "
+            f"{timings['texts_per_s']:9.1f} {parity}"
+        )
+        del backend
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import abc
+import concurrent.futures
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .cache import TTLCache
+from .config import settings
+
+Vector = List[float]
+
+
+class EmbeddingBackend(abc.ABC):
+    """
+    Batch text encoder behind RAG queries and ingestion. Backends load their model in
+    `__init__` and must produce vectors comparable with the reference (`torch`) backend,
+    so a collection embedded with one can be queried with another.
+    """
+
+    name = "base"
+
+    @abc.abstractmethod
+    def encode(self, texts: List[str], batch_size: int = 32) -> List[Vector]:
+        ...
+
+
+class TorchBackend(EmbeddingBackend):
+    """
+    Reference backend: the full-precision PyTorch `SentenceTransformer`.
+    """
+
+    name = "torch"
+
+    def __init__(self, model_name: str) -> None:
+        from sentence_transformers import SentenceTransformer
+
+        self._model = SentenceTransformer(model_name)
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> List[Vector]:
+        return self._model.encode(texts, batch_size=batch_size, show_progress_bar=False).tolist()
+
+
+def _hub_repo(model_name: str) -> str:
+    # "all-MiniLM-L6-v2" is short for the sentence-transformers organisation's repo, as in SentenceTransformer().
+    return model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+
+class OnnxBackend(EmbeddingBackend):
+    """
+    ONNX export of the model on onnxruntime's CPU provider, tokenized with `tokenizers`,
+    without importing PyTorch. Pools like the sentence-transformers MiniLM/MPNet models:
+    attention-masked mean, then L2 normalization.
+    """
+
+    name = "onnx"
+    default_file = "onnx/model.onnx"
+
+    def __init__(self, model_name: str, onnx_file: Optional[str] = None, max_length: int = 256, threads: int = 0) -> None:
+        import numpy as np
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        onnx_file = onnx_file or self.default_file
+        local = Path(model_name)
+        if local.is_dir():
+            tokenizer_path, onnx_path = local / "tokenizer.json", local / onnx_file
+        else:
+            from huggingface_hub import hf_hub_download
+
+            repo = _hub_repo(model_name)
+            tokenizer_path, onnx_path = hf_hub_download(repo, "tokenizer.json"), hf_hub_download(repo, onnx_file)
+        self._np = np
+        self._tokenizer = Tokenizer.from_file(str(tokenizer_path))
+        self._tokenizer.enable_truncation(max_length=max_length)
+        self._tokenizer.enable_padding()
+        options = onnxruntime.SessionOptions()
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self._session = onnxruntime.InferenceSession(str(onnx_path), options, providers=["CPUExecutionProvider"])
+        self._inputs = {node.name for node in self._session.get_inputs()}
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> List[Vector]:
+        np = self._np
+        vectors: List[Vector] = []
+        for start in range(0, len(texts), max(1, batch_size)):
+            encodings = self._tokenizer.encode_batch(texts[start : start + batch_size])
+            mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+            feeds = {
+                "input_ids": np.array([encoding.ids for encoding in encodings], dtype=np.int64),
+                "attention_mask": mask,
+            }
+            if "token_type_ids" in self._inputs:
+                feeds["token_type_ids"] = np.array([encoding.type_ids for encoding in encodings], dtype=np.int64)
+            hidden = self._session.run(None, feeds)[0]
+            weights = mask[..., None].astype(hidden.dtype)
+            pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            vectors.extend(pooled.tolist())
+        return vectors
+
+
+class Int8Backend(OnnxBackend):
+    """
+    The int8-quantized ONNX export (published alongside the fp32 one): a fraction of the
+    memory and per-query CPU time, with near-identical vectors.
+    """
+
+    name = "int8"
+    default_file = "onnx/model_quint8_avx2.onnx"
+
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "int8")
+
+
+def build_embedding_backend(name: Optional[str] = None, model_name: Optional[str] = None) -> EmbeddingBackend:
+    name = (name or settings.rag_embedding_backend).lower().strip()
+    model_name = model_name or settings.rag_embedding_model
+    if name == "torch":
+        return TorchBackend(model_name)
+    if name in ("onnx", "int8"):
+        backend = OnnxBackend if name == "onnx" else Int8Backend
+        return backend(
+            model_name,
+            onnx_file=settings.rag_embedding_onnx_file,
+            max_length=settings.rag_embedding_max_length,
+            threads=settings.rag_embedding_threads,
+        )
+    raise ValueError(f"unknown embedding backend: {name!r}")
+
+
+class EmbeddingService:
+    """
+    Query embeddings in front of a batch `encode(texts) -> vectors` function:
+
+    - an LRU of text -> vector, since RAG queries are templated and repeat often;
+    - a micro-batcher: the first caller of a batch encodes straight away when it is the
+      only caller in flight. While other callers are busy (typically waiting on an encode
+      already running), it waits up to `batch_window_seconds` for them to finish, or until
+      `max_batch` texts are queued, and runs one `encode` for everyone who arrived meanwhile.
+      Identical texts share one slot, including texts whose batch is already encoding.
+
+    Callers are threads (RAG runs in worker threads); no background thread is needed.
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[List[str]], List[Vector]],
+        cache_size: int = 2048,
+        batch_window_seconds: float = 0.002,
+        max_batch: int = 32,
+    ) -> None:
+        self._encode = encode
+        # Vectors never go stale for a given model; the cache is bounded by size only.
+        self._cache: Optional[TTLCache] = (
+            TTLCache(max_entries=cache_size, ttl_seconds=float("inf")) if cache_size > 0 else None
+        )
+        self.batch_window_seconds = max(0.0, batch_window_seconds)
+        self.max_batch = max(1, max_batch)
+        # Texts waiting for the next batch, and texts whose batch is encoding but not cached yet.
+        self._pending: Dict[str, concurrent.futures.Future] = {}
+        self._encoding: Dict[str, concurrent.futures.Future] = {}
+        # Callers inside `embed()` past the cache, and how many of them wait on `_pending`.
+        self._active = 0
+        self._queued = 0
+        self._cond = threading.Condition()
+        self.batches = 0
+        self.batched_texts = 0
+        self.largest_batch = 0
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return " ".join(text.split())
+
+    def embed(self, text: str) -> Vector:
+        key = self._key(text)
+        if self._cache is not None:
+            vector = self._cache.get(key)
+            if vector is not None:
+                return vector
+        leader = False
+        with self._cond:
+            future = self._pending.get(key)
+            if future is not None:
+                self._queued += 1
+            else:
+                future = self._encoding.get(key)
+            if future is None and self._cache is not None:
+                # Its batch may have finished between the cache check and taking the lock.
+                vector = self._cache.get(key)
+                if vector is not None:
+                    return vector
+            if future is None:
+                future = concurrent.futures.Future()
+                leader = not self._pending
+                self._pending[key] = future
+                self._queued += 1
+                if len(self._pending) >= self.max_batch:
+                    self._cond.notify_all()
+            self._active += 1
+        try:
+            if leader:
+                self._flush()
+            return future.result()
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    def _flush(self) -> None:
+        with self._cond:
+            self._cond.wait_for(
+                lambda: len(self._pending) >= self.max_batch or self._queued >= self._active,
+                timeout=self.batch_window_seconds,
+            )
+            batch, self._pending = self._pending, {}
+            self._encoding.update(batch)
+            self._queued = 0
+        texts = list(batch)
+        try:
+            vectors = self._encode(texts)
+        except BaseException as exc:
+            with self._cond:
+                for text in texts:
+                    self._encoding.pop(text, None)
+            # Every waiter (the leader included) sees the error from its own `result()`.
+            for future in batch.values():
+                future.set_exception(exc)
+            return
+        if self._cache is not None:
+            for text, vector in zip(texts, vectors):
+                self._cache.set(text, vector)
+        with self._cond:
+            for text in texts:
+                self._encoding.pop(text, None)
+            self.batches += 1
+            self.batched_texts += len(texts)
+            self.largest_batch = max(self.largest_batch, len(texts))
+        for text, vector in zip(texts, vectors):
+            batch[text].set_result(vector)
+
+    def clear(self) -> None:
+        if self._cache is not None:
+            self._cache.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "cache": self._cache.stats() if self._cache is not None else None,
+            "batches": self.batches,
+            "batched_texts": self.batched_texts,
+            "avg_batch": round(self.batched_texts / self.batches, 2) if self.batches else None,
+            "largest_batch": self.largest_batch,
+        }
@@ -1,19 +1,31 @@
 from __future__ import annotations
 
+import asyncio
 import concurrent.futures
+import contextvars
 import json
 import os
-from typing import List, Optional, TypedDict
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple, TypedDict, TypeVar
 
 from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda
 from langchain_openai import ChatOpenAI
+from langgraph.config import get_stream_writer
 from langgraph.graph import END, START, StateGraph
 
+from .admission import admission, llm_limiter
 from .config import settings
+from .deadline import Deadline, stage_timeout
+from .ingredients import canonical_fridge_input, fridge_input_key
+from .llm import get_chat_model
+from .llm_cache import llm_cache
 from .models import FridgeInput, RecipeOption, RecipeResponse
-from .rag import retrieve_rag_context
-from .tools.recipe_search import search_recipes
-from .tools.web_search import web_search
+from .resilience import get_breaker
+from .rag import aretrieve_rag_context, retrieve_rag_context
+from .singleflight import SingleFlight
+from .tools.recipe_search import asearch_recipes, search_recipes
+from .tools.web_search import aweb_search, web_search
 from .tracing import start_span
 from openinference.semconv.trace import OpenInferenceSpanKindValues, SpanAttributes
 
@@ -25,13 +37,15 @@ class GraphState(TypedDict, total=False):
     rag_context: List[str]
     search_context: List[str]
     errors: List[str]
+    # Request-scoped deadline; absent for callers without one (each stage then uses its own cap).
+    deadline: Deadline
+
+
+T = TypeVar("T")
 
 
 def _get_llm() -> Optional[ChatOpenAI]:
-    if not settings.openai_api_key:
-        return None
-    os.environ["OPENAI_API_KEY"] = settings.openai_api_key
-    return ChatOpenAI(model=settings.openai_model, temperature=0.4)
+    return get_chat_model(settings.openai_model, temperature=0.4)
 
 
 def _configure_tracing() -> None:
@@ -71,22 +85,81 @@ def _cuisine_mood_node(state: GraphState) -> GraphState:
         return {"cuisine_hint": cuisine_hint}
 
 
+def _out_of_time(state: GraphState) -> bool:
+    deadline = state.get("deadline")
+    return deadline is not None and deadline.expired()
+
+
+def _with_error(state: GraphState, update: GraphState, stage: str) -> GraphState:
+    # Stages skipped or cut short by the deadline are recorded; the response is then marked degraded.
+    update["errors"] = (state.get("errors") or []) + [f"{stage}: deadline exceeded"]
+    return update
+
+
+def _retrieval_deadline(state: GraphState) -> Optional[Deadline]:
+    # Retrieval stages get a share of the time left; the remainder is kept for the planner.
+    deadline = state.get("deadline")
+    return deadline.stage(settings.retrieval_budget_share) if deadline is not None else None
+
+
+async def _await_stage(
+    deadline: Optional[Deadline], awaitable: Awaitable[T], cap: Optional[float] = None
+) -> Optional[T]:
+    """
+    Await `awaitable` for at most the stage budget; None when the deadline cut it short.
+    """
+    timeout = deadline.timeout(cap) if deadline is not None else cap
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        return None
+
+
 def _recipe_search_node(state: GraphState) -> GraphState:
+    if _out_of_time(state):
+        return _with_error(state, {"recipe_options": []}, "recipe_search")
     with start_span(
         "recipe_search",
         OpenInferenceSpanKindValues.TOOL,
         input_value=state["fridge_input"].model_dump_json(),
     ) as span:
-        options = search_recipes(state["fridge_input"])
+        # Each provider call is capped by the stage budget, so this returns near it at worst.
+        deadline = _retrieval_deadline(state)
+        options = search_recipes(state["fridge_input"], deadline=deadline)
         if span is not None:
             span.set_attribute(SpanAttributes.OUTPUT_VALUE, f"{len(options)} options")
+        if not options and deadline is not None and deadline.expired():
+            return _with_error(state, {"recipe_options": []}, "recipe_search")
         return {"recipe_options": options}
 
 
+async def _arecipe_search_node(state: GraphState) -> GraphState:
+    if _out_of_time(state):
+        return _with_error(state, {"recipe_options": []}, "recipe_search")
+    with start_span(
+        "recipe_search",
+        OpenInferenceSpanKindValues.TOOL,
+        input_value=state["fridge_input"].model_dump_json(),
+    ) as span:
+        deadline = _retrieval_deadline(state)
+        options = await _await_stage(deadline, asearch_recipes(state["fridge_input"], deadline=deadline))
+        if span is not None:
+            span.set_attribute(SpanAttributes.OUTPUT_VALUE, f"{len(options or [])} options")
+        if options is None or (not options and deadline is not None and deadline.expired()):
+            return _with_error(state, {"recipe_options": []}, "recipe_search")
+        return {"recipe_options": options}
+
+
+def _rag_query(state: GraphState) -> str:
+    return f"{state['cuisine_hint']} recipes with {', '.join(state['fridge_input'].main_vegetables)}"
+
+
 def _rag_node(state: GraphState) -> GraphState:
     if not settings.rag_enabled:
         return {"rag_context": []}
-    query = f"{state['cuisine_hint']} recipes with {', '.join(state['fridge_input'].main_vegetables)}"
+    if _out_of_time(state):
+        return _with_error(state, {"rag_context": []}, "rag")
+    query = _rag_query(state)
     with start_span(
         "rag_retrieve",
         OpenInferenceSpanKindValues.RETRIEVER,
@@ -98,21 +171,133 @@ def _rag_node(state: GraphState) -> GraphState:
         return {"rag_context": context}
 
 
+async def _arag_node(state: GraphState) -> GraphState:
+    if not settings.rag_enabled:
+        return {"rag_context": []}
+    if _out_of_time(state):
+        return _with_error(state, {"rag_context": []}, "rag")
+    query = _rag_query(state)
+    with start_span(
+        "rag_retrieve",
+        OpenInferenceSpanKindValues.RETRIEVER,
+        input_value=query,
+    ) as span:
+        context = await _await_stage(_retrieval_deadline(state), aretrieve_rag_context(query))
+        if context is None:
+            return _with_error(state, {"rag_context": []}, "rag")
+        if span is not None:
+            span.set_attribute(SpanAttributes.OUTPUT_VALUE, f"{len(context)} snippets")
+        return {"rag_context": context}
+
+
+# DuckDuckGo has no timeout of its own beyond the client default; match it.
+_WEB_SEARCH_TIMEOUT_SECONDS = 10.0
+
+
+def _web_query(state: GraphState) -> str:
+    return f"{state['cuisine_hint']} weeknight recipe with {', '.join(state['fridge_input'].main_vegetables)}"
+
+
 def _web_search_node(state: GraphState) -> GraphState:
     if not settings.web_search_enabled:
         return {"search_context": []}
-    query = f"{state['cuisine_hint']} weeknight recipe with {', '.join(state['fridge_input'].main_vegetables)}"
+    if _out_of_time(state):
+        return _with_error(state, {"search_context": []}, "web_search")
+    query = _web_query(state)
     with start_span(
         "web_search",
         OpenInferenceSpanKindValues.TOOL,
         input_value=query,
     ) as span:
-        context = web_search(query)
+        context = web_search(query, timeout=stage_timeout(_retrieval_deadline(state), _WEB_SEARCH_TIMEOUT_SECONDS))
         if span is not None:
             span.set_attribute(SpanAttributes.OUTPUT_VALUE, f"{len(context)} snippets")
         return {"search_context": context}
 
 
+async def _aweb_search_node(state: GraphState) -> GraphState:
+    if not settings.web_search_enabled:
+        return {"search_context": []}
+    if _out_of_time(state):
+        return _with_error(state, {"search_context": []}, "web_search")
+    query = _web_query(state)
+    with start_span(
+        "web_search",
+        OpenInferenceSpanKindValues.TOOL,
+        input_value=query,
+    ) as span:
+        deadline = _retrieval_deadline(state)
+        timeout = stage_timeout(deadline, _WEB_SEARCH_TIMEOUT_SECONDS)
+        context = await _await_stage(deadline, aweb_search(query, timeout=timeout), _WEB_SEARCH_TIMEOUT_SECONDS)
+        if context is None:
+            return _with_error(state, {"search_context": []}, "web_search")
+        if span is not None:
+            span.set_attribute(SpanAttributes.OUTPUT_VALUE, f"{len(context)} snippets")
+        return {"search_context": context}
+
+
+def _discard(pending: List[Any]) -> None:
+    # Losing branches are cancelled (async) or simply left to finish (threads); their
+    # errors are swallowed so they never surface as "exception was never retrieved".
+    for item in pending:
+        item.cancel()
+        item.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+
+def _merge_update(update: GraphState, other: GraphState) -> None:
+    # Branches all start from the same state, so keep each recorded error once.
+    errors = list(update.get("errors") or [])
+    errors += [error for error in other.get("errors") or [] if error not in errors]
+    update.update(other)
+    if errors:
+        update["errors"] = errors
+
+
+def _retrieve_node(state: GraphState) -> GraphState:
+    """
+    Speculative retrieval: start recipe search, RAG and web search at once, then consume
+    them in fallback-chain order. Once a stage is decisive the later ones are discarded,
+    so the planner sees exactly the context the serial chain would have given it.
+    """
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=3, thread_name_prefix="retrieve")
+    try:
+        search = executor.submit(contextvars.copy_context().run, _recipe_search_node, state)
+        rag = executor.submit(contextvars.copy_context().run, _rag_node, state)
+        web = executor.submit(contextvars.copy_context().run, _web_search_node, state)
+        update = search.result()
+        if update.get("recipe_options"):
+            _discard([rag, web])
+            return update
+        _merge_update(update, rag.result())
+        if update.get("rag_context"):
+            _discard([web])
+            return update
+        _merge_update(update, web.result())
+        return update
+    finally:
+        executor.shutdown(wait=False)
+
+
+async def _aretrieve_node(state: GraphState) -> GraphState:
+    search = asyncio.create_task(_arecipe_search_node(state))
+    rag = asyncio.create_task(_arag_node(state))
+    web = asyncio.create_task(_aweb_search_node(state))
+    try:
+        update = await search
+        if update.get("recipe_options"):
+            _discard([rag, web])
+            return update
+        _merge_update(update, await rag)
+        if update.get("rag_context"):
+            _discard([web])
+            return update
+        _merge_update(update, await web)
+        return update
+    except BaseException:
+        _discard([search, rag, web])
+        raise
+
+
 def _generate_option(
     fridge_input: FridgeInput,
     cuisine_hint: str,
@@ -147,100 +332,327 @@ def _generate_option(
     )
 
 
-def _planner_node(state: GraphState) -> GraphState:
-    fridge_input = state["fridge_input"]
-    cuisine_hint = state["cuisine_hint"]
-    context = (state.get("rag_context") or []) + (state.get("search_context") or [])
+_PLANNER_VARIANTS = ["Quick", "Herby", "Spicy"]
+_PLANNER_PROMPT = (
+    "Create a concise weeknight recipe option as JSON with keys: "
+    "title (string), ingredients (array of strings), steps (array of strings), "
+    "time_minutes (number), difficulty (string). "
+    "Use the provided ingredients. Keep it under 30 minutes. "
+    "Return only valid JSON."
+)
 
-    llm = _get_llm()
-    if llm:
-        try:
-            prompt = (
-                "Create a concise weeknight recipe option as JSON with keys: "
-                "title (string), ingredients (array of strings), steps (array of strings), "
-                "time_minutes (number), difficulty (string). "
-                "Use the provided ingredients. Keep it under 30 minutes. "
-                "Return only valid JSON."
+
+def _planner_messages(
+    fridge_input: FridgeInput,
+    cuisine_hint: str,
+    context: List[str],
+    variant: str,
+) -> list:
+    return [
+        SystemMessage(content=_PLANNER_PROMPT),
+        HumanMessage(
+            content=(
+                f"Ingredients: {fridge_input.model_dump()} | "
+                f"Cuisine mood: {cuisine_hint} | Variant: {variant} | "
+                f"Context: {context[:2]}"
             )
-            variants = ["Quick", "Herby", "Spicy"]
-            options: List[RecipeOption] = []
-            for variant in variants:
-                messages = [
-                    SystemMessage(content=prompt),
-                    HumanMessage(
-                        content=(
-                            f"Ingredients: {fridge_input.model_dump()} | "
-                            f"Cuisine mood: {cuisine_hint} | Variant: {variant} | "
-                            f"Context: {context[:2]}"
-                        )
-                    ),
-                ]
-                with start_span(
-                    "planner_llm",
-                    OpenInferenceSpanKindValues.LLM,
-                    input_value=str(messages),
-                ) as span:
-                    response = llm.invoke(messages).content or ""
-                    if span is not None:
-                        span.set_attribute(SpanAttributes.OUTPUT_VALUE, response)
-                parsed = {}
-                if response:
-                    try:
-                        parsed = json.loads(response)
-                    except json.JSONDecodeError:
-                        parsed = {}
-                title = str(parsed.get("title") or f"{cuisine_hint.title()} {variant} Skillet")
-                ingredients = parsed.get("ingredients")
-                if not isinstance(ingredients, list) or not ingredients:
-                    ingredients = fridge_input.main_vegetables + fridge_input.aromatics + fridge_input.spices
-                steps = parsed.get("steps")
-                if not isinstance(steps, list) or not steps:
-                    steps = ["Combine ingredients and cook until done."]
-                time_minutes = parsed.get("time_minutes")
-                if not isinstance(time_minutes, int):
-                    time_minutes = fridge_input.time_budget_minutes
-                difficulty = str(parsed.get("difficulty") or "easy")
-                options.append(
-                    RecipeOption(
-                        title=title,
-                        cuisine=cuisine_hint,
-                        time_minutes=time_minutes,
-                        difficulty=difficulty,
-                        ingredients=[str(item) for item in ingredients],
-                        steps=[str(step) for step in steps],
-                        notes="AI-generated option.",
-                        source="generated",
-                    )
-                )
-            return {"recipe_options": options}
-        except Exception:
-            # Fall back to local generation when the LLM is unavailable.
-            pass
-
-    variants = ["Quick", "Herby", "Spicy"]
+        ),
+    ]
+
+
+def _planner_json(response: Optional[str]) -> Optional[dict]:
+    # The planner's JSON object, or None when the answer does not parse (such answers are not cached).
+    if not response:
+        return None
+    try:
+        parsed = json.loads(response)
+    except json.JSONDecodeError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+def _parse_planner_option(
+    response: str,
+    fridge_input: FridgeInput,
+    cuisine_hint: str,
+    variant: str,
+) -> RecipeOption:
+    parsed = _planner_json(response) or {}
+    title = str(parsed.get("title") or f"{cuisine_hint.title()} {variant} Skillet")
+    ingredients = parsed.get("ingredients")
+    if not isinstance(ingredients, list) or not ingredients:
+        ingredients = fridge_input.main_vegetables + fridge_input.aromatics + fridge_input.spices
+    steps = parsed.get("steps")
+    if not isinstance(steps, list) or not steps:
+        steps = ["Combine ingredients and cook until done."]
+    time_minutes = parsed.get("time_minutes")
+    if not isinstance(time_minutes, int):
+        time_minutes = fridge_input.time_budget_minutes
+    difficulty = str(parsed.get("difficulty") or "easy")
+    return RecipeOption(
+        title=title,
+        cuisine=cuisine_hint,
+        time_minutes=time_minutes,
+        difficulty=difficulty,
+        ingredients=[str(item) for item in ingredients],
+        steps=[str(step) for step in steps],
+        notes="AI-generated option.",
+        source="generated",
+    )
+
+
+def _planner_cache_key(
+    fridge_input: FridgeInput,
+    cuisine_hint: str,
+    context: List[str],
+    variant: str,
+) -> dict:
+    # Ingredient order and case don't change the answer, so equivalent pantries share it.
+    return {
+        "kind": "planner",
+        "fridge_input": canonical_fridge_input(fridge_input),
+        "cuisine_hint": " ".join(cuisine_hint.lower().split()),
+        "variant": variant,
+        "context": context[:2],
+    }
+
+
+def _plan_variant(
+    llm: ChatOpenAI,
+    fridge_input: FridgeInput,
+    cuisine_hint: str,
+    context: List[str],
+    variant: str,
+    timeout: float,
+) -> RecipeOption:
+    messages = _planner_messages(fridge_input, cuisine_hint, context, variant)
+    normalized = _planner_cache_key(fridge_input, cuisine_hint, context, variant)
+    response = llm_cache.get(llm, messages, normalized)
+    if _planner_json(response) is None:
+        with start_span(
+            "planner_llm",
+            OpenInferenceSpanKindValues.LLM,
+            input_value=str(messages),
+        ) as span:
+            breaker = get_breaker("llm")
+            with llm_limiter.slot(timeout), breaker.attempt():
+                response = llm.invoke(messages, timeout=breaker.timeout(timeout)).content or ""
+            if span is not None:
+                span.set_attribute(SpanAttributes.OUTPUT_VALUE, response)
+        if _planner_json(response) is not None:
+            llm_cache.set(llm, messages, response, normalized)
+    return _parse_planner_option(response, fridge_input, cuisine_hint, variant)
+
+
+async def _aplan_variant(
+    llm: ChatOpenAI,
+    fridge_input: FridgeInput,
+    cuisine_hint: str,
+    context: List[str],
+    variant: str,
+    timeout: float,
+) -> RecipeOption:
+    messages = _planner_messages(fridge_input, cuisine_hint, context, variant)
+    normalized = _planner_cache_key(fridge_input, cuisine_hint, context, variant)
+    response = llm_cache.get(llm, messages, normalized)
+    if _planner_json(response) is None:
+        with start_span(
+            "planner_llm",
+            OpenInferenceSpanKindValues.LLM,
+            input_value=str(messages),
+        ) as span:
+            breaker = get_breaker("llm")
+            async with llm_limiter.aslot(timeout):
+                with breaker.attempt():
+                    response = (await llm.ainvoke(messages, timeout=breaker.timeout(timeout))).content or ""
+            if span is not None:
+                span.set_attribute(SpanAttributes.OUTPUT_VALUE, response)
+        if _planner_json(response) is not None:
+            llm_cache.set(llm, messages, response, normalized)
+    return _parse_planner_option(response, fridge_input, cuisine_hint, variant)
+
+
+def _plan_with_llm(
+    llm: ChatOpenAI,
+    fridge_input: FridgeInput,
+    cuisine_hint: str,
+    context: List[str],
+    on_option: Optional[Callable[[int, RecipeOption], None]] = None,
+    deadline: Optional[Deadline] = None,
+) -> List[Optional[RecipeOption]]:
+    """
+    Run one LLM call per variant concurrently. A variant that errors or misses the
+    timeout (the variant cap, shortened by `deadline`) comes back as None so the caller
+    can fill it locally. `on_option` is called as each variant finishes, in completion order.
+    """
+    timeout = stage_timeout(deadline, settings.planner_variant_timeout_seconds)
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=max(1, min(len(_PLANNER_VARIANTS), settings.planner_max_concurrency)),
+        thread_name_prefix="planner-llm",
+    )
+    try:
+        futures = [
+            # Each call runs in a copy of the current context so tracing spans nest correctly.
+            executor.submit(
+                contextvars.copy_context().run,
+                _plan_variant,
+                llm,
+                fridge_input,
+                cuisine_hint,
+                context,
+                variant,
+                timeout,
+            )
+            for variant in _PLANNER_VARIANTS
+        ]
+        results: List[Optional[RecipeOption]] = [None] * len(futures)
+        positions = {future: index for index, future in enumerate(futures)}
+        try:
+            for future in concurrent.futures.as_completed(futures, timeout=timeout):
+                if future.exception() is not None:
+                    continue
+                index = positions[future]
+                results[index] = future.result()
+                if on_option is not None:
+                    on_option(index, results[index])
+        except concurrent.futures.TimeoutError:
+            for future in futures:
+                future.cancel()
+        return results
+    finally:
+        # Don't block on a straggler; its result is simply dropped.
+        executor.shutdown(wait=False)
+
+
+async def _aplan_with_llm(
+    llm: ChatOpenAI,
+    fridge_input: FridgeInput,
+    cuisine_hint: str,
+    context: List[str],
+    on_option: Optional[Callable[[int, RecipeOption], None]] = None,
+    deadline: Optional[Deadline] = None,
+) -> List[Optional[RecipeOption]]:
+    """
+    Async `_plan_with_llm`: one task per variant on the event loop. Stragglers past the
+    timeout are cancelled rather than left running.
+    """
+    timeout = stage_timeout(deadline, settings.planner_variant_timeout_seconds)
+    semaphore = asyncio.Semaphore(max(1, settings.planner_max_concurrency))
+
+    async def run(index: int, variant: str) -> Tuple[int, Optional[RecipeOption]]:
+        async with semaphore:
+            try:
+                return index, await _aplan_variant(llm, fridge_input, cuisine_hint, context, variant, timeout)
+            except Exception:
+                return index, None
+
+    # Tasks inherit the current context, so tracing spans nest as in the sync path.
+    tasks = [asyncio.create_task(run(index, variant)) for index, variant in enumerate(_PLANNER_VARIANTS)]
+    results: List[Optional[RecipeOption]] = [None] * len(tasks)
+    try:
+        for next_done in asyncio.as_completed(tasks, timeout=timeout):
+            index, option = await next_done
+            if option is None:
+                continue
+            results[index] = option
+            if on_option is not None:
+                on_option(index, option)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+    return results
+
+
+def _emit_option(index: int, option: RecipeOption) -> None:
+    # Streaming clients get each variant as soon as its LLM call returns.
+    get_stream_writer()({"event": "option", "index": index, "option": option})
+
+
+def _fill_planned(
+    planned: List[Optional[RecipeOption]],
+    fridge_input: FridgeInput,
+    cuisine_hint: str,
+    context: List[str],
+) -> List[RecipeOption]:
+    return [
+        option or _generate_option(fridge_input, cuisine_hint, context, variant)
+        for option, variant in zip(planned, _PLANNER_VARIANTS)
+    ]
+
+
+def _plan_locally(fridge_input: FridgeInput, cuisine_hint: str, context: List[str]) -> GraphState:
+    variants = _PLANNER_VARIANTS
     with start_span(
         "planner_local",
         OpenInferenceSpanKindValues.CHAIN,
         input_value=fridge_input.model_dump_json(),
     ) as span:
-        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-            futures = [
-                executor.submit(_generate_option, fridge_input, cuisine_hint, context, variant)
-                for variant in variants
-            ]
-            options = [future.result() for future in futures]
+        options = [_generate_option(fridge_input, cuisine_hint, context, variant) for variant in variants]
         if span is not None:
             span.set_attribute(SpanAttributes.OUTPUT_VALUE, f"{len(options)} options")
         return {"recipe_options": options}
 
 
+def _planner_result(
+    state: GraphState,
+    planned: Optional[List[Optional[RecipeOption]]],
+    fridge_input: FridgeInput,
+    cuisine_hint: str,
+    context: List[str],
+) -> GraphState:
+    # `planned` is None when the LLM was not called at all.
+    if planned and any(planned):
+        update: GraphState = {"recipe_options": _fill_planned(planned, fridge_input, cuisine_hint, context)}
+    else:
+        # Fall back to local generation when the LLM is unavailable.
+        update = _plan_locally(fridge_input, cuisine_hint, context)
+    if (planned is None or not all(planned)) and _out_of_time(state):
+        return _with_error(state, update, "planner")
+    return update
+
+
+def _planner_node(state: GraphState) -> GraphState:
+    fridge_input = state["fridge_input"]
+    cuisine_hint = state["cuisine_hint"]
+    context = (state.get("rag_context") or []) + (state.get("search_context") or [])
+
+    planned = None
+    llm = _get_llm()
+    # An open LLM circuit goes straight to local generation.
+    if llm and not _out_of_time(state) and get_breaker("llm").available():
+        planned = _plan_with_llm(
+            llm, fridge_input, cuisine_hint, context, on_option=_emit_option, deadline=state.get("deadline")
+        )
+    return _planner_result(state, planned, fridge_input, cuisine_hint, context)
+
+
+async def _aplanner_node(state: GraphState) -> GraphState:
+    fridge_input = state["fridge_input"]
+    cuisine_hint = state["cuisine_hint"]
+    context = (state.get("rag_context") or []) + (state.get("search_context") or [])
+
+    planned = None
+    llm = _get_llm()
+    # An open LLM circuit goes straight to local generation.
+    if llm and not _out_of_time(state) and get_breaker("llm").available():
+        planned = await _aplan_with_llm(
+            llm, fridge_input, cuisine_hint, context, on_option=_emit_option, deadline=state.get("deadline")
+        )
+    return _planner_result(state, planned, fridge_input, cuisine_hint, context)
+
+
 def _critic_node(state: GraphState) -> GraphState:
     with start_span(
         "critic",
         OpenInferenceSpanKindValues.CHAIN,
     ) as span:
         options = state.get("recipe_options", [])
-        options = sorted(options, key=lambda o: o.time_minutes)
+        # Catalog options arrive ranked by pantry coverage, and the shopping list comes from the
+        # first one; only unranked sources are reordered by time.
+        if not any(o.source == "local" for o in options):
+            options = sorted(options, key=lambda o: o.time_minutes)
         if span is not None:
             span.set_attribute(SpanAttributes.OUTPUT_VALUE, f"{len(options)} options")
         return {"recipe_options": options}
@@ -269,6 +681,10 @@ def _route_after_recipe_search(state: GraphState) -> str:
     return "planner"
 
 
+def _route_after_retrieve(state: GraphState) -> str:
+    return "critic" if state.get("recipe_options") else "planner"
+
+
 def _route_after_rag(state: GraphState) -> str:
     if settings.force_llm:
         return "planner"
@@ -285,15 +701,22 @@ def _route_after_web_search(state: GraphState) -> str:
     return "planner"
 
 
+def _io_node(name: str, func: Callable[[GraphState], GraphState], afunc: Callable[..., Any]) -> RunnableLambda:
+    # `graph.invoke` runs `func`; `graph.ainvoke`/`astream` await `afunc` on the event loop.
+    return RunnableLambda(func, afunc=afunc, name=name)
+
+
 def build_graph() -> StateGraph:
     _configure_tracing()
     graph = StateGraph(GraphState)
     graph.add_node("intake", _intake_node)
     graph.add_node("cuisine", _cuisine_mood_node)
-    graph.add_node("recipe_search", _recipe_search_node)
-    graph.add_node("rag", _rag_node)
-    graph.add_node("web_search", _web_search_node)
-    graph.add_node("planner", _planner_node)
+    graph.add_node("recipe_search", _io_node("recipe_search", _recipe_search_node, _arecipe_search_node))
+    graph.add_node("rag", _io_node("rag", _rag_node, _arag_node))
+    graph.add_node("web_search", _io_node("web_search", _web_search_node, _aweb_search_node))
+    graph.add_node("planner", _io_node("planner", _planner_node, _aplanner_node))
+    if settings.speculative_retrieval and not settings.force_llm:
+        graph.add_node("retrieve", _io_node("retrieve", _retrieve_node, _aretrieve_node))
     graph.add_node("critic", _critic_node)
     graph.add_node("finalizer", _finalizer_node)
 
@@ -301,6 +724,13 @@ def build_graph() -> StateGraph:
     graph.add_edge("intake", "cuisine")
     if settings.force_llm:
         graph.add_edge("cuisine", "planner")
+    elif settings.speculative_retrieval:
+        graph.add_edge("cuisine", "retrieve")
+        graph.add_conditional_edges(
+            "retrieve",
+            _route_after_retrieve,
+            {"critic": "critic", "planner": "planner"},
+        )
     else:
         graph.add_edge("cuisine", "recipe_search")
         graph.add_conditional_edges(
@@ -325,22 +755,179 @@ def build_graph() -> StateGraph:
     return graph.compile()
 
 
-def run_recipe_graph(fridge_input: FridgeInput) -> RecipeResponse:
+# Compiled graphs are reused across requests. The key captures every setting that
+# changes the graph topology or routing, so a config reload picks up a fresh graph.
+_GRAPH_CACHE: dict[Tuple[Any, ...], Any] = {}
+_GRAPH_LOCK = threading.Lock()
+
+
+def routing_settings_key() -> Tuple[Any, ...]:
+    # Settings that decide which nodes run and therefore what a request returns.
+    return (
+        settings.force_llm,
+        settings.rag_enabled,
+        settings.web_search_enabled,
+        settings.recipe_source_enabled,
+        settings.recipe_source_provider.lower().strip(),
+    )
+
+
+def _graph_cache_key() -> Tuple[Any, ...]:
+    return routing_settings_key() + (
+        settings.speculative_retrieval,
+        settings.langchain_tracing_v2,
+        settings.langchain_project,
+        settings.langsmith_api_key,
+    )
+
+
+def get_compiled_graph():
+    """
+    Return the compiled graph for the current settings, compiling it on first use.
+    """
+    key = _graph_cache_key()
+    graph = _GRAPH_CACHE.get(key)
+    if graph is not None:
+        return graph
+    with _GRAPH_LOCK:
+        graph = _GRAPH_CACHE.get(key)
+        if graph is None:
+            graph = build_graph()
+            _GRAPH_CACHE[key] = graph
+        return graph
+
+
+def invalidate_graph_cache() -> None:
+    """
+    Drop all compiled graphs. Call after mutating `settings` (e.g. a config reload).
+    """
+    with _GRAPH_LOCK:
+        _GRAPH_CACHE.clear()
+
+
+# Concurrent requests for the same (canonical) fridge contents share one graph run.
+_inflight = SingleFlight()
+
+
+def inflight_stats() -> dict:
+    return _inflight.stats()
+
+
+def _inflight_key(fridge_input: FridgeInput) -> str:
+    return f"{fridge_input_key(fridge_input)}:{routing_settings_key()}"
+
+
+def _to_response(options: List[RecipeOption], errors: Optional[List[str]] = None) -> RecipeResponse:
+    shopping_list = list(options[0].missing_ingredients) if options else []
+    return RecipeResponse(options=options, shopping_list=shopping_list, degraded=bool(errors))
+
+
+def _initial_state(fridge_input: FridgeInput, deadline: Optional[Deadline]) -> GraphState:
+    state: GraphState = {"fridge_input": fridge_input}
+    if deadline is not None:
+        state["deadline"] = deadline
+    return state
+
+
+def _invoke_graph(fridge_input: FridgeInput, deadline: Optional[Deadline] = None) -> RecipeResponse:
     with start_span(
         "recipe_graph",
         OpenInferenceSpanKindValues.AGENT,
         input_value=fridge_input.model_dump_json(),
     ) as span:
-        if settings.force_llm:
-            state: GraphState = {"fridge_input": fridge_input}
-            state.update(_intake_node(state))
-            state.update(_cuisine_mood_node(state))
-            state.update(_planner_node(state))
-            state.update(_critic_node(state))
-        else:
-            graph = build_graph()
-            state = graph.invoke({"fridge_input": fridge_input})
+        graph = get_compiled_graph()
+        state = graph.invoke(_initial_state(fridge_input, deadline))
+        options = state.get("recipe_options", [])
+        if span is not None:
+            span.set_attribute(SpanAttributes.OUTPUT_VALUE, f"{len(options)} options")
+        return _to_response(options, state.get("errors"))
+
+
+async def _ainvoke_graph(fridge_input: FridgeInput, deadline: Optional[Deadline] = None) -> RecipeResponse:
+    with start_span(
+        "recipe_graph",
+        OpenInferenceSpanKindValues.AGENT,
+        input_value=fridge_input.model_dump_json(),
+    ) as span:
+        graph = get_compiled_graph()
+        state = await graph.ainvoke(_initial_state(fridge_input, deadline))
         options = state.get("recipe_options", [])
         if span is not None:
             span.set_attribute(SpanAttributes.OUTPUT_VALUE, f"{len(options)} options")
-        return RecipeResponse(options=options)
+        return _to_response(options, state.get("errors"))
+
+
+def run_recipe_graph(fridge_input: FridgeInput, deadline: Optional[Deadline] = None) -> RecipeResponse:
+    """
+    Run the recipe graph. With a `deadline`, slow stages are cut short and fall back to
+    local generation so the call returns in time (the response is then marked `degraded`).
+    Concurrent identical requests share one run, and with it the first caller's deadline.
+    """
+    response = _inflight.do(_inflight_key(fridge_input), lambda: _invoke_graph(fridge_input, deadline))
+    # Every caller gets its own copy, since endpoints attach per-request fields.
+    return response.model_copy(deep=True)
+
+
+async def _admitted_ainvoke(fridge_input: FridgeInput, deadline: Optional[Deadline]) -> RecipeResponse:
+    # Only the single-flight leader takes a pipeline slot; coalesced followers just wait on it.
+    async with admission.admit(deadline.timeout() if deadline is not None else None):
+        return await _ainvoke_graph(fridge_input, deadline)
+
+
+async def arun_recipe_graph(fridge_input: FridgeInput, deadline: Optional[Deadline] = None) -> RecipeResponse:
+    """
+    Async `run_recipe_graph`, behind admission control: raises `Overloaded` when no
+    pipeline slot frees up within the queue timeout.
+    """
+    response = await _inflight.do_async(
+        _inflight_key(fridge_input), lambda: _admitted_ainvoke(fridge_input, deadline)
+    )
+    return response.model_copy(deep=True)
+
+
+def local_recipe_response(fridge_input: FridgeInput) -> RecipeResponse:
+    """
+    Cheap answer without providers or the LLM (used when the pipeline is saturated):
+    the same defaults as intake/cuisine, then local generation. Marked `degraded`.
+    """
+    fridge_input = fridge_input.model_copy(deep=True)
+    if fridge_input.time_budget_minutes <= 0:
+        fridge_input.time_budget_minutes = 30
+    if fridge_input.servings <= 0:
+        fridge_input.servings = 2
+    cuisine_hint = fridge_input.cuisine_mood.strip() or "quick and comforting"
+    options = _plan_locally(fridge_input, cuisine_hint, [])["recipe_options"]
+    response = _to_response(sorted(options, key=lambda o: o.time_minutes))
+    response.degraded = True
+    return response
+
+
+async def astream_recipe_graph(
+    fridge_input: FridgeInput, deadline: Optional[Deadline] = None
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Run the graph and yield `(event, payload)` pairs as work completes:
+    `("node", name)` per finished node, `("option", {"index", "option"})` for each provider
+    result or generated variant, then `("done", RecipeResponse)` with the final ordering.
+    """
+    graph = get_compiled_graph()
+    options: List[RecipeOption] = []
+    errors: List[str] = []
+    async with admission.admit(deadline.timeout() if deadline is not None else None):
+        async for mode, chunk in graph.astream(
+            _initial_state(fridge_input, deadline), stream_mode=["updates", "custom"]
+        ):
+            if mode == "custom":
+                if chunk.get("event") == "option":
+                    yield "option", {"index": chunk["index"], "option": chunk["option"]}
+                continue
+            for node, update in chunk.items():
+                yield "node", node
+                # Recorded errors accumulate, so the latest list is the complete one.
+                errors = (update or {}).get("errors") or errors
+                if node in ("recipe_search", "retrieve"):
+                    for index, option in enumerate((update or {}).get("recipe_options") or []):
+                        yield "option", {"index": index, "option": option}
+                if node == "critic":
+                    options = (update or {}).get("recipe_options") or []
+    yield "done", _to_response(options, errors)
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from typing import Iterable, List
+
+from .models import FridgeInput
+
+_NON_WORD = re.compile(r"[^a-z0-9\s-]+")
+_SPACES = re.compile(r"\s+")
+_WORD = re.compile(r"[a-z0-9]+")
+# Words that look plural but are not (or whose singular is not what a cook types).
+_KEEP_S = ("ss", "us", "is")
+
+
+def _singular(word: str) -> str:
+    if len(word) <= 3 or word.endswith(_KEEP_S):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes", "xes")):
+        return word[:-2]
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def normalize_ingredient(name: str) -> str:
+    """
+    Canonical form of an ingredient name: lowercase, no punctuation, single spaces,
+    last word singularized ("Red Onions" -> "red onion").
+    """
+    cleaned = _SPACES.sub(" ", _NON_WORD.sub(" ", (name or "").lower())).strip()
+    if not cleaned:
+        return ""
+    words = cleaned.split(" ")
+    words[-1] = _singular(words[-1])
+    return " ".join(words)
+
+
+def ingredient_tokens(text: str) -> List[str]:
+    """
+    Lowercase alphanumeric words of `text`, each singularized like the last word of
+    `normalize_ingredient` ("Roasted Tomatoes" -> ["roasted", "tomato"]).
+    """
+    return [_singular(word) for word in _WORD.findall((text or "").lower())]
+
+
+def normalize_ingredients(names: Iterable[str]) -> List[str]:
+    # Normalized, de-duplicated, first occurrence wins.
+    seen: set[str] = set()
+    out: List[str] = []
+    for name in names:
+        key = normalize_ingredient(name)
+        if key and key not in seen:
+            seen.add(key)
+            out.append(key)
+    return out
+
+
+def pantry_ingredients(fridge_input: FridgeInput) -> List[str]:
+    # Most salient first: proteins, then vegetables, aromatics and spices.
+    return normalize_ingredients(
+        fridge_input.proteins
+        + fridge_input.main_vegetables
+        + fridge_input.aromatics
+        + fridge_input.spices
+    )
+
+
+# Assumed to be in every kitchen; never counted as missing.
+PANTRY_STAPLES = frozenset({"salt", "water", "pepper", "black pepper", "oil", "olive oil", "vegetable oil"})
+
+_MEAT = {
+    "beef", "pork", "chicken", "lamb", "bacon", "ham", "sausage", "turkey", "duck", "veal", "mince",
+    "chorizo", "prosciutto", "salami", "goat", "venison", "fish", "salmon", "tuna", "cod", "haddock",
+    "prawn", "shrimp", "anchovy", "crab", "lobster", "mussel", "clam", "squid", "oyster", "gelatine",
+}
+_ANIMAL = _MEAT | {"milk", "cheese", "butter", "cream", "yogurt", "egg", "honey", "ghee", "parmesan", "mozzarella"}
+_GLUTEN = {"flour", "bread", "pasta", "spaghetti", "noodle", "couscous", "barley", "wheat", "breadcrumb", "soy sauce"}
+_DAIRY = {"milk", "cheese", "butter", "cream", "yogurt", "ghee", "parmesan", "mozzarella", "cheddar", "feta"}
+_HIGH_CARB = {"sugar", "rice", "pasta", "spaghetti", "bread", "potato", "flour", "noodle", "couscous", "honey"}
+
+# Dietary label -> words that rule an ingredient out (matched against normalized name words).
+DIETARY_EXCLUSIONS: dict[str, frozenset[str]] = {
+    "vegetarian": frozenset(_MEAT),
+    "vegan": frozenset(_ANIMAL),
+    "gluten-free": frozenset(_GLUTEN),
+    "dairy-free": frozenset(_DAIRY),
+    "keto": frozenset(_HIGH_CARB),
+    "low-carb": frozenset(_HIGH_CARB),
+}
+
+
+_PLANT_BASED = frozenset(
+    {"coconut milk", "coconut cream", "almond milk", "oat milk", "soy milk", "peanut butter", "almond butter"}
+)
+
+
+def violates_dietary(name: str, excluded: frozenset[str]) -> bool:
+    # `name` is normalized; multi-word exclusions ("soy sauce") match as substrings.
+    if name in _PLANT_BASED:
+        return False
+    words = set(name.split(" "))
+    return any(term in words or (" " in term and term in name) for term in excluded)
+
+
+def _canonical_list(values: Iterable[str]) -> List[str]:
+    return sorted({" ".join(value.lower().split()) for value in values if value and value.strip()})
+
+
+def canonical_fridge_input(fridge_input: FridgeInput) -> dict:
+    """
+    Order- and case-insensitive view of a FridgeInput, with the same defaults the intake node applies.
+    """
+    return {
+        "main_vegetables": _canonical_list(fridge_input.main_vegetables),
+        "aromatics": _canonical_list(fridge_input.aromatics),
+        "spices": _canonical_list(fridge_input.spices),
+        "proteins": _canonical_list(fridge_input.proteins),
+        "dietary": _canonical_list(fridge_input.dietary),
+        "equipment": _canonical_list(fridge_input.equipment),
+        "cuisine_mood": " ".join(fridge_input.cuisine_mood.lower().split()) or "quick and comforting",
+        "time_budget_minutes": fridge_input.time_budget_minutes if fridge_input.time_budget_minutes > 0 else 30,
+        "servings": fridge_input.servings if fridge_input.servings > 0 else 2,
+    }
+
+
+def fridge_input_key(fridge_input: FridgeInput) -> str:
+    payload = json.dumps(canonical_fridge_input(fridge_input), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import heapq
+import math
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from .ingredients import ingredient_tokens
+
+# Template words of RAG queries ("{cuisine} recipes with {vegetables}") and glue words.
+_STOPWORDS = frozenset(
+    "a an and any for in of on or recipe recipes some the to with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in ingredient_tokens(text) if token not in _STOPWORDS]
+
+
+@dataclass(frozen=True, slots=True)
+class LexicalHit:
+    id: str
+    text: str
+    score: float
+    coverage: float  # share of the query's IDF weight this document matches; 1.0 = every term
+
+
+class LexicalIndex:
+    """
+    BM25 index over the RAG chunks, stored in SQLite next to the Chroma store. Documents
+    (id, text, length) and postings (term -> document position, term frequency) stay on
+    disk, so memory does not grow with the corpus: a query reads the postings of its own
+    terms and the texts of the hits it returns.
+    """
+
+    def __init__(self, path: Path, k1: float = 1.5, b: float = 0.75) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "position INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE, text TEXT NOT NULL, length INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS postings ("
+            "term TEXT NOT NULL, position INTEGER NOT NULL, tf INTEGER NOT NULL, "
+            "PRIMARY KEY (term, position)) WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS postings_position ON postings (position)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS totals (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        totals = dict(self._conn.execute("SELECT name, value FROM totals").fetchall())
+        self._count = totals.get("documents", 0)
+        self._total_length = totals.get("length", 0)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, doc_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM documents WHERE id = ?", (doc_id,)).fetchone() is not None
+
+    def add(self, doc_id: str, text: str) -> bool:
+        return self.add_many([(doc_id, text)]) == 1
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        # Caller holds `_lock`. Totals are written with the rows they describe.
+        count, total_length = self._count, self._total_length
+        self._conn.execute("BEGIN")
+        try:
+            yield
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO totals (name, value) VALUES (?, ?)",
+                [("documents", self._count), ("length", self._total_length)],
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            self._count, self._total_length = count, total_length
+            raise
+
+    def _remove(self, position: int, length: int) -> None:
+        self._conn.execute("DELETE FROM postings WHERE position = ?", (position,))
+        self._conn.execute("DELETE FROM documents WHERE position = ?", (position,))
+        self._count -= 1
+        self._total_length -= length
+
+    def add_many(self, documents: Iterable[Tuple[str, str]]) -> int:
+        """
+        Insert or replace documents by id, in one transaction (ingestion adds a batch at a
+        time). Returns how many were new or changed; an id whose text is unchanged is skipped.
+        """
+        changed = 0
+        with self._lock, self._transaction():
+            for doc_id, text in documents:
+                row = self._conn.execute(
+                    "SELECT position, text, length FROM documents WHERE id = ?", (doc_id,)
+                ).fetchone()
+                if row is not None:
+                    if row[1] == text:
+                        continue
+                    self._remove(row[0], row[2])
+                tokens = tokenize(text)
+                position = self._conn.execute(
+                    "INSERT INTO documents (id, text, length) VALUES (?, ?, ?)", (doc_id, text, len(tokens))
+                ).lastrowid
+                counts: Dict[str, int] = {}
+                for token in tokens:
+                    counts[token] = counts.get(token, 0) + 1
+                self._conn.executemany(
+                    "INSERT INTO postings (term, position, tf) VALUES (?, ?, ?)",
+                    [(token, position, tf) for token, tf in counts.items()],
+                )
+                self._count += 1
+                self._total_length += len(tokens)
+                changed += 1
+        return changed
+
+    def delete_many(self, doc_ids: Iterable[str]) -> int:
+        removed = 0
+        with self._lock, self._transaction():
+            for doc_id in doc_ids:
+                row = self._conn.execute("SELECT position, length FROM documents WHERE id = ?", (doc_id,)).fetchone()
+                if row is not None:
+                    self._remove(*row)
+                    removed += 1
+        return removed
+
+    def clear(self) -> None:
+        with self._lock, self._transaction():
+            for table in ("documents", "postings", "totals"):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._count = self._total_length = 0
+
+    def _idf(self, df: int) -> float:
+        n = self._count
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, top_k: int = 4) -> List[LexicalHit]:
+        terms = set(tokenize(query))
+        if not terms or not self._count:
+            return []
+        avg_length = self._total_length / self._count or 1.0
+        k1, b = self.k1, self.b
+        scores: Dict[int, float] = {}
+        matched: Dict[int, float] = {}
+        query_weight = 0.0
+        with self._lock:
+            for term in terms:
+                postings = self._conn.execute(
+                    "SELECT p.position, p.tf, d.length FROM postings p "
+                    "JOIN documents d ON d.position = p.position WHERE p.term = ?",
+                    (term,),
+                ).fetchall()
+                # Unknown terms still count against coverage, with the rarest possible IDF.
+                idf = self._idf(len(postings))
+                query_weight += idf
+                for position, tf, length in postings:
+                    norm = tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / avg_length))
+                    scores[position] = scores.get(position, 0.0) + idf * norm
+                    matched[position] = matched.get(position, 0.0) + idf
+            best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+            if not best:
+                return []
+            placeholders = ",".join("?" * len(best))
+            rows = self._conn.execute(
+                f"SELECT position, id, text FROM documents WHERE position IN ({placeholders})",
+                [position for position, _ in best],
+            ).fetchall()
+        documents = {position: (doc_id, text) for position, doc_id, text in rows}
+        return [
+            LexicalHit(*documents[position], score, matched[position] / query_weight)
+            for position, score in best
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def iter_collection(collection, page_size: int = 1000) -> Iterator[Tuple[str, str]]:
+    # (id, document) pairs of a Chroma collection, a page at a time.
+    offset = 0
+    while True:
+        page = collection.get(limit=page_size, offset=offset, include=["documents"])
+        ids = page.get("ids") or []
+        if not ids:
+            return
+        for doc_id, text in zip(ids, page.get("documents") or []):
+            if text:
+                yield doc_id, text
+        offset += len(ids)
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[str]], k: int = 60) -> List[str]:
+    """
+    Merge ranked id lists: each id scores sum(1 / (k + rank)) over the lists it appears in.
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=scores.__getitem__, reverse=True)
+
+
+def lexical_path(chroma_path: Path, collection: str) -> Path:
+    return chroma_path / f"{collection}.lexical.sqlite"
+
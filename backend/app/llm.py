@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+from typing import Dict, Optional, Tuple
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+from .config import settings
+
+_ModelKey = Tuple[str, float, Optional[str], str]
+
+# One ChatOpenAI per (model, temperature, endpoint, key), all sharing the same keep-alive pools.
+# An `httpx.AsyncClient` is bound to the event loop that first uses it, so models requested
+# inside a running loop get that loop's async pool (like `ProviderClient._loop_state`).
+_MODELS: Dict[_ModelKey, ChatOpenAI] = {}
+_LOOP_MODELS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[_ModelKey, ChatOpenAI]]" = (
+    weakref.WeakKeyDictionary()
+)
+_LOCK = threading.Lock()
+_HTTP_CLIENT: Optional[httpx.Client] = None
+_ASYNC_HTTP_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.llm_max_connections,
+        max_keepalive_connections=settings.llm_max_keepalive_connections,
+    )
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _http_clients(loop: Optional[asyncio.AbstractEventLoop]) -> Tuple[httpx.Client, Optional[httpx.AsyncClient]]:
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
+        _HTTP_CLIENT = httpx.Client(limits=_limits(), timeout=settings.llm_timeout_seconds)
+    if loop is None:
+        return _HTTP_CLIENT, None
+    async_client = _ASYNC_HTTP_CLIENTS.get(loop)
+    if async_client is None:
+        async_client = httpx.AsyncClient(limits=_limits(), timeout=settings.llm_timeout_seconds)
+        _ASYNC_HTTP_CLIENTS[loop] = async_client
+    return _HTTP_CLIENT, async_client
+
+
+def get_chat_model(model: Optional[str] = None, temperature: float = 0.4) -> Optional[ChatOpenAI]:
+    """
+    Shared chat model for `model`/`temperature`, or None when no API key is configured.
+    The returned client supports `invoke`; call `ainvoke` only on a model obtained inside
+    the running event loop, since its async pool belongs to that loop.
+    """
+    if not settings.openai_api_key:
+        return None
+    model = model or settings.openai_model
+    key = (model, temperature, settings.openai_base_url, settings.openai_api_key)
+    loop = _running_loop()
+    models = _MODELS if loop is None else _LOOP_MODELS.get(loop, {})
+    llm = models.get(key)
+    if llm is not None:
+        return llm
+    with _LOCK:
+        models = _MODELS if loop is None else _LOOP_MODELS.setdefault(loop, {})
+        llm = models.get(key)
+        if llm is None:
+            http_client, http_async_client = _http_clients(loop)
+            llm = ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                api_key=settings.openai_api_key,
+                base_url=settings.openai_base_url or None,
+                timeout=settings.llm_timeout_seconds,
+                http_client=http_client,
+                http_async_client=http_async_client,
+            )
+            models[key] = llm
+        return llm
+
+
+def reset_llm_clients() -> None:
+    """
+    Drop cached models and close the shared pools (e.g. after a config reload).
+    """
+    global _HTTP_CLIENT
+    with _LOCK:
+        _MODELS.clear()
+        _LOOP_MODELS.clear()
+        if _HTTP_CLIENT is not None:
+            _HTTP_CLIENT.close()
+        # The async pools are bound to their event loops; let them be garbage-collected.
+        _HTTP_CLIENT = None
+        _ASYNC_HTTP_CLIENTS.clear()
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from .cache import build_cache, make_cache_key
+from .config import settings
+
+
+def _model_id(llm: Any) -> dict:
+    # The endpoint is part of the identity: a stub or proxy may serve the same model name.
+    return {
+        "base_url": getattr(llm, "openai_api_base", None),
+        "model": getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__,
+        "temperature": getattr(llm, "temperature", None),
+    }
+
+
+class LLMCache:
+    """
+    Two-tier cache of LLM completions:
+    - exact: the full message list, byte for byte;
+    - normalized: a caller-supplied canonical form of the prompt (e.g. sorted, lowercased
+      ingredients), so trivially different prompts share an answer.
+    """
+
+    def __init__(self) -> None:
+        self._cache = build_cache(
+            max_entries=settings.llm_cache_max_entries,
+            ttl_seconds=settings.llm_cache_ttl_seconds,
+            db_path=settings.llm_cache_db_path,
+            table="llm_responses",
+        )
+        self.exact_hits = 0
+        self.normalized_hits = 0
+        self.misses = 0
+
+    def _exact_key(self, llm: Any, messages: list) -> str:
+        payload = _model_id(llm)
+        payload["messages"] = [[message.type, str(message.content)] for message in messages]
+        return make_cache_key("llm-exact", payload)
+
+    def _normalized_key(self, llm: Any, normalized: dict) -> str:
+        payload = _model_id(llm)
+        payload["prompt"] = normalized
+        return make_cache_key("llm-normalized", payload)
+
+    def get(self, llm: Any, messages: list, normalized: Optional[dict] = None) -> Optional[str]:
+        if not settings.llm_cache_enabled:
+            return None
+        content = self._cache.get(self._exact_key(llm, messages))
+        if content is not None:
+            self.exact_hits += 1
+            return content
+        if normalized is not None:
+            content = self._cache.get(self._normalized_key(llm, normalized))
+            if content is not None:
+                self.normalized_hits += 1
+                return content
+        self.misses += 1
+        return None
+
+    def set(self, llm: Any, messages: list, content: str, normalized: Optional[dict] = None) -> None:
+        if not settings.llm_cache_enabled or not content:
+            return
+        self._cache.set(self._exact_key(llm, messages), content)
+        if normalized is not None:
+            self._cache.set(self._normalized_key(llm, normalized), content)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.exact_hits + self.normalized_hits + self.misses
+        return {
+            "exact_hits": self.exact_hits,
+            "normalized_hits": self.normalized_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.exact_hits + self.normalized_hits) / lookups, 4) if lookups else None,
+            "store": self._cache.stats(),
+        }
+
+
+llm_cache = LLMCache()
@@ -0,0 +1,61 @@
+"""
+Minimal OpenAI-compatible chat completions server for local testing and benchmarks.
+
+Run from `backend/`:
+    uvicorn app.llm_stub:app --port 8001
+and point the app at it with OPENAI_BASE_URL=http://127.0.0.1:8001/v1 and any OPENAI_API_KEY.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import re
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+
+app = FastAPI(title="OpenAI stub")
+
+# Simulated model latency, e.g. LLM_STUB_LATENCY_MS=400 to mimic a real round-trip.
+_LATENCY_SECONDS = float(os.environ.get("LLM_STUB_LATENCY_MS", "0")) / 1000
+
+
+def _reply_for(messages: list) -> str:
+    last = str((messages or [{}])[-1].get("content") or "")
+    if "Missing info" in last:
+        return "What ingredients do you have in your fridge?"
+    match = re.search(r"Variant: (\w+)", last)
+    variant = match.group(1) if match else "Quick"
+    return json.dumps(
+        {
+            "title": f"Stub {variant} Stir-Fry",
+            "ingredients": ["stub vegetables", "garlic", "soy sauce"],
+            "steps": ["Prep everything.", f"Cook it the {variant.lower()} way.", "Serve."],
+            "time_minutes": 20,
+            "difficulty": "easy",
+        }
+    )
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request) -> dict:
+    body = await request.json()
+    if _LATENCY_SECONDS:
+        await asyncio.sleep(_LATENCY_SECONDS)
+    content = _reply_for(body.get("messages") or [])
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
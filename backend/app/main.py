@@ -1,19 +1,23 @@
 from __future__ import annotations
 
-from typing import List
-import re
+from typing import Any, AsyncIterator, List, Optional
+import asyncio
+import json
 
 from pathlib import Path
 
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
+from .chat_parser import apply_message
 from .config import settings
+from .deadline import Deadline, request_deadline
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from .graph import run_recipe_graph, _get_llm
+from .admission import Overloaded, admission, admission_stats, llm_limiter
+from .graph import arun_recipe_graph, astream_recipe_graph, inflight_stats, local_recipe_response, _get_llm
 from .models import (
     ChatTurnRequest,
     ChatTurnResponse,
@@ -21,6 +25,13 @@ from .models import (
     RecipeChoiceRequest,
     RecipeResponse,
 )
+from .llm_cache import llm_cache
+from .rag import rag_retrieval_stats, rag_status, warm_up_rag
+from .resilience import breaker_stats, get_breaker
+from .response_cache import response_cache
+from .sessions import build_session_from_options, option_sessions
+from .tools.recipe_search import provider_cache_stats
+from .tools.web_search import start_prefetch, stop_prefetch, web_search_stats
 from .tracing import setup_tracing, start_span, tracing_status
 from openinference.semconv.trace import OpenInferenceSpanKindValues, SpanAttributes
 
@@ -34,6 +45,13 @@ templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 @app.on_event("startup")
 def _startup() -> None:
     setup_tracing()
+    warm_up_rag()
+    start_prefetch()
+
+
+@app.on_event("shutdown")
+def _shutdown() -> None:
+    stop_prefetch()
 
 
 @app.middleware("http")
@@ -61,7 +79,8 @@ def index(request: Request) -> HTMLResponse:
 
 @app.get("/healthz")
 def health_check() -> dict:
-    return {"status": "ok"}
+    # Liveness is "ok" as soon as the app serves; `rag.ready` flips once the model is loaded.
+    return {"status": "ok", "rag": rag_status()}
 
 
 @app.get("/debug/tracing")
@@ -71,116 +90,121 @@ def debug_tracing() -> dict:
     return tracing_status()
 
 
-@app.post("/api/recipes/options", response_model=RecipeResponse)
-def recipe_options(fridge_input: FridgeInput) -> RecipeResponse:
-    return run_recipe_graph(fridge_input)
-
-
-@app.post("/api/recipes/choose", response_model=RecipeResponse)
-def choose_recipe(request: RecipeChoiceRequest) -> RecipeResponse:
-    response = run_recipe_graph(request.fridge_input)
-    options = response.options
-    if not options:
-        raise HTTPException(status_code=404, detail="No recipe options available.")
+@app.get("/debug/breakers")
+def debug_breakers() -> dict:
+    if settings.app_env != "dev":
+        raise HTTPException(status_code=404, detail="Not found")
+    return breaker_stats()
 
-    selected = None
-    try:
-        index = int(request.option_id)
-        if 0 <= index < len(options):
-            selected = options[index]
-    except ValueError:
-        for option in options:
-            if option.title.lower() == request.option_id.lower():
-                selected = option
-                break
 
-    if not selected:
-        raise HTTPException(status_code=404, detail="Selected recipe not found.")
+@app.get("/debug/admission")
+def debug_admission() -> dict:
+    if settings.app_env != "dev":
+        raise HTTPException(status_code=404, detail="Not found")
+    return admission_stats()
 
-    return RecipeResponse(options=options, selected=selected)
 
+@app.get("/debug/cache")
+def debug_cache() -> dict:
+    if settings.app_env != "dev":
+        raise HTTPException(status_code=404, detail="Not found")
+    return {
+        "providers": provider_cache_stats(),
+        "responses": response_cache.stats(),
+        "option_sessions": option_sessions.stats(),
+        "llm": llm_cache.stats(),
+        "web_search": web_search_stats(),
+        "rag": rag_retrieval_stats(),
+        "coalescing": inflight_stats(),
+    }
 
-def _last_user_message(messages: list) -> str:
-    for message in reversed(messages):
-        if getattr(message, "role", "") == "user":
-            return str(message.content or "")
-    return ""
 
+def _shed_load() -> bool:
+    return settings.admission_overload_mode.lower().strip() == "shed"
 
-def _split_tokens(text: str) -> list[str]:
-    cleaned = re.sub(r"\s+(and|&)\s+", ",", text, flags=re.IGNORECASE)
-    parts = re.split(r"[,\n]", cleaned)
-    return [p.strip() for p in parts if p.strip()]
 
+async def _run_or_degrade(fridge_input: FridgeInput, deadline: Optional[Deadline]) -> RecipeResponse:
+    # Saturated pipeline: reject with 503 + Retry-After, or answer locally without providers/LLM.
+    try:
+        return await arun_recipe_graph(fridge_input, deadline)
+    except Overloaded as exc:
+        if _shed_load():
+            raise HTTPException(
+                status_code=503,
+                detail="The kitchen is busy, please retry shortly.",
+                headers={"Retry-After": str(exc.retry_after)},
+            ) from None
+        admission.note_degraded()
+        return local_recipe_response(fridge_input)
+
+
+async def _cached_recipe_options(
+    fridge_input: FridgeInput, http_response: Response, deadline: Optional[Deadline] = None
+) -> RecipeResponse:
+    # A cache hit skips the graph, recipe providers and the LLM entirely.
+    response = response_cache.get(fridge_input)
+    if response is not None:
+        ttl = response_cache.ttl_for(response)
+        http_response.headers["X-Cache"] = "HIT"
+    else:
+        response = await _run_or_degrade(fridge_input, deadline)
+        ttl = response_cache.put(fridge_input, response)
+        http_response.headers["X-Cache"] = "MISS"
+    http_response.headers["Cache-Control"] = f"private, max-age={ttl}" if ttl else "no-store"
+    return response
 
-def _extract_dietary(text: str) -> list[str]:
-    keywords = {
-        "vegetarian": "vegetarian",
-        "vegan": "vegan",
-        "gluten free": "gluten-free",
-        "gluten-free": "gluten-free",
-        "dairy free": "dairy-free",
-        "dairy-free": "dairy-free",
-        "keto": "keto",
-        "low carb": "low-carb",
-        "low-carb": "low-carb",
-    }
-    found = []
-    lower = text.lower()
-    for key, label in keywords.items():
-        if key in lower and label not in found:
-            found.append(label)
-    return found
-
-
-def _extract_mood(text: str) -> str | None:
-    moods = {
-        "spicy": "spicy",
-        "comforting": "comforting",
-        "cozy": "comforting",
-        "italian": "italian-ish",
-        "asian": "asian-ish",
-        "fresh": "fresh",
-        "quick": "quick and comforting",
-    }
-    lower = text.lower()
-    for key, value in moods.items():
-        if key in lower:
-            return value
-    return None
 
+@app.post("/api/recipes/options", response_model=RecipeResponse)
+async def recipe_options(
+    fridge_input: FridgeInput, http_request: Request, http_response: Response
+) -> RecipeResponse:
+    deadline = request_deadline(http_request.headers, settings.recipe_deadline_seconds)
+    response = await _cached_recipe_options(fridge_input, http_response, deadline)
+    if response.options:
+        response.options_token = option_sessions.create(response.options)
+    return response
 
-def _extract_time(text: str) -> int | None:
-    match = re.search(r"(\d{1,2})\s*(?:min|mins|minutes)\b", text.lower())
-    if match:
-        return max(10, min(60, int(match.group(1))))
-    return None
 
+@app.post("/api/recipes/choose", response_model=RecipeResponse)
+async def choose_recipe(
+    request: RecipeChoiceRequest, http_request: Request, http_response: Response
+) -> RecipeResponse:
+    session = option_sessions.get(request.options_token)
+    if session is None:
+        # Unknown or expired token: rebuild the options list from the fridge input.
+        deadline = request_deadline(http_request.headers, settings.recipe_deadline_seconds)
+        response = await _cached_recipe_options(request.fridge_input, http_response, deadline)
+        if not response.options:
+            raise HTTPException(status_code=404, detail="No recipe options available.")
+        session = build_session_from_options(response.options)
+        session.token = option_sessions.create(response.options)
+
+    selected = session.select(request.option_id)
+    if not selected:
+        raise HTTPException(status_code=404, detail="Selected recipe not found.")
 
-def _extract_servings(text: str) -> int | None:
-    match = re.search(r"(?:serves?|for)\s*(\d{1,2})\b", text.lower())
-    if match:
-        return max(1, min(10, int(match.group(1))))
-    return None
+    return RecipeResponse(
+        options=session.options,
+        selected=selected,
+        shopping_list=list(selected.missing_ingredients),
+        options_token=session.token,
+    )
 
 
-def _merge_unique(values: list[str], extra: list[str]) -> list[str]:
-    seen = {v.lower() for v in values}
-    merged = list(values)
-    for item in extra:
-        key = item.lower()
-        if key and key not in seen:
-            seen.add(key)
-            merged.append(item)
-    return merged
+def _last_user_message(messages: list) -> str:
+    for message in reversed(messages):
+        if getattr(message, "role", "") == "user":
+            return str(message.content or "")
+    return ""
 
 
-def _build_followup(missing: list[str]) -> str:
+async def _build_followup(missing: list[str], deadline: Optional[Deadline] = None) -> str:
     llm = _get_llm()
     fallback = "What ingredients do you have on hand? A comma-separated list is perfect."
     if not missing:
         return "Anything else you'd like to add?"
-    if not llm:
+    breaker = get_breaker("llm")
+    if not llm or (deadline is not None and deadline.expired()) or not breaker.available():
         return fallback
 
     prompt = (
@@ -191,53 +215,59 @@ def _build_followup(missing: list[str]) -> str:
         SystemMessage(content=prompt),
         HumanMessage(content=f"Missing info: {', '.join(missing)}"),
     ]
+    normalized = {"kind": "followup", "missing": sorted({m.strip().lower() for m in missing})}
+    response = llm_cache.get(llm, messages, normalized)
+    if response is not None:
+        return response
     with start_span(
         "chat_followup_llm",
         OpenInferenceSpanKindValues.LLM,
         input_value=str(messages),
     ) as span:
-        response = llm.invoke(messages).content or fallback
+        timeout = deadline.timeout(settings.llm_timeout_seconds) if deadline else settings.llm_timeout_seconds
+        timeout = breaker.timeout(timeout)
+        try:
+            async with llm_limiter.aslot(timeout):
+                with breaker.attempt():
+                    response = (await asyncio.wait_for(llm.ainvoke(messages, timeout=timeout), timeout)).content
+        except Exception:
+            # Out of time, LLM error or open circuit: ask the generic question (and don't cache it).
+            return fallback
         if span is not None:
             span.set_attribute(SpanAttributes.OUTPUT_VALUE, response)
+    if not response or not response.strip():
+        return fallback
+    llm_cache.set(llm, messages, response, normalized)
     return response
 
 
+def _apply_chat_turn(payload: ChatTurnRequest) -> tuple[FridgeInput, list[str]]:
+    """
+    Merge the latest user message into the fridge input; return it with the missing info.
+    """
+    fridge_input = payload.fridge_input or FridgeInput()
+    latest_user_text = _last_user_message(payload.messages)
+
+    apply_message(fridge_input, latest_user_text)
+
+    missing = []
+    if not (fridge_input.main_vegetables or fridge_input.aromatics or fridge_input.spices or fridge_input.proteins):
+        missing.append("ingredients")
+    return fridge_input, missing
+
+
 @app.post("/api/chat/turn", response_model=ChatTurnResponse)
-def chat_turn(payload: ChatTurnRequest) -> ChatTurnResponse:
+async def chat_turn(payload: ChatTurnRequest, http_request: Request, http_response: Response) -> ChatTurnResponse:
+    deadline = request_deadline(http_request.headers, settings.chat_deadline_seconds)
     with start_span(
         "chat_turn",
         OpenInferenceSpanKindValues.CHAIN,
         input_value=str(payload.model_dump()),
     ) as span:
-        fridge_input = payload.fridge_input or FridgeInput()
-        latest_user_text = _last_user_message(payload.messages)
-
-        tokens = _split_tokens(latest_user_text)
-        if tokens:
-            fridge_input.main_vegetables = _merge_unique(fridge_input.main_vegetables, tokens)
-
-        dietary = _extract_dietary(latest_user_text)
-        if dietary:
-            fridge_input.dietary = _merge_unique(fridge_input.dietary, dietary)
-
-        mood = _extract_mood(latest_user_text)
-        if mood:
-            fridge_input.cuisine_mood = mood
-
-        time_budget = _extract_time(latest_user_text)
-        if time_budget:
-            fridge_input.time_budget_minutes = time_budget
-
-        servings = _extract_servings(latest_user_text)
-        if servings:
-            fridge_input.servings = servings
-
-        missing = []
-        if not fridge_input.main_vegetables:
-            missing.append("ingredients")
+        fridge_input, missing = _apply_chat_turn(payload)
 
         if missing:
-            assistant_message = _build_followup(missing)
+            assistant_message = await _build_followup(missing, deadline)
             if span is not None:
                 span.set_attribute(SpanAttributes.OUTPUT_VALUE, "ask")
             return ChatTurnResponse(
@@ -247,7 +277,8 @@ def chat_turn(payload: ChatTurnRequest) -> ChatTurnResponse:
                 fridge_input=fridge_input,
             )
 
-        response = run_recipe_graph(fridge_input)
+        response = await _cached_recipe_options(fridge_input, http_response, deadline)
+        options_token = option_sessions.create(response.options) if response.options else None
         assistant_message = "Here are a few options based on what you shared."
         if span is not None:
             span.set_attribute(SpanAttributes.OUTPUT_VALUE, "options")
@@ -256,9 +287,110 @@ def chat_turn(payload: ChatTurnRequest) -> ChatTurnResponse:
             assistant_message=assistant_message,
             options=response.options,
             fridge_input=fridge_input,
+            options_token=options_token,
         )
 
 
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _recipe_events(
+    fridge_input: FridgeInput, deadline: Optional[Deadline] = None
+) -> AsyncIterator[tuple[str, Any]]:
+    # Yields ("node" | "option", payload) as the graph progresses, then ("result", RecipeResponse).
+    response = response_cache.get(fridge_input)
+    if response is not None:
+        for index, option in enumerate(response.options):
+            yield "option", {"index": index, "option": option.model_dump()}
+    else:
+        try:
+            async for event, payload in astream_recipe_graph(fridge_input, deadline):
+                if event == "node":
+                    yield "node", {"node": payload}
+                elif event == "option":
+                    yield "option", {"index": payload["index"], "option": payload["option"].model_dump()}
+                else:
+                    response = payload
+        except Overloaded as exc:
+            if _shed_load():
+                yield "error", {"detail": "Overloaded", "retry_after": exc.retry_after}
+                return
+            admission.note_degraded()
+            response = local_recipe_response(fridge_input)
+            for index, option in enumerate(response.options):
+                yield "option", {"index": index, "option": option.model_dump()}
+        response_cache.put(fridge_input, response)
+    if response.options:
+        response.options_token = option_sessions.create(response.options)
+    yield "result", response
+
+
+def _event_stream(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/api/recipes/options/stream")
+async def recipe_options_stream(fridge_input: FridgeInput, http_request: Request) -> StreamingResponse:
+    """
+    Server-sent events: `node` and `option` while the graph runs, then `done` with the RecipeResponse.
+    """
+    deadline = request_deadline(http_request.headers, settings.recipe_deadline_seconds)
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for event, payload in _recipe_events(fridge_input, deadline):
+                if event == "result":
+                    yield _sse("done", payload.model_dump())
+                else:
+                    yield _sse(event, payload)
+        except Exception as exc:
+            yield _sse("error", {"detail": type(exc).__name__})
+
+    return _event_stream(events())
+
+
+@app.post("/api/chat/turn/stream")
+async def chat_turn_stream(payload: ChatTurnRequest, http_request: Request) -> StreamingResponse:
+    """
+    Streaming variant of `/api/chat/turn`; the `done` event carries the ChatTurnResponse.
+    """
+    deadline = request_deadline(http_request.headers, settings.chat_deadline_seconds)
+    fridge_input, missing = _apply_chat_turn(payload)
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            if missing:
+                assistant_message = await _build_followup(missing, deadline)
+                done = ChatTurnResponse(
+                    next_action="ask",
+                    assistant_message=assistant_message,
+                    fridge_input=fridge_input,
+                )
+                yield _sse("done", done.model_dump())
+                return
+            async for event, data in _recipe_events(fridge_input, deadline):
+                if event != "result":
+                    yield _sse(event, data)
+                    continue
+                done = ChatTurnResponse(
+                    next_action="options",
+                    assistant_message="Here are a few options based on what you shared.",
+                    options=data.options,
+                    fridge_input=fridge_input,
+                    options_token=data.options_token,
+                )
+                yield _sse("done", done.model_dump())
+        except Exception as exc:
+            yield _sse("error", {"detail": type(exc).__name__})
+
+    return _event_stream(events())
+
+
 def run() -> None:
     import uvicorn
 
@@ -27,17 +27,22 @@ class RecipeOption(BaseModel):
     notes: Optional[str] = None
     source: str = "generated"
     source_url: Optional[str] = None
+    missing_ingredients: List[str] = Field(default_factory=list)
 
 
 class RecipeChoiceRequest(BaseModel):
     option_id: str
     fridge_input: FridgeInput
+    options_token: Optional[str] = None
 
 
 class RecipeResponse(BaseModel):
     options: List[RecipeOption]
     selected: Optional[RecipeOption] = None
     shopping_list: List[str] = Field(default_factory=list)
+    options_token: Optional[str] = None
+    # True when a stage was skipped or cut short by the request deadline.
+    degraded: bool = False
 
 
 class ChatMessage(BaseModel):
@@ -55,6 +60,7 @@ class ChatTurnResponse(BaseModel):
     assistant_message: str
     options: List[RecipeOption] = Field(default_factory=list)
     fridge_input: Optional[FridgeInput] = None
+    options_token: Optional[str] = None
 
 
 class RagConfig(BaseModel):
@@ -64,5 +70,5 @@ class RagConfig(BaseModel):
 
 
 class RecipeSourceConfig(BaseModel):
-    provider: str = "spoonacular"  # spoonacular | mealdb | none
+    provider: str = "spoonacular"  # spoonacular | mealdb | local | none
     enabled: bool = True
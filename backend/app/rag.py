@@ -1,30 +1,267 @@
 from __future__ import annotations
 
-from typing import List
+import asyncio
+import threading
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
 
-from .config import settings
+from .config import resolve_backend_path, settings
+from .embeddings import EmbeddingService, build_embedding_backend
+from .lexical import LexicalHit, LexicalIndex, iter_collection, lexical_path, reciprocal_rank_fusion
+
+DENSE = "dense"
+LEXICAL = "lexical"
+HYBRID = "hybrid"
+
+NOT_LOADED = "not_loaded"
+LOADING = "loading"
+READY = "ready"
+UNAVAILABLE = "unavailable"
+
+
+class RagRetriever:
+    """
+    Process-wide RAG retriever: the Chroma client, collection handle and embedding model
+    are loaded once (at startup warm-up or on first use, behind a lock) and reused by
+    every request. Encoding is serialized, since the tokenizer is not safe to share
+    between threads; Chroma queries run concurrently.
+
+    A BM25 index over the same chunks backs the `lexical` and `hybrid` modes; ingestion
+    keeps it in sync while one of those modes is configured, and it is rebuilt from Chroma
+    whenever the two disagree (e.g. after switching from `dense`).
+    """
+
+    def __init__(self, chroma_path: str, collection_name: str, model_name: str) -> None:
+        self.chroma_path = chroma_path
+        self.collection_name = collection_name
+        self.model_name = model_name
+        self.state = NOT_LOADED
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.client: Any = None
+        self._collection: Any = None
+        self._embedder: Any = None
+        self.embeddings: Optional[EmbeddingService] = None
+        self._lexical: Optional[LexicalIndex] = None
+        self._load_lock = threading.Lock()
+        self._failures = 0
+        self._retry_at = 0.0
+        self._lexical_lock = threading.Lock()
+        self.dense_queries = 0
+        self.lexical_answers = 0
+        self.fused_answers = 0
+        self._encode_lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    def load(self) -> bool:
+        """
+        Load the collection and model if not done yet. Returns whether the retriever is
+        ready. A failed load (e.g. RAG extras not installed, store locked) is retried by a
+        later call once its backoff has passed: `RAG_LOAD_RETRY_SECONDS`, doubling per
+        failure up to `RAG_LOAD_RETRY_MAX_SECONDS`. Calls in between return False at once.
+        """
+        if self.state == READY or self._backing_off():
+            return self.ready
+        # A retry runs on one request; the others keep skipping RAG instead of queueing behind it.
+        if not self._load_lock.acquire(blocking=not self._failures):
+            return False
+        try:
+            if self.state == READY or self._backing_off():
+                return self.ready
+            self.state = LOADING
+            started = time.monotonic()
+            try:
+                import chromadb
+
+                self.client = chromadb.PersistentClient(path=str(resolve_backend_path(self.chroma_path)))
+                self._collection = self.client.get_or_create_collection(self.collection_name)
+                self._embedder = build_embedding_backend(model_name=self.model_name)
+                self.embeddings = EmbeddingService(
+                    self.encode,
+                    cache_size=settings.rag_embedding_cache_size,
+                    batch_window_seconds=settings.rag_embedding_batch_window_ms / 1000,
+                    max_batch=settings.rag_embedding_max_batch,
+                )
+                if retrieval_mode() != DENSE:
+                    self.lexical_index()
+            except Exception as exc:
+                self.state = UNAVAILABLE
+                self.error = f"{type(exc).__name__}: {exc}"
+                self._failures += 1
+                backoff = settings.rag_load_retry_seconds * 2 ** (self._failures - 1)
+                self._retry_at = time.monotonic() + min(backoff, settings.rag_load_retry_max_seconds)
+                return False
+            self.load_seconds = time.monotonic() - started
+            self.state = READY
+            self.error = None
+            self._failures = 0
+            return True
+        finally:
+            self._load_lock.release()
+
+    def _backing_off(self) -> bool:
+        return self.state == UNAVAILABLE and time.monotonic() < self._retry_at
+
+    @property
+    def collection(self) -> Any:
+        return self._collection
+
+    @property
+    def lexical_file(self) -> Path:
+        return lexical_path(resolve_backend_path(self.chroma_path), self.collection_name)
+
+    def lexical_index(self) -> LexicalIndex:
+        """
+        The BM25 index, opened on first use and rebuilt from the collection, a page at a
+        time, when its size doesn't match (e.g. chunks ingested in `dense` mode).
+        """
+        if self._lexical is not None:
+            return self._lexical
+        with self._lexical_lock:
+            if self._lexical is None:
+                index = LexicalIndex(self.lexical_file)
+                if len(index) != self._collection.count():
+                    index.clear()
+                    documents = iter_collection(self._collection)
+                    while page := list(islice(documents, 1000)):
+                        index.add_many(page)
+                self._lexical = index
+        return self._lexical
+
+    def recreate_collection(self) -> None:
+        # Drop every stored chunk (ingestion `--replace`); the handles are swapped in place.
+        with self._load_lock:
+            self.client.delete_collection(self.collection_name)
+            self._collection = self.client.get_or_create_collection(self.collection_name)
+        with self._lexical_lock:
+            if self._lexical is None and self.lexical_file.exists():
+                self._lexical = LexicalIndex(self.lexical_file)
+            if self._lexical is not None:
+                self._lexical.clear()
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
+        with self._encode_lock:
+            return self._embedder.encode(texts, batch_size=batch_size)
+
+    def _dense(self, query: str, top_k: int) -> List[Tuple[str, str]]:
+        self.dense_queries += 1
+        results = self._collection.query(query_embeddings=[self.embeddings.embed(query)], n_results=top_k)
+        ids = results.get("ids", [[]])[0]
+        documents = results.get("documents", [[]])[0]
+        return [(doc_id, doc) for doc_id, doc in zip(ids, documents) if doc]
+
+    @staticmethod
+    def _decisive(hits: List[LexicalHit], top_k: int, corpus_size: int) -> bool:
+        # A full page of keyword hits that each match most of the query's (IDF-weighted) terms.
+        if len(hits) < min(top_k, corpus_size):
+            return False
+        return all(hit.coverage >= settings.rag_hybrid_min_coverage for hit in hits)
+
+    def retrieve(self, query: str, top_k: int) -> List[str]:
+        if not self.load():
+            return []
+        mode = retrieval_mode()
+        if mode == DENSE:
+            if self._collection.count() == 0:
+                return []
+            return [doc for _, doc in self._dense(query, top_k)]
+
+        lexical = self.lexical_index()
+        if len(lexical) == 0:
+            return []
+        hits = lexical.search(query, top_k)
+        if mode == LEXICAL or self._decisive(hits, top_k, len(lexical)):
+            self.lexical_answers += 1
+            return [hit.text for hit in hits]
+        dense = self._dense(query, top_k)
+        texts = {hit.id: hit.text for hit in hits}
+        texts.update(dense)
+        self.fused_answers += 1
+        fused = reciprocal_rank_fusion([[hit.id for hit in hits], [doc_id for doc_id, _ in dense]])
+        return [texts[doc_id] for doc_id in fused[:top_k]]
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "enabled": settings.rag_enabled,
+            "ready": self.ready,
+            "state": self.state,
+            "model": self.model_name,
+            "embedding_backend": self._embedder.name if self._embedder is not None else settings.rag_embedding_backend,
+            "collection": self.collection_name,
+            "load_seconds": round(self.load_seconds, 3) if self.load_seconds is not None else None,
+            "error": self.error,
+            "retry_in_seconds": (
+                round(max(0.0, self._retry_at - time.monotonic()), 3) if self.state == UNAVAILABLE else None
+            ),
+        }
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "mode": settings.rag_retrieval_mode,
+            "dense_queries": self.dense_queries,
+            "lexical_answers": self.lexical_answers,
+            "fused_answers": self.fused_answers,
+            "lexical_documents": len(self._lexical) if self._lexical is not None else None,
+            "embeddings": self.embeddings.stats() if self.embeddings is not None else None,
+        }
+
+
+def retrieval_mode() -> str:
+    return settings.rag_retrieval_mode.lower().strip()
+
+
+_RETRIEVER: Optional[RagRetriever] = None
+_RETRIEVER_LOCK = threading.Lock()
+
+
+def get_rag_retriever() -> RagRetriever:
+    global _RETRIEVER
+    if _RETRIEVER is None:
+        with _RETRIEVER_LOCK:
+            if _RETRIEVER is None:
+                _RETRIEVER = RagRetriever(
+                    settings.rag_chroma_path,
+                    settings.rag_collection,
+                    settings.rag_embedding_model,
+                )
+    return _RETRIEVER
+
+
+def warm_up_rag() -> None:
+    # Load in the background so the server starts accepting requests right away;
+    # `/healthz` reports `rag.ready` once the model is in memory.
+    if not (settings.rag_enabled and settings.rag_warmup):
+        return
+    threading.Thread(target=get_rag_retriever().load, name="rag-warmup", daemon=True).start()
+
+
+def rag_status() -> dict[str, Any]:
+    if not settings.rag_enabled:
+        return {"enabled": False, "ready": False, "state": NOT_LOADED}
+    return get_rag_retriever().status()
+
+
+def rag_retrieval_stats() -> dict[str, Any] | None:
+    return _RETRIEVER.stats() if _RETRIEVER is not None else None
 
 
 def retrieve_rag_context(query: str) -> List[str]:
     if not settings.rag_enabled:
         return []
-
     try:
-        import chromadb
-        from sentence_transformers import SentenceTransformer
+        return get_rag_retriever().retrieve(query, settings.rag_top_k)
     except Exception:
+        # RAG is optional context, like web search: a failing query means no snippets.
         return []
 
-    client = chromadb.PersistentClient(path=".chroma")
-    collection = client.get_or_create_collection(settings.rag_collection)
-    if collection.count() == 0:
-        return []
 
-    embedder = SentenceTransformer("all-MiniLM-L6-v2")
-    query_embedding = embedder.encode([query]).tolist()
-    results = collection.query(
-        query_embeddings=query_embedding,
-        n_results=settings.rag_top_k,
-    )
-    documents = results.get("documents", [[]])[0]
-    return [doc for doc in documents if doc]
+async def aretrieve_rag_context(query: str) -> List[str]:
+    # Chroma and the embedding model are blocking and CPU-bound; run them in a worker thread.
+    if not settings.rag_enabled:
+        return []
+    return await asyncio.to_thread(retrieve_rag_context, query)
@@ -0,0 +1,269 @@
+"""
+Populate the RAG Chroma collection from recipe documents.
+
+Run from `backend/`:
+    python -m app.rag_ingest data/recipes.jsonl more_recipes/
+Inputs are streamed: JSONL (one record per line), JSON lists / `{"meals": [...]}` payloads,
+and `.txt`/`.md` files (one document each); directories are walked recursively. Records may be
+TheMealDB-shaped meals or generic `{"id", "title", "text"}` objects.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Set
+
+from .config import settings
+from .rag import DENSE, get_rag_retriever, retrieval_mode
+from .tools.local_corpus import iter_mealdb_records, parse_mealdb_record
+
+_RECORD_SUFFIXES = {".jsonl", ".json"}
+_TEXT_SUFFIXES = {".txt", ".md"}
+
+
+@dataclass(frozen=True, slots=True)
+class Chunk:
+    id: str  # hash of document id and text: an unchanged chunk keeps its id, so re-runs skip it
+    text: str
+    doc_id: str
+    index: int
+    source: str
+
+
+def _content_id(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def iter_input_files(paths: Iterable[Path]) -> Iterator[Path]:
+    for path in paths:
+        if path.is_dir():
+            for child in sorted(path.rglob("*")):
+                if child.is_file() and child.suffix.lower() in _RECORD_SUFFIXES | _TEXT_SUFFIXES:
+                    yield child
+        elif path.is_file():
+            yield path
+
+
+def _record_document(record: dict) -> Optional[tuple[str, str, str]]:
+    # (doc_id, title, body) for a MealDB meal or a generic {"id", "title", "text"} record.
+    if "idMeal" in record or "strMeal" in record:
+        recipe = parse_mealdb_record(record)
+        if recipe is None:
+            return None
+        parts = []
+        if recipe.cuisine:
+            parts.append(f"Cuisine: {recipe.cuisine}")
+        if recipe.ingredients:
+            parts.append("Ingredients: " + ", ".join(recipe.ingredients))
+        if recipe.steps:
+            parts.append("Steps: " + " ".join(recipe.steps))
+        return f"mealdb:{recipe.id}", recipe.title, "\n".join(parts)
+    title = str(record.get("title") or "").strip()
+    body = record.get("text") or record.get("content") or record.get("document") or ""
+    extras = []
+    if record.get("ingredients"):
+        extras.append("Ingredients: " + ", ".join(str(item) for item in record["ingredients"]))
+    if record.get("steps"):
+        extras.append("Steps: " + " ".join(str(item) for item in record["steps"]))
+    body = "\n".join([str(body).strip(), *extras]).strip()
+    doc_id = str(record.get("id") or title or "").strip()
+    if not body or not doc_id:
+        return None
+    return doc_id, title, body
+
+
+def iter_documents(paths: Iterable[Path]) -> Iterator[tuple[str, str, str, str]]:
+    """
+    Yield (doc_id, title, body, source) one document at a time, so memory stays flat
+    however large the corpus is (a single `.json` file is still parsed whole; prefer JSONL).
+    """
+    for path in iter_input_files(paths):
+        if path.suffix.lower() in _TEXT_SUFFIXES:
+            body = path.read_text(encoding="utf-8").strip()
+            if body:
+                yield str(path), path.stem.replace("_", " ").replace("-", " "), body, path.name
+            continue
+        for record in iter_mealdb_records(path):
+            document = _record_document(record)
+            if document is not None:
+                yield (*document, path.name)
+
+
+def chunk_text(text: str, max_words: int = 200, overlap: int = 40) -> List[str]:
+    # Word windows with overlap, so a step split across chunks is still whole in one of them.
+    words = text.split()
+    if len(words) <= max_words:
+        return [" ".join(words)] if words else []
+    overlap = min(max(0, overlap), max_words - 1)
+    step = max_words - overlap
+    return [" ".join(words[start : start + max_words]) for start in range(0, len(words) - overlap, step)]
+
+
+def iter_document_chunks(
+    documents: Iterable[tuple[str, str, str, str]], max_words: int, overlap: int
+) -> Iterator[List[Chunk]]:
+    # One list per document: its chunks are reconciled with the stored ones together.
+    for doc_id, title, body, source in documents:
+        chunks = []
+        for index, piece in enumerate(chunk_text(body, max_words, overlap)):
+            # Every chunk carries its recipe title, so a retrieved step still says what it belongs to.
+            text = f"{title}\n{piece}" if title else piece
+            chunks.append(Chunk(_content_id(f"{doc_id}\n{text}"), text, doc_id, index, source))
+        yield chunks
+
+
+def _batches(documents: Iterator[List[Chunk]], size: int) -> Iterator[List[Chunk]]:
+    # Whole documents only, so a batch may run over `size` by one document's chunks.
+    batch: List[Chunk] = []
+    for chunks in documents:
+        batch.extend(chunks)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _prune_missing(collection, lexical, seen: Set[str], page_size: int = 1000) -> int:
+    # Chunks of documents this run did not see at all (deleted from the input).
+    stale: List[str] = []
+    offset = 0
+    while True:
+        page = collection.get(limit=page_size, offset=offset, include=["metadatas"])
+        ids = page.get("ids") or []
+        if not ids:
+            break
+        metadatas = page.get("metadatas") or [None] * len(ids)
+        stale.extend(chunk_id for chunk_id, meta in zip(ids, metadatas) if (meta or {}).get("doc_id") not in seen)
+        offset += len(ids)
+    for start in range(0, len(stale), page_size):
+        collection.delete(ids=stale[start : start + page_size])
+        if lexical is not None:
+            lexical.delete_many(stale[start : start + page_size])
+    return len(stale)
+
+
+class _Progress:
+    def __init__(self, interval_seconds: float = 2.0) -> None:
+        self.started = time.monotonic()
+        self.interval_seconds = interval_seconds
+        self._last_report = self.started
+        self._last_doc: Optional[str] = None
+        self.documents = 0
+        self.chunks = 0
+        self.added = 0
+        self.skipped = 0
+        self.removed = 0
+
+    def update(self, batch: List[Chunk], added: int, removed: int) -> None:
+        # A document's chunks arrive back to back, so counting id changes needs no id set.
+        for chunk in batch:
+            if chunk.doc_id != self._last_doc:
+                self._last_doc = chunk.doc_id
+                self.documents += 1
+        self.chunks += len(batch)
+        self.added += added
+        self.skipped += len(batch) - added
+        self.removed += removed
+        now = time.monotonic()
+        if now - self._last_report >= self.interval_seconds:
+            self._last_report = now
+            print(self.line(), file=sys.stderr, flush=True)
+
+    def line(self) -> str:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return (
+            f"{self.documents} docs, {self.chunks} chunks ({self.added} new, {self.skipped} unchanged, "
+            f"{self.removed} stale removed) "
+            f"in {elapsed:.1f}s: {self.documents / elapsed:.1f} docs/s, {self.chunks / elapsed:.1f} chunks/s"
+        )
+
+
+def ingest(
+    paths: Iterable[Path],
+    batch_size: int = 256,
+    max_words: int = 200,
+    overlap: int = 40,
+    replace: bool = False,
+    prune: bool = False,
+    progress_interval_seconds: float = 2.0,
+) -> _Progress:
+    """
+    Stream, chunk, embed and upsert documents into `RAG_COLLECTION`, and add them to its
+    BM25 index unless `RAG_RETRIEVAL_MODE` is `dense`. Each batch costs one `get` of the
+    stored chunks of its documents: chunks already stored are skipped, and chunks a re-ingested
+    document no longer has (edited text) are deleted. Then one `encode` and one `upsert`.
+    With `prune`, chunks of documents missing from this run's input are deleted at the end.
+    """
+    retriever = get_rag_retriever()
+    if not retriever.load():
+        raise SystemExit(f"RAG is unavailable: {retriever.error} (install requirements-rag.txt)")
+    if replace:
+        retriever.recreate_collection()
+    collection = retriever.collection
+    # Opening the index first also rebuilds it if it had fallen behind the collection.
+    lexical = retriever.lexical_index() if retrieval_mode() != DENSE else None
+    progress = _Progress(progress_interval_seconds)
+    seen: Set[str] = set()
+    for batch in _batches(iter_document_chunks(iter_documents(paths), max_words, overlap), max(1, batch_size)):
+        wanted = {chunk.id: chunk for chunk in batch}
+        doc_ids = list(dict.fromkeys(chunk.doc_id for chunk in batch))
+        if prune:
+            seen.update(doc_ids)
+        stored = collection.get(where={"doc_id": {"$in": doc_ids}}, include=[])["ids"]
+        stale = [chunk_id for chunk_id in stored if chunk_id not in wanted]
+        if stale:
+            collection.delete(ids=stale)
+            if lexical is not None:
+                lexical.delete_many(stale)
+        stored_ids = set(stored)
+        fresh = [chunk for chunk in wanted.values() if chunk.id not in stored_ids]
+        if fresh:
+            collection.upsert(
+                ids=[chunk.id for chunk in fresh],
+                documents=[chunk.text for chunk in fresh],
+                embeddings=retriever.encode([chunk.text for chunk in fresh], batch_size=batch_size),
+                metadatas=[
+                    {"doc_id": chunk.doc_id, "chunk": chunk.index, "source": chunk.source} for chunk in fresh
+                ],
+            )
+            if lexical is not None:
+                # A crash between the upsert and this commit is repaired on the next load,
+                # when the index size no longer matches the collection.
+                lexical.add_many((chunk.id, chunk.text) for chunk in fresh)
+        progress.update(batch, len(fresh), len(stale))
+    if prune:
+        progress.removed += _prune_missing(collection, lexical, seen)
+    return progress
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Embed recipe documents into the RAG Chroma collection.")
+    parser.add_argument("paths", nargs="+", type=Path, help="JSONL/JSON/txt/md files or directories")
+    parser.add_argument("--batch-size", type=int, default=256, help="chunks per encode/upsert call")
+    parser.add_argument("--chunk-words", type=int, default=200, help="max words per chunk")
+    parser.add_argument("--chunk-overlap", type=int, default=40, help="words shared by consecutive chunks")
+    parser.add_argument("--replace", action="store_true", help="drop the collection before ingesting")
+    parser.add_argument(
+        "--prune", action="store_true", help="delete chunks of documents that are not in this run's input"
+    )
+    args = parser.parse_args(argv)
+
+    progress = ingest(
+        args.paths,
+        batch_size=args.batch_size,
+        max_words=args.chunk_words,
+        overlap=args.chunk_overlap,
+        replace=args.replace,
+        prune=args.prune,
+    )
+    total = get_rag_retriever().collection.count()
+    print(f"{progress.line()} -> collection '{settings.rag_collection}' has {total} chunks")
+
+
+if __name__ == "__main__":
+    main()
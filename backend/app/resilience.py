@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, Tuple
+
+from .config import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised by `CircuitBreaker.attempt()` when the dependency is currently short-circuited.
+    """
+
+    def __init__(self, name: str) -> None:
+        super().__init__(f"circuit '{name}' is open")
+        self.name = name
+
+
+class _Attempt:
+    __slots__ = ("failed",)
+
+    def __init__(self) -> None:
+        self.failed = False
+
+    def fail(self) -> None:
+        # For calls that returned but should still count against the dependency (e.g. HTTP 5xx).
+        self.failed = True
+
+
+class CircuitBreaker:
+    """
+    Per-dependency breaker over a rolling time window of call outcomes and latencies.
+
+    - closed: calls flow; the breaker opens once the window holds at least `min_calls`
+      outcomes and the failure rate reaches `failure_rate`.
+    - open: calls are rejected immediately for `open_seconds`.
+    - half_open: up to `half_open_probes` calls are let through; a success closes the
+      breaker (with a fresh window), a failure opens it again.
+
+    `timeout(cap)` adapts the call timeout to the observed p99 of successful calls.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = 60.0,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+        max_samples: int = 512,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = max(1, min_calls)
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = max(1, half_open_probes)
+        self._clock = clock
+        # (finished_at, ok, latency_seconds)
+        self._calls: Deque[Tuple[float, bool, float]] = deque(maxlen=max(1, max_samples))
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self.rejected = 0
+        self.opened = 0
+
+    def _prune(self, now: float) -> None:
+        horizon = now - self.window_seconds
+        while self._calls and self._calls[0][0] < horizon:
+            self._calls.popleft()
+
+    def _refresh(self, now: float) -> None:
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probes = 0
+
+    def _open(self, now: float) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        self._probes = 0
+        self.opened += 1
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh(self._clock())
+            return self._state
+
+    def available(self) -> bool:
+        """
+        Whether a call would currently be let through, without reserving a half-open probe.
+        """
+        if not settings.breaker_enabled:
+            return True
+        with self._lock:
+            self._refresh(self._clock())
+            if self._state == OPEN:
+                return False
+            return self._state == CLOSED or self._probes < self.half_open_probes
+
+    def allow(self) -> bool:
+        if not settings.breaker_enabled:
+            return True
+        with self._lock:
+            self._refresh(self._clock())
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, ok: bool, latency: float) -> None:
+        now = self._clock()
+        with self._lock:
+            if self._state == HALF_OPEN:
+                if ok:
+                    self._state = CLOSED
+                    self._calls.clear()
+                else:
+                    self._open(now)
+                    return
+            self._calls.append((now, ok, latency))
+            self._prune(now)
+            if self._state != CLOSED or len(self._calls) < self.min_calls:
+                return
+            failures = sum(1 for _, call_ok, _ in self._calls if not call_ok)
+            if failures / len(self._calls) >= self.failure_rate:
+                self._open(now)
+
+    def release(self) -> None:
+        # A reserved probe that ended without an outcome (e.g. cancelled by the request deadline).
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    @contextmanager
+    def attempt(self) -> Iterator[_Attempt]:
+        """
+        Guard one call: raises `CircuitOpenError` when short-circuited, otherwise records the
+        outcome and latency. Exceptions count as failures; cancellation records nothing.
+        """
+        if not self.allow():
+            raise CircuitOpenError(self.name)
+        call = _Attempt()
+        started = self._clock()
+        try:
+            yield call
+        except Exception:
+            self.record(False, self._clock() - started)
+            raise
+        except BaseException:
+            self.release()
+            raise
+        self.record(not call.failed, self._clock() - started)
+
+    def p99(self) -> Optional[float]:
+        with self._lock:
+            self._prune(self._clock())
+            latencies = sorted(latency for _, ok, latency in self._calls if ok)
+        if len(latencies) < settings.adaptive_timeout_min_samples:
+            return None
+        return latencies[max(0, math.ceil(0.99 * len(latencies)) - 1)]
+
+    def timeout(self, cap: float) -> float:
+        """
+        Call timeout: p99 of recent successful calls times a headroom factor, clamped to
+        [ADAPTIVE_TIMEOUT_MIN_SECONDS, cap]. Without enough samples, `cap` itself.
+        """
+        if not settings.adaptive_timeout_enabled:
+            return cap
+        p99 = self.p99()
+        if p99 is None:
+            return cap
+        adaptive = max(settings.adaptive_timeout_min_seconds, p99 * settings.adaptive_timeout_multiplier)
+        return min(cap, adaptive)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._calls.clear()
+            self._state = CLOSED
+            self._probes = 0
+
+    def stats(self) -> dict[str, Any]:
+        now = self._clock()
+        with self._lock:
+            self._refresh(now)
+            self._prune(now)
+            calls = len(self._calls)
+            failures = sum(1 for _, ok, _ in self._calls if not ok)
+            state = self._state
+            retry_in = max(0.0, self.open_seconds - (now - self._opened_at)) if state == OPEN else 0.0
+        p99 = self.p99()
+        return {
+            "state": state,
+            "window_calls": calls,
+            "window_failures": failures,
+            "failure_rate": round(failures / calls, 4) if calls else None,
+            "p99_seconds": round(p99, 4) if p99 is not None else None,
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "retry_in_seconds": round(retry_in, 3),
+        }
+
+
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """
+    Shared breaker for a dependency (`spoonacular`, `mealdb`, `web_search`, `llm`).
+    """
+    breaker = _BREAKERS.get(name)
+    if breaker is not None:
+        return breaker
+    with _BREAKERS_LOCK:
+        breaker = _BREAKERS.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name,
+                window_seconds=settings.breaker_window_seconds,
+                min_calls=settings.breaker_min_calls,
+                failure_rate=settings.breaker_failure_rate,
+                open_seconds=settings.breaker_open_seconds,
+                half_open_probes=settings.breaker_half_open_probes,
+            )
+            _BREAKERS[name] = breaker
+        return breaker
+
+
+def breaker_stats() -> dict[str, Any]:
+    return {name: breaker.stats() for name, breaker in sorted(_BREAKERS.items())}
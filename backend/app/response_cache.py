@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from .cache import build_cache, make_cache_key
+from .config import settings
+from .graph import routing_settings_key
+from .ingredients import fridge_input_key
+from .models import FridgeInput, RecipeResponse
+
+
+def _ttl_for(response: RecipeResponse) -> int:
+    # Purely generated answers are cheap to recompute and benefit from freshness;
+    # API-sourced ones cost upstream quota, so they are kept longer.
+    # Deadline-degraded answers are not cached, so the next request gets a full attempt.
+    if not response.options or response.degraded:
+        return 0
+    if all(option.source == "generated" for option in response.options):
+        return settings.response_cache_generated_ttl_seconds
+    return settings.response_cache_ttl_seconds
+
+
+class ResponseCache:
+    """
+    End-to-end cache of `RecipeResponse` keyed on the canonical fridge input and routing settings.
+    """
+
+    def __init__(self) -> None:
+        self._cache = build_cache(
+            max_entries=settings.response_cache_max_entries,
+            ttl_seconds=settings.response_cache_ttl_seconds,
+            db_path=settings.response_cache_db_path,
+            table="recipe_responses",
+        )
+
+    def _key(self, fridge_input: FridgeInput) -> str:
+        return make_cache_key(
+            "recipes",
+            {"fridge_input": fridge_input_key(fridge_input), "routing": list(routing_settings_key())},
+        )
+
+    def get(self, fridge_input: FridgeInput) -> Optional[RecipeResponse]:
+        if not settings.response_cache_enabled:
+            return None
+        payload = self._cache.get(self._key(fridge_input))
+        if payload is None:
+            return None
+        return RecipeResponse.model_validate(payload)
+
+    def put(self, fridge_input: FridgeInput, response: RecipeResponse) -> int:
+        """
+        Store `response` and return the TTL used (0 when it was not cached).
+        """
+        ttl = _ttl_for(response) if settings.response_cache_enabled else 0
+        if ttl > 0:
+            payload = response.model_dump(exclude={"selected", "options_token"})
+            self._cache.set(self._key(fridge_input), payload, ttl_seconds=ttl)
+        return ttl
+
+    def ttl_for(self, response: RecipeResponse) -> int:
+        return _ttl_for(response)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return self._cache.stats()
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import secrets
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .cache import TieredCache, build_cache
+from .config import settings
+from .models import RecipeOption
+
+
+@dataclass
+class OptionSession:
+    token: str
+    options: List[RecipeOption]
+    title_index: Dict[str, int] = field(default_factory=dict)
+
+    def select(self, option_id: str) -> Optional[RecipeOption]:
+        # `option_id` is a 0-based index or an option title (case-insensitive).
+        try:
+            index = int(option_id)
+        except ValueError:
+            index = self.title_index.get(option_id.strip().lower(), -1)
+        if 0 <= index < len(self.options):
+            return self.options[index]
+        return None
+
+
+def _title_index(options: List[RecipeOption]) -> Dict[str, int]:
+    index: Dict[str, int] = {}
+    for i, option in enumerate(options):
+        index.setdefault(option.title.strip().lower(), i)
+    return index
+
+
+class OptionSessionStore:
+    """
+    Keeps the options list a client was shown so a later choice resolves without re-running the graph.
+    """
+
+    def __init__(self, cache: TieredCache) -> None:
+        self._cache = cache
+
+    def create(self, options: List[RecipeOption]) -> str:
+        token = secrets.token_urlsafe(16)
+        self._cache.set(
+            token,
+            {
+                "options": [option.model_dump() for option in options],
+                "title_index": _title_index(options),
+            },
+        )
+        return token
+
+    def get(self, token: str | None) -> Optional[OptionSession]:
+        if not token:
+            return None
+        payload = self._cache.get(token)
+        if payload is None:
+            return None
+        return OptionSession(
+            token=token,
+            options=[RecipeOption.model_validate(item) for item in payload["options"]],
+            title_index=payload["title_index"],
+        )
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+def build_session_from_options(options: List[RecipeOption]) -> OptionSession:
+    return OptionSession(token="", options=options, title_index=_title_index(options))
+
+
+option_sessions = OptionSessionStore(
+    build_cache(
+        max_entries=settings.option_session_max_entries,
+        ttl_seconds=settings.option_session_ttl_seconds,
+        db_path=settings.option_session_db_path,
+        table="option_sessions",
+    )
+)
@@ -57,10 +57,11 @@ const formatSource = (option) => {
   const source = String(option?.source || "generated");
   if (source === "spoonacular") return "Spoonacular";
   if (source === "mealdb") return "TheMealDB";
+  if (source === "local") return "Local catalog";
   return "Generated";
 };
 
-const renderOptions = (options) => {
+const renderOptions = (options, { pending = false } = {}) => {
   optionsContainer.innerHTML = "";
   if (!options.length) {
     optionsContainer.innerHTML = `<p class="muted">No options yet. Share a few ingredients to get started.</p>`;
@@ -88,7 +89,7 @@ const renderOptions = (options) => {
           </div>
         </div>
         <div class="option-actions">
-          <button class="btn btn-primary" data-index="${index}">Choose</button>
+          <button class="btn btn-primary" data-index="${index}"${pending ? " disabled" : ""}>Choose</button>
         </div>
       </div>
       <div class="option-meta">
@@ -116,6 +117,7 @@ const renderSelected = (recipe) => {
   }
 
   const list = buildShoppingList(recipe);
+  const missing = uniq((recipe.missing_ingredients || []).map((x) => String(x || "")));
   const textToCopy = [
     recipe.title,
     `Time: ${recipe.time_minutes} min`,
@@ -143,6 +145,14 @@ const renderSelected = (recipe) => {
     <div class="chips" style="margin-bottom:0.6rem">
       ${list.map((x) => `<span class="chip"><span>${escapeHtml(x)}</span></span>`).join("")}
     </div>
+    ${
+      missing.length
+        ? `<p class="muted">Shopping list:</p>
+    <div class="chips" style="margin-bottom:0.6rem">
+      ${missing.map((x) => `<span class="chip"><span>${escapeHtml(x)}</span></span>`).join("")}
+    </div>`
+        : ""
+    }
     <p class="muted">Steps:</p>
     <ol>${(recipe.steps || []).map((step) => `<li>${escapeHtml(step)}</li>`).join("")}</ol>
     ${recipe.notes ? `<p class="note">${escapeHtml(recipe.notes)}</p>` : ""}
@@ -183,6 +193,32 @@ let chatMessages = [
 ];
 let lastOptions = [];
 let lastFridgeInput = null;
+let lastOptionsToken = null;
+
+// Minimal server-sent events reader for POST responses (EventSource only supports GET).
+const readEventStream = async (response, onEvent) => {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const raw = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let event = "message";
+      const data = [];
+      for (const line of raw.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data.push(line.slice(5).trim());
+      }
+      if (data.length) onEvent(event, JSON.parse(data.join("\n")));
+      boundary = buffer.indexOf("\n\n");
+    }
+  }
+};
 
 const sendChatTurn = async () => {
   const text = String(chatInput.value || "").trim();
@@ -196,7 +232,7 @@ const sendChatTurn = async () => {
   renderOptionsSkeleton();
 
   try {
-    const response = await fetch("/api/chat/turn", {
+    const response = await fetch("/api/chat/turn/stream", {
       method: "POST",
       headers: { "Content-Type": "application/json" },
       body: JSON.stringify({ messages: chatMessages, fridge_input: lastFridgeInput }),
@@ -205,13 +241,27 @@ const sendChatTurn = async () => {
       const text = await response.text();
       throw new Error(text || `HTTP ${response.status}`);
     }
-    const data = await response.json();
+    // Options are rendered as they arrive; "Choose" unlocks once the final list is in.
+    const streamed = [];
+    let data = null;
+    await readEventStream(response, (event, payload) => {
+      if (event === "option") {
+        streamed[payload.index] = payload.option;
+        renderOptions(streamed.filter(Boolean), { pending: true });
+      } else if (event === "done") {
+        data = payload;
+      } else if (event === "error") {
+        throw new Error(payload.detail || "Stream failed");
+      }
+    });
+    if (!data) throw new Error("Stream ended early");
     if (data.assistant_message) {
       chatMessages = [...chatMessages, { role: "assistant", content: data.assistant_message }];
       renderChat(chatMessages);
     }
     if (data.fridge_input) lastFridgeInput = data.fridge_input;
     lastOptions = data.options || [];
+    lastOptionsToken = data.options_token || null;
     renderOptions(lastOptions);
     if (data.next_action === "ask") {
       setStatus("Give me a bit more detail so I can personalize.", "muted");
@@ -235,13 +285,18 @@ const chooseOption = async (index) => {
     const response = await fetch("/api/recipes/choose", {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ option_id: String(index), fridge_input: lastFridgeInput }),
+      body: JSON.stringify({
+        option_id: String(index),
+        fridge_input: lastFridgeInput,
+        options_token: lastOptionsToken,
+      }),
     });
     if (!response.ok) {
       const text = await response.text();
       throw new Error(text || `HTTP ${response.status}`);
     }
     const data = await response.json();
+    if (data.options_token) lastOptionsToken = data.options_token;
     renderSelected(data.selected);
     setStatus("Selected. You’ve got this.", "good");
   } catch (err) {
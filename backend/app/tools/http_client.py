@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import threading
+import weakref
+from typing import Awaitable, Callable, Iterable, List, Tuple, TypeVar
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..config import settings
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class ProviderClient:
+    """
+    Shared HTTP client for recipe providers: keep-alive pooling, per-host
+    concurrency limits and a small worker pool for parallel fan-out.
+
+    `get`/`map` serve sync callers (scripts, `graph.invoke`); `aget`/`amap` serve the
+    event loop with an `httpx.AsyncClient` and the same limits, without holding threads.
+    """
+
+    def __init__(self, pool_size: int = 16, per_host_limit: int = 8, timeout: float = 10.0) -> None:
+        self.timeout = timeout
+        self._per_host_limit = max(1, per_host_limit)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(1, pool_size))
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._host_limits: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, pool_size),
+            thread_name_prefix="provider-http",
+        )
+        self._pool_size = max(1, pool_size)
+        # Async clients and semaphores are bound to the loop that created them.
+        self._async_state: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, dict]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _host_limit(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self._lock:
+            limit = self._host_limits.get(host)
+            if limit is None:
+                limit = threading.BoundedSemaphore(self._per_host_limit)
+                self._host_limits[host] = limit
+            return limit
+
+    def get(self, url: str, params: dict | None = None, timeout: float | None = None) -> requests.Response:
+        with self._host_limit(url):
+            return self._session.get(url, params=params, timeout=timeout or self.timeout)
+
+    def map(self, fn: Callable[[T], R], items: Iterable[T]) -> List[R]:
+        # Results keep input order; the per-host limit still bounds concurrent requests.
+        return list(self._executor.map(fn, items))
+
+    def _loop_state(self) -> Tuple[httpx.AsyncClient, dict]:
+        loop = asyncio.get_running_loop()
+        state = self._async_state.get(loop)
+        if state is None:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self._pool_size,
+                    max_keepalive_connections=self._pool_size,
+                ),
+                timeout=self.timeout,
+            )
+            state = (client, {})
+            self._async_state[loop] = state
+        return state
+
+    async def aget(self, url: str, params: dict | None = None, timeout: float | None = None) -> httpx.Response:
+        client, host_limits = self._loop_state()
+        host = urlsplit(url).netloc
+        limit = host_limits.get(host)
+        if limit is None:
+            limit = host_limits.setdefault(host, asyncio.Semaphore(self._per_host_limit))
+        async with limit:
+            return await client.get(url, params=params, timeout=timeout or self.timeout)
+
+    async def amap(self, fn: Callable[[T], Awaitable[R]], items: Iterable[T]) -> List[R]:
+        # Async counterpart of `map`: results keep input order.
+        return list(await asyncio.gather(*(fn(item) for item in items)))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        self._session.close()
+
+    async def aclose(self) -> None:
+        state = self._async_state.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state[0].aclose()
+
+
+provider_client = ProviderClient(
+    pool_size=settings.provider_pool_size,
+    per_host_limit=settings.provider_max_concurrency_per_host,
+    timeout=settings.provider_timeout_seconds,
+)
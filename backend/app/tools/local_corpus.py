@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from ..config import resolve_backend_path, settings
+from ..ingredients import normalize_ingredients
+from .recipe_search import _mealdb_extract_ingredients, _mealdb_ingredient_names, _mealdb_steps
+
+
+@dataclass(frozen=True, slots=True)
+class LocalRecipe:
+    id: str
+    title: str
+    cuisine: str
+    ingredients: Tuple[str, ...]
+    names: Tuple[str, ...]  # normalized ingredient names, used for matching
+    steps: Tuple[str, ...]
+    time_minutes: Optional[int] = None
+    category: Optional[str] = None
+    source_url: Optional[str] = None
+
+
+def parse_mealdb_record(meal: dict) -> Optional[LocalRecipe]:
+    meal_id = str(meal.get("idMeal") or meal.get("id") or "").strip()
+    title = (meal.get("strMeal") or meal.get("title") or "").strip()
+    if not meal_id or not title:
+        return None
+    time_minutes = meal.get("time_minutes") or meal.get("readyInMinutes")
+    return LocalRecipe(
+        id=meal_id,
+        title=title,
+        cuisine=(meal.get("strArea") or "").strip(),
+        ingredients=tuple(_mealdb_extract_ingredients(meal)),
+        names=tuple(normalize_ingredients(_mealdb_ingredient_names(meal))),
+        steps=tuple(_mealdb_steps(meal)),
+        time_minutes=int(time_minutes) if time_minutes else None,
+        category=(meal.get("strCategory") or "").strip() or None,
+        source_url=meal.get("strSource") or f"https://www.themealdb.com/meal/{meal_id}",
+    )
+
+
+def _index_keys(name: str) -> List[str]:
+    # A recipe's "red onion" is found by a pantry "onion" or "red onion" (the same expansion
+    # `PantryMatcher` applies when it scores a pantry).
+    words = name.split(" ")
+    return [name] + (words if len(words) > 1 else [])
+
+
+class LocalCorpus:
+    """
+    In-memory recipe catalog with an inverted index from normalized ingredient to recipe positions.
+    """
+
+    def __init__(self, recipes: Iterable[LocalRecipe] = ()) -> None:
+        self.recipes: List[LocalRecipe] = []
+        self.index: Dict[str, List[int]] = {}
+        self._ids: Dict[str, int] = {}
+        for recipe in recipes:
+            self.add(recipe)
+
+    def __len__(self) -> int:
+        return len(self.recipes)
+
+    def add(self, recipe: LocalRecipe) -> bool:
+        if recipe.id in self._ids:
+            return False
+        position = len(self.recipes)
+        self._ids[recipe.id] = position
+        self.recipes.append(recipe)
+        keys = {key for name in recipe.names for key in _index_keys(name)}
+        for key in keys:
+            self.index.setdefault(key, []).append(position)
+        return True
+
+    def candidates(self, ingredients: Iterable[str]) -> List[int]:
+        """
+        Sorted positions of the recipes that use at least one of `ingredients`, read from the
+        postings of the pantry's keys: the cost follows the matching recipes, not the catalog.
+        """
+        positions: Set[int] = set()
+        for name in normalize_ingredients(ingredients):
+            positions.update(self.index.get(name, ()))
+        return sorted(positions)
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as handle:
+            for recipe in self.recipes:
+                handle.write(json.dumps(asdict(recipe), separators=(",", ":")) + "\n")
+
+    @classmethod
+    def load(cls, path: Path) -> "LocalCorpus":
+        corpus = cls()
+        if not path.exists():
+            return corpus
+        with path.open(encoding="utf-8") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                for name in ("ingredients", "names", "steps"):
+                    data[name] = tuple(data.get(name) or ())
+                corpus.add(LocalRecipe(**data))
+        return corpus
+
+
+def iter_mealdb_records(path: Path) -> Iterator[dict]:
+    # Accepts JSONL (one meal per line), a JSON list, or a TheMealDB `{"meals": [...]}` payload.
+    with path.open(encoding="utf-8") as handle:
+        if path.suffix.lower() == ".jsonl":
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        data = json.load(handle)
+    if isinstance(data, dict):
+        data = data.get("meals") or []
+    for item in data:
+        if isinstance(item, dict):
+            yield item
+
+
+def import_mealdb_files(paths: Iterable[Path], corpus: LocalCorpus) -> int:
+    added = 0
+    for path in paths:
+        for meal in iter_mealdb_records(path):
+            recipe = parse_mealdb_record(meal)
+            if recipe is not None and corpus.add(recipe):
+                added += 1
+    return added
+
+
+_CORPUS: Optional[LocalCorpus] = None
+_CORPUS_LOCK = threading.Lock()
+
+
+def get_local_corpus() -> LocalCorpus:
+    global _CORPUS
+    if _CORPUS is None:
+        with _CORPUS_LOCK:
+            if _CORPUS is None:
+                _CORPUS = LocalCorpus.load(resolve_backend_path(settings.local_corpus_path))
+    return _CORPUS
+
+
+def reload_local_corpus() -> None:
+    global _CORPUS
+    with _CORPUS_LOCK:
+        _CORPUS = None
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Import TheMealDB-shaped recipes into the local corpus.")
+    parser.add_argument("paths", nargs="+", type=Path, help="JSON or JSONL files with MealDB meal records")
+    parser.add_argument("--replace", action="store_true", help="start from an empty corpus")
+    args = parser.parse_args(argv)
+
+    target = resolve_backend_path(settings.local_corpus_path)
+    corpus = LocalCorpus() if args.replace else LocalCorpus.load(target)
+    added = import_mealdb_files(args.paths, corpus)
+    corpus.save(target)
+    print(f"Imported {added} new recipes; corpus has {len(corpus)} recipes, {len(corpus.index)} index keys -> {target}")
+
+
+if __name__ == "__main__":
+    main()
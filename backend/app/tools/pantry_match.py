@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..ingredients import (
+    DIETARY_EXCLUSIONS,
+    PANTRY_STAPLES,
+    normalize_ingredients,
+    pantry_ingredients,
+    violates_dietary,
+)
+from ..models import FridgeInput, RecipeOption
+from .local_corpus import LocalCorpus, LocalRecipe, get_local_corpus
+
+try:
+    import numpy as np
+except Exception:  # NumPy is optional; Python ints are the fallback bitset.
+    np = None
+
+
+@dataclass(frozen=True, slots=True)
+class PantryMatch:
+    recipe: LocalRecipe
+    overlap: int
+    missing: Tuple[str, ...]
+    coverage: float
+
+
+def _popcount_rows(matrix) -> "np.ndarray":
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(matrix).sum(axis=1, dtype=np.int64)
+    # NumPy < 2.0: count bits byte-wise through a lookup table.
+    table = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+    as_bytes = matrix.view(np.uint8).reshape(matrix.shape[0], -1)
+    return table[as_bytes].sum(axis=1, dtype=np.int64)
+
+
+class PantryMatcher:
+    """
+    Pantry coverage over a local catalog. Every canonical ingredient gets a bit; each recipe is a
+    bitset, so overlap/missing counts are a couple of AND + popcount passes over the recipes the
+    corpus's inverted index preselects for the pantry.
+    """
+
+    def __init__(self, corpus: LocalCorpus) -> None:
+        self.corpus = corpus
+        self.vocab: Dict[str, int] = {}
+        self.names: List[str] = []
+        for recipe in corpus.recipes:
+            for name in recipe.names:
+                if name not in self.vocab:
+                    self.vocab[name] = len(self.names)
+                    self.names.append(name)
+        self._by_word: Dict[str, List[int]] = {}
+        for name, bit in self.vocab.items():
+            for word in set(name.split(" ")):
+                self._by_word.setdefault(word, []).append(bit)
+
+        self._bits = [self._mask(recipe.names) for recipe in corpus.recipes]
+        self._sizes = [bits.bit_count() for bits in self._bits]
+        self._times = [recipe.time_minutes or 0 for recipe in corpus.recipes]
+        # Exact names only: a staple "pepper" or "oil" must not cover "bell pepper" or "sesame oil".
+        self._staples = self._mask(PANTRY_STAPLES)
+        self._dietary: Dict[str, int] = {}
+
+        self._words = max(1, (len(self.names) + 63) // 64)
+        self._matrix = None
+        if np is not None and self._bits:
+            self._matrix = np.stack([self._to_words(bits) for bits in self._bits])
+            self._sizes_arr = np.array(self._sizes, dtype=np.int64)
+            self._times_arr = np.array(self._times, dtype=np.int64)
+
+    def _mask(self, names: Iterable[str]) -> int:
+        mask = 0
+        for name in names:
+            bit = self.vocab.get(name)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def _to_words(self, mask: int):
+        return np.frombuffer(mask.to_bytes(self._words * 8, "little"), dtype="<u8")
+
+    def _pantry_mask(self, ingredients: Iterable[str]) -> int:
+        # A pantry "onion" covers the recipe's "onion", "red onion" and "spring onion".
+        mask = 0
+        for name in normalize_ingredients(ingredients):
+            bit = self.vocab.get(name)
+            if bit is not None:
+                mask |= 1 << bit
+            if " " not in name:
+                for word_bit in self._by_word.get(name, ()):
+                    mask |= 1 << word_bit
+        return mask
+
+    def _dietary_mask(self, labels: Iterable[str]) -> int:
+        mask = 0
+        for label in labels:
+            key = label.strip().lower()
+            excluded = DIETARY_EXCLUSIONS.get(key)
+            if excluded is None:
+                continue
+            if key not in self._dietary:
+                self._dietary[key] = self._mask(
+                    name for name in self.names if violates_dietary(name, excluded)
+                )
+            mask |= self._dietary[key]
+        return mask
+
+    def _missing(self, bits: int) -> Tuple[str, ...]:
+        names = []
+        while bits:
+            low = bits & -bits
+            names.append(self.names[low.bit_length() - 1])
+            bits ^= low
+        return tuple(names)
+
+    def match(
+        self,
+        ingredients: Iterable[str],
+        dietary: Iterable[str] = (),
+        max_minutes: Optional[int] = None,
+        limit: int = 5,
+    ) -> List[PantryMatch]:
+        ingredients = list(ingredients)
+        user = self._pantry_mask(ingredients)
+        if not user or not self._bits:
+            return []
+        # The corpus index preselects recipes sharing at least one pantry ingredient, so only
+        # those rows are scored. Recipes added after this matcher was built are not in its bitsets.
+        rows = [row for row in self.corpus.candidates(ingredients) if row < len(self._bits)]
+        if not rows:
+            return []
+        pantry = user | self._staples
+        forbidden = self._dietary_mask(dietary)
+        if self._matrix is not None:
+            ranked = self._rank_numpy(rows, pantry, forbidden, max_minutes, limit)
+        else:
+            ranked = self._rank_python(rows, pantry, forbidden, max_minutes, limit)
+        results = []
+        for index, overlap in ranked:
+            size = self._sizes[index]
+            results.append(
+                PantryMatch(
+                    recipe=self.corpus.recipes[index],
+                    overlap=overlap,
+                    missing=self._missing(self._bits[index] & ~pantry),
+                    coverage=overlap / size if size else 0.0,
+                )
+            )
+        return results
+
+    def _rank_numpy(
+        self, rows: List[int], pantry: int, forbidden: int, max_minutes: Optional[int], limit: int
+    ) -> List[Tuple[int, int]]:
+        candidates = np.array(rows, dtype=np.int64)
+        matrix = self._matrix[candidates]
+        eligible = np.ones(candidates.size, dtype=bool)
+        if forbidden:
+            eligible &= ~(matrix & self._to_words(forbidden)).any(axis=1)
+        if max_minutes:
+            times = self._times_arr[candidates]
+            eligible &= (times == 0) | (times <= max_minutes)
+        if not eligible.all():
+            candidates, matrix = candidates[eligible], matrix[eligible]
+        if candidates.size == 0:
+            return []
+        hits = _popcount_rows(matrix & self._to_words(pantry))
+        sizes = np.maximum(self._sizes_arr[candidates], 1)
+        coverage = hits / sizes
+        if candidates.size > limit:
+            # Only rows at or above the k-th best coverage can make the cut (ties included).
+            cutoff = np.partition(coverage, candidates.size - limit)[candidates.size - limit]
+            keep = coverage >= cutoff
+            candidates, hits, sizes, coverage = candidates[keep], hits[keep], sizes[keep], coverage[keep]
+        # Coverage first, then more pantry items used, then fewer missing, then catalog order.
+        order = np.lexsort((candidates, sizes - hits, -hits, -coverage))[:limit]
+        return [(int(candidates[i]), int(hits[i])) for i in order]
+
+    def _rank_python(
+        self, rows: List[int], pantry: int, forbidden: int, max_minutes: Optional[int], limit: int
+    ) -> List[Tuple[int, int]]:
+        scored = []
+        for index in rows:
+            bits = self._bits[index]
+            if bits & forbidden:
+                continue
+            minutes = self._times[index]
+            if max_minutes and minutes and minutes > max_minutes:
+                continue
+            overlap = (bits & pantry).bit_count()
+            size = max(self._sizes[index], 1)
+            scored.append((-(overlap / size), -overlap, size - overlap, index, overlap))
+        scored.sort()
+        return [(item[3], item[4]) for item in scored[:limit]]
+
+
+_MATCHER: Optional[PantryMatcher] = None
+_MATCHER_LOCK = threading.Lock()
+
+
+def get_pantry_matcher(corpus: LocalCorpus) -> PantryMatcher:
+    # Rebuilt only when the corpus object changes (e.g. after reload_local_corpus()).
+    global _MATCHER
+    matcher = _MATCHER
+    if matcher is not None and matcher.corpus is corpus:
+        return matcher
+    with _MATCHER_LOCK:
+        if _MATCHER is None or _MATCHER.corpus is not corpus:
+            _MATCHER = PantryMatcher(corpus)
+        return _MATCHER
+
+
+def _to_option(match: PantryMatch, fridge_input: FridgeInput) -> RecipeOption:
+    recipe = match.recipe
+    return RecipeOption(
+        title=recipe.title,
+        cuisine=recipe.cuisine or fridge_input.cuisine_mood,
+        time_minutes=recipe.time_minutes or fridge_input.time_budget_minutes,
+        difficulty="easy",
+        ingredients=list(recipe.ingredients),
+        steps=list(recipe.steps),
+        notes=f"From the local recipe catalog ({match.overlap} of your ingredients).",
+        source="local",
+        source_url=recipe.source_url,
+        missing_ingredients=list(match.missing),
+    )
+
+
+def search_local_recipes(fridge_input: FridgeInput, limit: int = 5) -> List[RecipeOption]:
+    matcher = get_pantry_matcher(get_local_corpus())
+    matches = matcher.match(
+        pantry_ingredients(fridge_input),
+        dietary=fridge_input.dietary,
+        max_minutes=fridge_input.time_budget_minutes,
+        limit=limit,
+    )
+    return [_to_option(match, fridge_input) for match in matches]
@@ -1,27 +1,158 @@
 from __future__ import annotations
 
-from typing import List, Optional
-
-import requests
+from collections import Counter
+from typing import Any, Awaitable, Callable, List, Optional
 
+from ..admission import provider_limiter
+from ..cache import TieredCache, build_cache, make_cache_key
 from ..config import settings
+from ..deadline import Deadline, stage_timeout
+from ..ingredients import normalize_ingredient, normalize_ingredients
 from ..models import FridgeInput, RecipeOption
+from ..resilience import get_breaker
+from .http_client import provider_client
 
 
 def _to_csv(values: List[str]) -> str:
     return ",".join([v.strip() for v in values if v.strip()])
 
 
-def _mealdb_get(path: str, params: dict) -> dict | None:
+_provider_cache: TieredCache | None = None
+if settings.provider_cache_enabled:
+    _provider_cache = build_cache(
+        max_entries=settings.provider_cache_max_entries,
+        ttl_seconds=settings.spoonacular_ttl_seconds,
+        db_path=settings.provider_cache_db_path,
+        table="provider_responses",
+        disk_max_entries=settings.provider_cache_disk_max_entries,
+    )
+
+
+def provider_cache_stats() -> dict[str, Any] | None:
+    return _provider_cache.stats() if _provider_cache is not None else None
+
+
+def _cached_json(
+    namespace: str,
+    params: dict,
+    ttl_seconds: int,
+    fetch: Callable[[], dict | None],
+) -> dict | None:
+    # Failed fetches (None) are never cached, so errors are retried on the next request.
+    if _provider_cache is None:
+        return fetch()
+    key = make_cache_key(namespace, params, exclude=("apiKey",))
+    cached = _provider_cache.get(key)
+    if cached is not None:
+        return cached
+    data = fetch()
+    if data is not None:
+        _provider_cache.set(key, data, ttl_seconds=ttl_seconds)
+    return data
+
+
+async def _acached_json(
+    namespace: str,
+    params: dict,
+    ttl_seconds: int,
+    fetch: Callable[[], Awaitable[dict | None]],
+) -> dict | None:
+    if _provider_cache is None:
+        return await fetch()
+    key = make_cache_key(namespace, params, exclude=("apiKey",))
+    cached = _provider_cache.get(key)
+    if cached is not None:
+        return cached
+    data = await fetch()
+    if data is not None:
+        _provider_cache.set(key, data, ttl_seconds=ttl_seconds)
+    return data
+
+
+def _mealdb_url(path: str) -> str:
     api_key = settings.mealdb_api_key or "1"
-    url = f"https://www.themealdb.com/api/json/v1/{api_key}/{path}"
+    return f"https://www.themealdb.com/api/json/v1/{api_key}/{path}"
+
+
+def _provider_timeout(deadline: Optional[Deadline]) -> float:
+    # Per-call timeout: the provider default, shortened to what is left of the request deadline.
+    return stage_timeout(deadline, settings.provider_timeout_seconds)
+
+
+def _counts_as_failure(status_code: int) -> bool:
+    # Server errors and quota/rate limiting mean "route around this provider for a while".
+    return status_code >= 500 or status_code in (402, 429)
+
+
+def _provider_json(provider: str, url: str, params: dict, deadline: Optional[Deadline] = None) -> dict | None:
+    """
+    GET `url` through the provider's circuit breaker with an adaptive, deadline-bounded timeout.
+    Any failure (saturated pool, open circuit, timeout, HTTP error, bad JSON) returns None.
+    """
+    breaker = get_breaker(provider)
+    if _provider_timeout(deadline) <= 0:
+        return None
     try:
-        response = requests.get(url, params=params, timeout=10)
+        # Waiting for a provider slot eats into the same budget as the call itself.
+        with provider_limiter.slot(_provider_timeout(deadline)):
+            timeout = breaker.timeout(_provider_timeout(deadline))
+            if timeout <= 0:
+                return None
+            with breaker.attempt() as call:
+                response = provider_client.get(url, params=params, timeout=timeout)
+                if _counts_as_failure(response.status_code):
+                    call.fail()
+                data = response.json() if response.status_code == 200 else None
     except Exception:
         return None
-    if response.status_code != 200:
+    return data
+
+
+async def _aprovider_json(
+    provider: str, url: str, params: dict, deadline: Optional[Deadline] = None
+) -> dict | None:
+    breaker = get_breaker(provider)
+    if _provider_timeout(deadline) <= 0:
+        return None
+    try:
+        async with provider_limiter.aslot(_provider_timeout(deadline)):
+            timeout = breaker.timeout(_provider_timeout(deadline))
+            if timeout <= 0:
+                return None
+            with breaker.attempt() as call:
+                response = await provider_client.aget(url, params=params, timeout=timeout)
+                if _counts_as_failure(response.status_code):
+                    call.fail()
+                data = response.json() if response.status_code == 200 else None
+    except Exception:
         return None
-    return response.json()
+    return data
+
+
+def _mealdb_fetch(path: str, params: dict, deadline: Optional[Deadline] = None) -> dict | None:
+    return _provider_json("mealdb", _mealdb_url(path), params, deadline)
+
+
+async def _amealdb_fetch(path: str, params: dict, deadline: Optional[Deadline] = None) -> dict | None:
+    return await _aprovider_json("mealdb", _mealdb_url(path), params, deadline)
+
+
+def _mealdb_ttl(path: str) -> int:
+    if path == "lookup.php":
+        return settings.mealdb_lookup_ttl_seconds
+    return settings.mealdb_filter_ttl_seconds
+
+
+def _mealdb_get(path: str, params: dict, deadline: Optional[Deadline] = None) -> dict | None:
+    return _cached_json(
+        f"mealdb/{path}", params, _mealdb_ttl(path), lambda: _mealdb_fetch(path, params, deadline)
+    )
+
+
+async def _amealdb_get(path: str, params: dict, deadline: Optional[Deadline] = None) -> dict | None:
+    return await _acached_json(
+        f"mealdb/{path}", params, _mealdb_ttl(path), lambda: _amealdb_fetch(path, params, deadline)
+    )
 
 
 def _mealdb_extract_ingredients(meal: dict) -> List[str]:
@@ -34,32 +165,44 @@ def _mealdb_extract_ingredients(meal: dict) -> List[str]:
     return ingredients
 
 
-def _spoonacular_search(fridge_input: FridgeInput) -> List[RecipeOption]:
-    if not settings.spoonacular_api_key:
-        return []
+def _mealdb_ingredient_names(meal: dict) -> List[str]:
+    # Bare ingredient names (no measures), for matching against the user's pantry.
+    names: List[str] = []
+    for i in range(1, 21):
+        ing = (meal.get(f"strIngredient{i}") or "").strip()
+        if ing:
+            names.append(ing)
+    return names
+
+
+def _mealdb_steps(meal: dict) -> List[str]:
+    instructions = (meal.get("strInstructions") or "").strip()
+    return [s.strip() for s in instructions.split("\n") if s.strip()] or ["Follow the recipe instructions."]
+
 
+_SPOONACULAR_URL = "https://api.spoonacular.com/recipes/complexSearch"
+
+
+def _spoonacular_params(fridge_input: FridgeInput) -> dict:
     ingredients = fridge_input.main_vegetables + fridge_input.aromatics + fridge_input.spices
     if fridge_input.proteins:
         ingredients += fridge_input.proteins
 
-    params = {
+    return {
         "apiKey": settings.spoonacular_api_key,
-        "includeIngredients": _to_csv(ingredients),
+        # Sorted and normalized so equivalent pantries share one cache entry.
+        "includeIngredients": _to_csv(sorted(normalize_ingredients(ingredients))),
         "cuisine": fridge_input.cuisine_mood,
         "number": 5,
         "instructionsRequired": True,
         "addRecipeInformation": True,
     }
 
-    response = requests.get(
-        "https://api.spoonacular.com/recipes/complexSearch",
-        params=params,
-        timeout=10,
-    )
-    if response.status_code != 200:
+
+def _spoonacular_options(data: dict | None, fridge_input: FridgeInput) -> List[RecipeOption]:
+    if data is None:
         return []
 
-    data = response.json()
     results = []
     for item in data.get("results", []):
         instructions = item.get("analyzedInstructions") or []
@@ -82,34 +225,88 @@ def _spoonacular_search(fridge_input: FridgeInput) -> List[RecipeOption]:
     return results
 
 
-def _mealdb_search(fridge_input: FridgeInput) -> List[RecipeOption]:
-    # TheMealDB's free key "1" is intended for development/testing.
-    # The API supports filtering by a single ingredient; we pick the most salient ingredient.
-    seed_ingredient = (
-        (fridge_input.proteins[0] if fridge_input.proteins else None)
-        or (fridge_input.main_vegetables[0] if fridge_input.main_vegetables else None)
-        or None
-    )
-    if not seed_ingredient:
+def _spoonacular_search(fridge_input: FridgeInput, deadline: Optional[Deadline] = None) -> List[RecipeOption]:
+    if not settings.spoonacular_api_key:
         return []
+    params = _spoonacular_params(fridge_input)
+    data = _cached_json(
+        "spoonacular/complexSearch",
+        params,
+        settings.spoonacular_ttl_seconds,
+        lambda: _provider_json("spoonacular", _SPOONACULAR_URL, params, deadline),
+    )
+    return _spoonacular_options(data, fridge_input)
+
 
-    filtered = _mealdb_get("filter.php", {"i": seed_ingredient})
-    meals = (filtered or {}).get("meals") or []
-    if not meals:
+async def _aspoonacular_search(
+    fridge_input: FridgeInput, deadline: Optional[Deadline] = None
+) -> List[RecipeOption]:
+    if not settings.spoonacular_api_key:
         return []
+    params = _spoonacular_params(fridge_input)
+    data = await _acached_json(
+        "spoonacular/complexSearch",
+        params,
+        settings.spoonacular_ttl_seconds,
+        lambda: _aprovider_json("spoonacular", _SPOONACULAR_URL, params, deadline),
+    )
+    return _spoonacular_options(data, fridge_input)
 
-    results: List[RecipeOption] = []
-    for item in meals[:5]:
-        meal_id = item.get("idMeal")
-        if not meal_id:
+
+def _mealdb_filter_ingredients(fridge_input: FridgeInput) -> List[List[str]]:
+    # TheMealDB's free key "1" is intended for development/testing.
+    # The API filters by a single ingredient, so we fan out filter calls per ingredient
+    # and rank meals by how many of the user's ingredients they use. Ingredient names match
+    # exactly and some are stored in the plural ("Eggs"), so each ingredient is queried as
+    # the user wrote it and in its normalized form ("tomatoes" and "tomato").
+    groups: dict[str, List[str]] = {}
+    for name in fridge_input.proteins + fridge_input.main_vegetables + fridge_input.aromatics + fridge_input.spices:
+        key = normalize_ingredient(name)
+        if not key:
             continue
-        detail = _mealdb_get("lookup.php", {"i": meal_id})
+        terms = groups.setdefault(key, [])
+        for term in (" ".join(name.lower().split()), key):
+            if term not in terms:
+                terms.append(term)
+    return list(groups.values())[: max(1, settings.mealdb_max_filter_ingredients)]
+
+
+def _mealdb_filter_terms(groups: List[List[str]]) -> List[str]:
+    return [term for terms in groups for term in terms]
+
+
+def _mealdb_rank(groups: List[List[str]], filtered: List[dict | None]) -> List[str]:
+    # `filtered` holds one response per term of `groups`, in order; a meal counts once per ingredient.
+    counts: Counter[str] = Counter()
+    first_seen: dict[str, int] = {}
+    responses = iter(filtered)
+    for terms in groups:
+        meal_ids: dict[str, None] = {}
+        for response in (next(responses) for _ in terms):
+            for item in (response or {}).get("meals") or []:
+                if item.get("idMeal"):
+                    meal_ids[item["idMeal"]] = None
+        for meal_id in meal_ids:
+            counts[meal_id] += 1
+            first_seen.setdefault(meal_id, len(first_seen))
+
+    # Most matched ingredients first; ties keep the order of the most salient ingredient.
+    ranked = sorted(counts, key=lambda meal_id: (-counts[meal_id], first_seen[meal_id]))
+    return ranked[: settings.mealdb_top_k]
+
+
+def _mealdb_options(
+    meal_ids: List[str],
+    details: List[dict | None],
+    fridge_input: FridgeInput,
+) -> List[RecipeOption]:
+    results: List[RecipeOption] = []
+    for meal_id, detail in zip(meal_ids, details):
         meal = ((detail or {}).get("meals") or [None])[0]
         if not meal:
             continue
 
-        instructions = (meal.get("strInstructions") or "").strip()
-        steps = [s.strip() for s in instructions.split("\n") if s.strip()] or ["Follow the recipe instructions."]
+        steps = _mealdb_steps(meal)
         results.append(
             RecipeOption(
                 title=meal.get("strMeal") or "Meal option",
@@ -126,26 +323,100 @@ def _mealdb_search(fridge_input: FridgeInput) -> List[RecipeOption]:
     return results
 
 
-def search_recipes(fridge_input: FridgeInput) -> List[RecipeOption]:
+def _mealdb_search(fridge_input: FridgeInput, deadline: Optional[Deadline] = None) -> List[RecipeOption]:
+    groups = _mealdb_filter_ingredients(fridge_input)
+    if not groups:
+        return []
+
+    filtered = provider_client.map(
+        lambda term: _mealdb_get("filter.php", {"i": term}, deadline), _mealdb_filter_terms(groups)
+    )
+    meal_ids = _mealdb_rank(groups, filtered)
+    if not meal_ids:
+        return []
+    # Detail lookups are independent, so fetch them in parallel over the pooled client.
+    details = provider_client.map(lambda meal_id: _mealdb_get("lookup.php", {"i": meal_id}, deadline), meal_ids)
+    return _mealdb_options(meal_ids, details, fridge_input)
+
+
+async def _amealdb_search(fridge_input: FridgeInput, deadline: Optional[Deadline] = None) -> List[RecipeOption]:
+    groups = _mealdb_filter_ingredients(fridge_input)
+    if not groups:
+        return []
+
+    filtered = await provider_client.amap(
+        lambda term: _amealdb_get("filter.php", {"i": term}, deadline), _mealdb_filter_terms(groups)
+    )
+    meal_ids = _mealdb_rank(groups, filtered)
+    if not meal_ids:
+        return []
+    details = await provider_client.amap(
+        lambda meal_id: _amealdb_get("lookup.php", {"i": meal_id}, deadline), meal_ids
+    )
+    return _mealdb_options(meal_ids, details, fridge_input)
+
+
+def _top_up(options: List[RecipeOption], extra: List[RecipeOption]) -> List[RecipeOption]:
+    existing = {o.title.strip().lower() for o in options}
+    for o in extra:
+        if len(options) >= 5:
+            break
+        if o.title.strip().lower() not in existing:
+            options.append(o)
+    return options
+
+
+def _provider() -> str:
+    return settings.recipe_source_provider.lower().strip()
+
+
+def search_recipes(fridge_input: FridgeInput, deadline: Optional[Deadline] = None) -> List[RecipeOption]:
     if not settings.recipe_source_enabled:
         return []
 
-    provider = settings.recipe_source_provider.lower().strip()
+    provider = _provider()
     if provider == "auto":
         # Prefer Spoonacular when a key exists; top up with TheMealDB if needed.
         options: List[RecipeOption] = []
         if settings.spoonacular_api_key:
-            options.extend(_spoonacular_search(fridge_input))
+            options.extend(_spoonacular_search(fridge_input, deadline))
+        if len(options) < 5:
+            options = _top_up(options, _mealdb_search(fridge_input, deadline))
+        return options
+    if provider == "spoonacular":
+        return _spoonacular_search(fridge_input, deadline)
+    if provider == "mealdb":
+        return _mealdb_search(fridge_input, deadline)
+    if provider == "local":
+        from .pantry_match import search_local_recipes
+
+        return search_local_recipes(fridge_input)
+    return []
+
+
+async def asearch_recipes(fridge_input: FridgeInput, deadline: Optional[Deadline] = None) -> List[RecipeOption]:
+    """
+    Async `search_recipes`: same providers and ordering, with network calls on the event loop.
+    Every provider call is bounded by the time left on `deadline`.
+    """
+    if not settings.recipe_source_enabled:
+        return []
+
+    provider = _provider()
+    if provider == "auto":
+        options: List[RecipeOption] = []
+        if settings.spoonacular_api_key:
+            options.extend(await _aspoonacular_search(fridge_input, deadline))
         if len(options) < 5:
-            existing = {o.title.strip().lower() for o in options}
-            for o in _mealdb_search(fridge_input):
-                if o.title.strip().lower() not in existing:
-                    options.append(o)
-                if len(options) >= 5:
-                    break
+            options = _top_up(options, await _amealdb_search(fridge_input, deadline))
         return options
     if provider == "spoonacular":
-        return _spoonacular_search(fridge_input)
+        return await _aspoonacular_search(fridge_input, deadline)
     if provider == "mealdb":
-        return _mealdb_search(fridge_input)
+        return await _amealdb_search(fridge_input, deadline)
+    if provider == "local":
+        from .pantry_match import search_local_recipes
+
+        # In-memory bitset match; fast enough to run inline.
+        return search_local_recipes(fridge_input)
     return []
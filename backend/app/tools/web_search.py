@@ -1,20 +1,361 @@
 from __future__ import annotations
 
-from typing import List
+import abc
+import asyncio
+import math
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
 
 from duckduckgo_search import DDGS
 
+from ..admission import TokenBucket
+from ..cache import TieredCache, build_cache
 from ..config import settings
+from ..ingredients import normalize_ingredient
+from ..resilience import CLOSED, get_breaker
+from ..singleflight import SingleFlight
 
+_DEFAULT_TIMEOUT_SECONDS = 10.0
+_DEFAULT_MAX_RESULTS = 4
 
-def web_search(query: str, max_results: int = 4) -> List[str]:
+# Queries whose popularity is tracked for prefetching; the long tail is dropped.
+_MAX_TRACKED_QUERIES = 1024
+
+# Prefetch refreshes a popular entry once it is this far into its TTL, so it never goes cold.
+_PREFETCH_REFRESH_AFTER = 0.75
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Cache key for a query: lowercase words, singularized, de-duplicated and sorted, so
+    "Thai weeknight recipe with Carrots, Peppers" and "thai ... with pepper, carrot" match.
+    """
+    return " ".join(sorted({normalize_ingredient(token) for token in _TOKEN.findall((query or "").lower())}))
+
+
+class WebSearchBackend(abc.ABC):
+    """
+    Source of web snippets. `search` may raise; the service counts that as a failure.
+    """
+
+    name = "base"
+
+    @abc.abstractmethod
+    def search(self, query: str, max_results: int, timeout: float) -> List[str]:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class _PacedByCaller(DDGS):
+    # DDGS sleeps 0.75s between requests on the same instance; the service's token bucket
+    # does the pacing instead, so a shared session doesn't serialize every query.
+    def _sleep(self, sleeptime: float = 0.75) -> None:
+        return None
+
+
+class DDGSBackend(WebSearchBackend):
+    """
+    DuckDuckGo text search over long-lived sessions, reusing connections and cookies
+    across queries. DDGS fixes its timeout per session, so there is one session per
+    whole-second timeout (at most a handful).
+    """
+
+    name = "ddgs"
+
+    def __init__(self) -> None:
+        self._sessions: Dict[int, DDGS] = {}
+        self._lock = threading.Lock()
+
+    def _session(self, timeout: float) -> DDGS:
+        seconds = max(1, math.ceil(timeout))
+        session = self._sessions.get(seconds)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(seconds)
+                if session is None:
+                    session = _PacedByCaller(timeout=seconds)
+                    self._sessions[seconds] = session
+        return session
+
+    def search(self, query: str, max_results: int, timeout: float) -> List[str]:
+        items = self._session(timeout).text(query, max_results=max_results) or []
+        return [item.get("body") or "" for item in items if item.get("body")]
+
+    def close(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+
+
+class FakeWebSearchBackend(WebSearchBackend):
+    """
+    Offline stand-in with canned, deterministic snippets and optional simulated latency,
+    for tests and benchmarks.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency_seconds: float = 0.0) -> None:
+        self.latency_seconds = max(0.0, latency_seconds)
+        self.calls = 0
+
+    def search(self, query: str, max_results: int, timeout: float) -> List[str]:
+        self.calls += 1
+        if self.latency_seconds:
+            time.sleep(min(self.latency_seconds, timeout))
+            if self.latency_seconds > timeout:
+                raise TimeoutError(f"fake web search exceeded {timeout:.2f}s")
+        return [f"Result {i + 1} for '{query}': a quick, flexible weeknight idea." for i in range(max_results)]
+
+
+def build_backend(name: Optional[str] = None) -> WebSearchBackend:
+    name = (name or settings.web_search_backend).lower().strip()
+    if name == "fake":
+        return FakeWebSearchBackend(settings.web_search_fake_latency_ms / 1000)
+    if name == "ddgs":
+        return DDGSBackend()
+    raise ValueError(f"unknown web search backend: {name!r}")
+
+
+class WebSearchService:
+    """
+    Web search behind a normalized-query TTL cache, single-flight for identical in-flight
+    queries, a token-bucket rate limit and the `web_search` circuit breaker. Failures and
+    throttled calls return no snippets and are never cached.
+    """
+
+    def __init__(
+        self,
+        backend: WebSearchBackend,
+        cache: Optional[TieredCache],
+        bucket: TokenBucket,
+        ttl_seconds: float,
+    ) -> None:
+        self.backend = backend
+        self.cache = cache
+        self.bucket = bucket
+        self.ttl_seconds = ttl_seconds
+        self._inflight = SingleFlight()
+        self._lock = threading.Lock()
+        # normalized key -> hits since the last prefetch round, and the query to replay
+        self._popular: Counter[str] = Counter()
+        self._queries: Dict[str, Tuple[str, int]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.throttled = 0
+        self.errors = 0
+        self.prefetched = 0
+
+    def _note(self, key: str, query: str, max_results: int) -> None:
+        with self._lock:
+            self._popular[key] += 1
+            self._queries[key] = (query, max_results)
+            if len(self._popular) > _MAX_TRACKED_QUERIES:
+                keep = dict(self._popular.most_common(_MAX_TRACKED_QUERIES // 2))
+                self._popular = Counter(keep)
+                self._queries = {k: v for k, v in self._queries.items() if k in keep}
+
+    def _cached(self, key: str, max_results: int) -> Optional[dict]:
+        if self.cache is None:
+            return None
+        entry = self.cache.get(key)
+        if entry is None or entry.get("max_results", 0) < max_results:
+            return None
+        return entry
+
+    def search(
+        self,
+        query: str,
+        max_results: int = _DEFAULT_MAX_RESULTS,
+        timeout: Optional[float] = None,
+    ) -> List[str]:
+        key = normalize_query(query)
+        self._note(key, query, max_results)
+        entry = self._cached(key, max_results)
+        if entry is not None:
+            self.hits += 1
+            return entry["snippets"][:max_results]
+        self.misses += 1
+        timeout = _DEFAULT_TIMEOUT_SECONDS if timeout is None else timeout
+        return self._inflight.do(
+            f"{key}|{max_results}", lambda: self._fetch(key, query, max_results, timeout, rate_wait=timeout)
+        )
+
+    def _fetch(self, key: str, query: str, max_results: int, timeout: float, rate_wait: float) -> List[str]:
+        started = time.monotonic()
+        if not self.bucket.acquire(rate_wait):
+            self.throttled += 1
+            return []
+        # Waiting for a token counts against the caller's timeout.
+        remaining = timeout - (time.monotonic() - started)
+        if remaining <= 0:
+            return []
+        breaker = get_breaker("web_search")
+        try:
+            with breaker.attempt():
+                snippets = self.backend.search(query, max_results, breaker.timeout(remaining))
+        except Exception:
+            # Web search is optional context: an outage (or an open circuit) just means no snippets.
+            self.errors += 1
+            return []
+        if self.cache is not None and snippets:
+            self.cache.set(
+                key,
+                {"snippets": snippets, "max_results": max_results, "fetched_at": time.time()},
+                self.ttl_seconds,
+            )
+        return snippets
+
+    def prefetch_once(self, top_k: Optional[int] = None) -> int:
+        """
+        Refresh the most requested queries that are missing from the cache or close to
+        expiry, using only spare rate-limit tokens. Returns the number of queries fetched.
+        """
+        if self.cache is None:
+            return 0
+        with self._lock:
+            popular = [key for key, _ in self._popular.most_common(top_k or settings.web_search_prefetch_top_k)]
+            candidates = [(key, *self._queries[key]) for key in popular]
+            # Decay, so popularity reflects recent traffic.
+            self._popular = Counter({key: count // 2 for key, count in self._popular.items() if count > 1})
+            self._queries = {key: value for key, value in self._queries.items() if key in self._popular}
+        refresh_before = time.time() - self.ttl_seconds * _PREFETCH_REFRESH_AFTER
+        fetched = 0
+        for key, query, max_results in candidates:
+            entry = self.cache.get(key)
+            if entry is not None and entry.get("fetched_at", 0) > refresh_before:
+                continue
+            if get_breaker("web_search").state != CLOSED:
+                break
+            if self._fetch(key, query, max_results, _DEFAULT_TIMEOUT_SECONDS, rate_wait=0):
+                fetched += 1
+            elif self.bucket.stats()["tokens"] < 1:
+                # Out of spare tokens: leave the rest to the next round.
+                break
+        self.prefetched += fetched
+        return fetched
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "throttled": self.throttled,
+            "errors": self.errors,
+            "prefetched": self.prefetched,
+            "tracked_queries": len(self._popular),
+            "rate_limit": self.bucket.stats(),
+            "store": self.cache.stats() if self.cache is not None else None,
+        }
+
+
+class WebSearchPrefetcher:
+    """
+    Background thread that calls `prefetch_once` every `WEB_SEARCH_PREFETCH_INTERVAL_SECONDS`,
+    keeping popular cuisine/vegetable queries warm.
+    """
+
+    def __init__(self, service: WebSearchService, interval_seconds: float) -> None:
+        self.service = service
+        self.interval_seconds = max(1.0, interval_seconds)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="web-search-prefetch", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.service.prefetch_once()
+            except Exception:
+                # A bad round must not kill the worker; the next one starts from scratch.
+                continue
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+def _build_service() -> WebSearchService:
+    cache = None
+    if settings.web_search_cache_enabled:
+        cache = build_cache(
+            max_entries=settings.web_search_cache_max_entries,
+            ttl_seconds=settings.web_search_cache_ttl_seconds,
+            db_path=settings.web_search_cache_db_path,
+            table="web_search",
+        )
+    return WebSearchService(
+        build_backend(),
+        cache,
+        TokenBucket("web_search", settings.web_search_rate_per_second, settings.web_search_burst),
+        ttl_seconds=settings.web_search_cache_ttl_seconds,
+    )
+
+
+_SERVICE: Optional[WebSearchService] = None
+_SERVICE_LOCK = threading.Lock()
+_prefetcher: Optional[WebSearchPrefetcher] = None
+
+
+def get_web_search_service() -> WebSearchService:
+    global _SERVICE
+    if _SERVICE is None:
+        with _SERVICE_LOCK:
+            if _SERVICE is None:
+                _SERVICE = _build_service()
+    return _SERVICE
+
+
+def set_web_search_backend(backend: WebSearchBackend) -> None:
+    # Swap the backend (e.g. a fake in tests or benchmarks) without touching cache or limits.
+    get_web_search_service().backend = backend
+
+
+def start_prefetch() -> None:
+    global _prefetcher
+    if not (settings.web_search_enabled and settings.web_search_prefetch_enabled) or _prefetcher is not None:
+        return
+    _prefetcher = WebSearchPrefetcher(get_web_search_service(), settings.web_search_prefetch_interval_seconds)
+    _prefetcher.start()
+
+
+def stop_prefetch() -> None:
+    global _prefetcher
+    if _prefetcher is not None:
+        _prefetcher.stop()
+        _prefetcher = None
+
+
+def web_search_stats() -> dict[str, Any] | None:
+    return _SERVICE.stats() if _SERVICE is not None else None
+
+
+def web_search(query: str, max_results: int = _DEFAULT_MAX_RESULTS, timeout: Optional[float] = None) -> List[str]:
     if not settings.web_search_enabled:
         return []
+    return get_web_search_service().search(query, max_results, timeout)
 
-    results: List[str] = []
-    with DDGS() as ddgs:
-        for item in ddgs.text(query, max_results=max_results):
-            snippet = item.get("body") or ""
-            if snippet:
-                results.append(snippet)
-    return results
+
+async def aweb_search(
+    query: str, max_results: int = _DEFAULT_MAX_RESULTS, timeout: Optional[float] = None
+) -> List[str]:
+    # duckduckgo_search only ships a blocking client; keep it off the event loop.
+    if not settings.web_search_enabled:
+        return []
+    return await asyncio.to_thread(web_search, query, max_results, timeout)
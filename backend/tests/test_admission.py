@@ -0,0 +1,30 @@
+import asyncio
+
+import pytest
+
+from app.admission import AdmissionController, Overloaded
+
+
+def test_timed_out_waiters_free_their_queue_places():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=2, queue_timeout_seconds=0.01)
+        async with controller.admit():
+            for _ in range(2):
+                with pytest.raises(Overloaded, match="queue timeout"):
+                    async with controller.admit():
+                        pass
+            assert controller.stats()["queue_depth"] == 0
+
+            async def queued() -> None:
+                async with controller.admit(max_wait=1.0):
+                    pass
+
+            # The queue is empty again, so a fresh request waits instead of being rejected.
+            task = asyncio.create_task(queued())
+            await asyncio.sleep(0)
+            assert controller.stats()["queue_depth"] == 1
+        await task
+        assert controller.stats()["rejected_queue_full"] == 0
+        assert controller.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
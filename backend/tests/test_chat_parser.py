@@ -0,0 +1,106 @@
+from app.chat_parser import apply_message, parse_message
+from app.models import FridgeInput
+
+
+def test_routes_ingredients_by_category():
+    parsed = parse_message("I have 2 zucchinis, some tofu and ginger, cumin, spicy please, serves 4")
+    assert parsed.main_vegetables == ["zucchini"]
+    assert parsed.proteins == ["tofu"]
+    assert parsed.aromatics == ["ginger"]
+    assert parsed.spices == ["cumin"]
+    assert parsed.cuisine_mood == "spicy"
+    assert parsed.servings == 4
+
+
+def test_apply_message_deduplicates_normalized_names():
+    fridge_input = apply_message(FridgeInput(aromatics=["Onions"]), "onion, onions and garlic, vegan, 25 mins")
+    assert fridge_input.aromatics == ["Onions", "garlic"]
+    assert fridge_input.dietary == ["vegan"]
+    assert fridge_input.time_budget_minutes == 25
+
+
+def test_bare_pepper_is_black_pepper_and_salt_is_a_staple():
+    parsed = parse_message("salt and pepper chicken")
+    assert parsed.main_vegetables == []
+    assert parsed.spices == ["salt", "black pepper"]
+    assert parsed.proteins == ["chicken"]
+
+
+def test_plural_peppers_are_bell_peppers():
+    parsed = parse_message("2 peppers and a red pepper")
+    assert parsed.main_vegetables == ["bell pepper"]
+    assert parsed.spices == []
+
+
+def test_each_bean_is_its_own_ingredient():
+    assert parse_message("kidney beans").proteins == ["kidney bean"]
+    parsed = parse_message("black beans, cannellini beans and green beans")
+    assert parsed.proteins == ["black bean", "cannellini bean"]
+    assert parsed.main_vegetables == ["green bean"]
+
+
+def test_numbers_and_filler_are_not_ingredients():
+    for message in ("dinner for two", "dinner for 2 people", "hi, can you help me?", "a couple of ideas"):
+        parsed = parse_message(message)
+        assert parsed.ingredients == [], message
+    assert parse_message("dinner for two").servings == 2
+    assert parse_message("two carrots").main_vegetables == ["carrot"]
+
+
+def test_unknown_short_items_are_still_kept():
+    parsed = parse_message("leftover rice, eggs and a jar of harissa paste")
+    assert parsed.main_vegetables == ["rice", "harissa paste"]
+    assert parsed.proteins == ["egg"]
+
+
+def test_hours_after_for_are_a_time_budget_not_servings():
+    parsed = parse_message("cook for one hour")
+    assert parsed.time_budget_minutes == 60
+    assert parsed.servings is None
+    assert parsed.ingredients == []
+
+
+def test_greetings_and_contractions_are_not_ingredients():
+    for message in (
+        "Hi! I'd love some ideas",
+        "Good morning! What can I make tonight?",
+        "thanks, that's great",
+        "we've got nothing, I'm hungry",
+    ):
+        assert parse_message(message).ingredients == [], message
+
+
+def test_contractions_around_ingredients():
+    assert parse_message("I’m craving pasta").main_vegetables == ["pasta"]
+    assert parse_message("we don't have much, just rice").main_vegetables == ["rice"]
+    assert parse_message("we've got leeks, that's it").ingredients == ["leek"]
+
+
+def test_greeting_turn_asks_for_ingredients():
+    from app.main import _apply_chat_turn
+    from app.models import ChatMessage, ChatTurnRequest
+
+    payload = ChatTurnRequest(messages=[ChatMessage(role="user", content="Hi! I'd love some ideas")])
+    fridge_input, missing = _apply_chat_turn(payload)
+    assert missing == ["ingredients"]
+    assert fridge_input.main_vegetables == []
+
+
+def test_words_after_a_known_ingredient_are_kept():
+    parsed = parse_message("chicken stock and egg noodles")
+    assert parsed.spices == ["chicken stock"]
+    assert parsed.main_vegetables == ["egg noodle"]
+    assert parsed.proteins == []
+    assert parse_message("beef mince and tomato paste").main_vegetables == ["tomato paste"]
+
+
+def test_red_pepper_flakes_are_chili():
+    parsed = parse_message("red pepper flakes")
+    assert parsed.spices == ["chili"]
+    assert parsed.main_vegetables == []
+
+
+def test_words_before_a_known_ingredient_qualify_it():
+    parsed = parse_message("smoked tofu, coconut milk and a quick chicken curry")
+    assert parsed.proteins == ["tofu", "chicken"]
+    assert parsed.main_vegetables == ["coconut milk"]
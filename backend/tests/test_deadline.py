@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app import deadline as deadline_module
+from app.deadline import DEADLINE_HEADER, FINALIZE_RESERVE_SECONDS, Deadline, request_deadline, stage_timeout
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(deadline_module, "time", SimpleNamespace(monotonic=fake))
+    monkeypatch.setattr(deadline_module.settings, "max_request_deadline_seconds", 30.0)
+    return fake
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        (None, 8.0),
+        ("2500", 2.5),
+        ("120000", 30.0),  # clamped to MAX_REQUEST_DEADLINE_SECONDS
+        ("-5", 0.0),
+        ("0", 0.0),
+        ("soon", 8.0),
+        ("nan", 8.0),
+        ("inf", 8.0),
+    ],
+)
+def test_request_deadline_header_is_clamped(clock, header, expected):
+    headers = {DEADLINE_HEADER: header} if header is not None else {}
+
+    assert request_deadline(headers, default_seconds=8.0).remaining() == pytest.approx(expected)
+
+
+def test_default_is_clamped_too(clock):
+    assert request_deadline({}, default_seconds=90.0).remaining() == pytest.approx(30.0)
+
+
+def test_timeout_keeps_the_finalize_reserve_and_honors_the_cap(clock):
+    deadline = Deadline(2.0)
+
+    assert deadline.timeout() == pytest.approx(2.0 - FINALIZE_RESERVE_SECONDS)
+    assert deadline.timeout(cap=0.5) == 0.5
+    clock.now += 1.99
+    assert deadline.timeout(cap=0.5) == 0.0
+    assert deadline.expired()
+
+
+def test_deadline_expires_inside_the_reserve(clock):
+    deadline = Deadline(1.0)
+
+    clock.now += 1.0 - FINALIZE_RESERVE_SECONDS - 0.01
+    assert not deadline.expired()
+    clock.now += 0.02
+    assert deadline.expired()
+    clock.now += 10
+    assert deadline.remaining() == 0.0
+
+
+def test_stage_uses_a_share_of_the_time_left(clock):
+    deadline = Deadline(10.0)
+    clock.now += 2.0
+
+    retrieval = deadline.stage(0.25)
+
+    assert retrieval.remaining() == pytest.approx(2.0)
+    # Never past the request deadline, whatever the share.
+    assert deadline.stage(3.0).expires_at == deadline.expires_at
+    assert deadline.stage(-1.0).remaining() == 0.0
+
+
+def test_stage_timeout_without_a_deadline_is_the_cap(clock):
+    assert stage_timeout(None, 4.0) == 4.0
+    assert stage_timeout(Deadline(1.0), 4.0) == pytest.approx(1.0 - FINALIZE_RESERVE_SECONDS)
@@ -0,0 +1,155 @@
+import threading
+import time
+
+import pytest
+
+from app.embeddings import EmbeddingService
+
+
+class FakeEncoder:
+    """
+    Records every batch; `hold()` makes the next encode block until `release()`.
+    """
+
+    def __init__(self) -> None:
+        self.batches: list = []
+        self._gate = threading.Event()
+        self._gate.set()
+        self.started = threading.Event()
+
+    def hold(self) -> None:
+        self._gate.clear()
+        self.started.clear()
+
+    def release(self) -> None:
+        self._gate.set()
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        self.started.set()
+        self._gate.wait(2)
+        return [[float(len(text))] for text in texts]
+
+
+def _wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def _embed_in_threads(service: EmbeddingService, texts) -> tuple:
+    results: dict = {}
+
+    def call(index: int, text: str) -> None:
+        results[index] = service.embed(text)
+
+    threads = [threading.Thread(target=call, args=(index, text)) for index, text in enumerate(texts)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def _join(threads) -> None:
+    for thread in threads:
+        thread.join(2)
+
+
+def test_lone_caller_does_not_wait_for_the_window():
+    encoder = FakeEncoder()
+    service = EmbeddingService(encoder, batch_window_seconds=5.0)
+
+    started = time.monotonic()
+    assert service.embed("tomato soup") == [11.0]
+
+    assert time.monotonic() - started < 1.0
+    assert encoder.batches == [["tomato soup"]]
+
+
+def test_cache_hits_skip_encode_and_ignore_whitespace():
+    encoder = FakeEncoder()
+    service = EmbeddingService(encoder)
+
+    service.embed("tomato soup")
+    assert service.embed("  tomato   soup ") == [11.0]
+
+    assert encoder.batches == [["tomato soup"]]
+    assert service.stats()["cache"]["hits"] == 1
+
+
+def test_callers_queue_behind_a_running_encode_into_one_batch():
+    encoder = FakeEncoder()
+    service = EmbeddingService(encoder, batch_window_seconds=5.0)
+    encoder.hold()
+    first, _ = _embed_in_threads(service, ["first"])
+    assert encoder.started.wait(2)
+
+    others, results = _embed_in_threads(service, ["a", "bb", "a", " a ", "ccc"])
+    _wait_for(lambda: service._queued == 5)
+    encoder.release()
+    _join(first + others)
+
+    assert encoder.batches[0] == ["first"]
+    # Everyone who queued behind the first encode shares one batch, duplicates in one slot.
+    assert sorted(map(sorted, encoder.batches[1:])) == [["a", "bb", "ccc"]]
+    assert [results[index] for index in range(5)] == [[1.0], [2.0], [1.0], [1.0], [3.0]]
+    assert service.stats()["largest_batch"] == 3
+
+
+def test_full_batch_flushes_without_waiting_for_the_window():
+    encoder = FakeEncoder()
+    service = EmbeddingService(encoder, batch_window_seconds=5.0, max_batch=2)
+    encoder.hold()
+    first, _ = _embed_in_threads(service, ["first"])
+    assert encoder.started.wait(2)
+
+    encoder.started.clear()
+    others, _ = _embed_in_threads(service, ["a", "b"])
+    # The second batch starts while the first encode is still blocked.
+    assert encoder.started.wait(2)
+    assert sorted(encoder.batches[1]) == ["a", "b"]
+    encoder.release()
+    _join(first + others)
+
+
+def test_text_already_encoding_is_not_encoded_twice():
+    encoder = FakeEncoder()
+    service = EmbeddingService(encoder, batch_window_seconds=5.0)
+    encoder.hold()
+    first, results = _embed_in_threads(service, ["tomato"])
+    assert encoder.started.wait(2)
+
+    second, more = _embed_in_threads(service, ["tomato"])
+    _wait_for(lambda: service._active == 2)
+    encoder.release()
+    _join(first + second)
+
+    assert encoder.batches == [["tomato"]]
+    assert results[0] == more[0] == [6.0]
+
+
+def test_text_is_reencoded_without_a_cache():
+    encoder = FakeEncoder()
+    service = EmbeddingService(encoder, cache_size=0)
+
+    service.embed("tomato")
+    service.embed("tomato")
+
+    assert encoder.batches == [["tomato"], ["tomato"]]
+    assert service.stats()["cache"] is None
+
+
+def test_encode_errors_reach_every_caller_and_are_not_cached():
+    calls = []
+
+    def broken(texts):
+        calls.append(list(texts))
+        raise RuntimeError("model failed")
+
+    service = EmbeddingService(broken)
+    for _ in range(2):
+        with pytest.raises(RuntimeError, match="model failed"):
+            service.embed("tomato")
+
+    assert calls == [["tomato"], ["tomato"]]
+    assert service._encoding == {} and service._pending == {}
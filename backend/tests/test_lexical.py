@@ -0,0 +1,43 @@
+from app.lexical import LexicalIndex, tokenize
+
+
+def test_index_persists_and_ranks_by_bm25(tmp_path):
+    path = tmp_path / "recipes.lexical.sqlite"
+    index = LexicalIndex(path)
+    added = index.add_many(
+        [
+            ("a", "Thai carrot curry with coconut"),
+            ("b", "Italian tomato pasta"),
+            ("c", "Carrot and ginger soup"),
+        ]
+    )
+    assert added == 3
+    assert not index.add("a", "Thai carrot curry with coconut")
+    index.close()
+
+    reopened = LexicalIndex(path)
+    assert len(reopened) == 3 and "b" in reopened
+    hits = reopened.search("thai recipes with carrots", top_k=2)
+    assert [hit.id for hit in hits] == ["a", "c"]
+    assert hits[0].coverage == 1.0 and hits[1].coverage < 1.0
+    reopened.clear()
+    assert len(reopened) == 0 and reopened.search("carrot") == []
+
+
+def test_changed_text_replaces_the_document_and_delete_removes_it(tmp_path):
+    index = LexicalIndex(tmp_path / "recipes.lexical.sqlite")
+    index.add_many([("a", "carrot soup"), ("b", "tomato pasta")])
+    assert index.add_many([("a", "leek soup"), ("b", "tomato pasta")]) == 1
+    assert len(index) == 2
+    assert index.search("carrot") == []
+    assert [hit.text for hit in index.search("leek")] == ["leek soup"]
+
+    assert index.delete_many(["b", "missing"]) == 1
+    assert len(index) == 1 and "b" not in index
+    assert index.search("tomato") == []
+    index.add("c", "tomato salad")
+    assert {hit.id for hit in index.search("tomato soup")} == {"a", "c"}
+
+
+def test_tokenize_singularizes_like_ingredient_names_and_drops_template_words():
+    assert tokenize("Recipes with Roasted Tomatoes and 2 Eggs") == ["roasted", "tomato", "2", "egg"]
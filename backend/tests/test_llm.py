@@ -0,0 +1,23 @@
+import asyncio
+
+from app import llm
+from app.config import settings
+
+
+def test_each_event_loop_gets_its_own_async_pool(monkeypatch):
+    monkeypatch.setattr(settings, "openai_api_key", "sk-test")
+    llm.reset_llm_clients()
+
+    async def pool():
+        model = llm.get_chat_model("gpt-4o-mini")
+        assert model is llm.get_chat_model("gpt-4o-mini")
+        return model.http_async_client
+
+    try:
+        first, second = asyncio.run(pool()), asyncio.run(pool())
+        assert first is not None and second is not None
+        assert first is not second
+        # Outside a loop the model is for sync calls only and shares the sync pool.
+        assert llm.get_chat_model("gpt-4o-mini").http_client is llm._HTTP_CLIENT
+    finally:
+        llm.reset_llm_clients()
@@ -0,0 +1,55 @@
+import json
+from types import SimpleNamespace
+
+from langchain_openai import ChatOpenAI
+
+from app.llm_cache import LLMCache
+from app.models import FridgeInput
+
+
+def test_cache_keys_include_the_endpoint():
+    cache = LLMCache()
+    stub = ChatOpenAI(model="gpt-4o-mini", api_key="sk-test", base_url="http://127.0.0.1:8000/v1")
+    real = ChatOpenAI(model="gpt-4o-mini", api_key="sk-test")
+    prompt = {"ingredients": ["onion"]}
+    assert cache._exact_key(stub, []) != cache._exact_key(real, [])
+    assert cache._normalized_key(stub, prompt) != cache._normalized_key(real, prompt)
+    assert cache._exact_key(real, []) == cache._exact_key(ChatOpenAI(model="gpt-4o-mini", api_key="sk-other"), [])
+
+
+class _FakePlanner:
+    model_name = "fake-planner"
+    temperature = 0.7
+
+    def __init__(self, *contents: str) -> None:
+        self.contents = list(contents)
+        self.calls = 0
+
+    def invoke(self, messages, timeout=None):
+        self.calls += 1
+        return SimpleNamespace(content=self.contents.pop(0))
+
+
+def test_planner_caches_only_answers_that_parse(monkeypatch):
+    from app import graph
+
+    monkeypatch.setattr(graph, "llm_cache", LLMCache())
+    fridge_input = FridgeInput(main_vegetables=["onion"])
+    recipe = json.dumps({"title": "Onion tart", "ingredients": ["onion"], "steps": ["Bake."]})
+    llm = _FakePlanner("Sorry, I can't help with that.", "[1, 2]", recipe, "unused")
+
+    for _ in range(3):
+        graph._plan_variant(llm, fridge_input, "french", [], "Classic", timeout=5.0)
+    assert llm.calls == 3
+
+    # The parsed answer is served from the cache from now on.
+    option = graph._plan_variant(llm, fridge_input, "french", [], "Classic", timeout=5.0)
+    assert option.title == "Onion tart"
+    assert llm.calls == 3
+
+
+def test_disk_tiers_are_opt_in():
+    from app.config import Settings
+
+    assert Settings.model_fields["llm_cache_db_path"].default is None
+    assert Settings.model_fields["provider_cache_db_path"].default is None
@@ -0,0 +1,86 @@
+from app.graph import _critic_node, _to_response
+from app.models import RecipeOption
+from app.tools.local_corpus import LocalCorpus, LocalRecipe
+from app.tools.pantry_match import PantryMatcher, np
+
+
+def _recipe(recipe_id: str, title: str, names: tuple, time_minutes: int = 30) -> LocalRecipe:
+    return LocalRecipe(
+        id=recipe_id,
+        title=title,
+        cuisine="",
+        ingredients=names,
+        names=names,
+        steps=("Cook.",),
+        time_minutes=time_minutes,
+    )
+
+
+def _matchers(corpus: LocalCorpus) -> list:
+    # Both the NumPy and the pure-Python ranking paths.
+    vectorized = PantryMatcher(corpus)
+    plain = PantryMatcher(corpus)
+    plain._matrix = None
+    return [vectorized, plain] if np is not None else [plain]
+
+
+def test_staples_do_not_cover_longer_ingredient_names():
+    corpus = LocalCorpus(
+        [_recipe("1", "Chestnut stirfry", ("chicken", "onion", "water chestnut", "bell pepper", "sesame oil", "salt"))]
+    )
+    for matcher in _matchers(corpus):
+        [match] = matcher.match(["chicken", "onion"])
+        assert set(match.missing) == {"water chestnut", "bell pepper", "sesame oil"}
+        assert match.coverage == 3 / 6
+
+
+def test_exact_staples_are_assumed_on_hand():
+    corpus = LocalCorpus([_recipe("1", "Salted chicken", ("chicken", "salt", "black pepper", "olive oil"))])
+    for matcher in _matchers(corpus):
+        [match] = matcher.match(["chicken"])
+        assert match.missing == ()
+        assert match.coverage == 1.0
+
+
+def _option(title: str, time_minutes: int, missing: list, source: str = "local") -> RecipeOption:
+    return RecipeOption(
+        title=title,
+        cuisine="",
+        time_minutes=time_minutes,
+        difficulty="easy",
+        ingredients=[],
+        steps=[],
+        source=source,
+        missing_ingredients=missing,
+    )
+
+
+def test_critic_keeps_pantry_coverage_order():
+    best = _option("Full coverage", 45, [])
+    worst = _option("Bad match", 10, ["saffron", "lobster", "truffle"])
+    options = _critic_node({"recipe_options": [best, worst]})["recipe_options"]
+    assert [o.title for o in options] == ["Full coverage", "Bad match"]
+    assert _to_response(options).shopping_list == []
+
+
+def test_critic_sorts_unranked_options_by_time():
+    slow = _option("Slow", 45, [], source="generated")
+    quick = _option("Quick", 10, [], source="generated")
+    options = _critic_node({"recipe_options": [slow, quick]})["recipe_options"]
+    assert [o.title for o in options] == ["Quick", "Slow"]
+
+
+def test_index_preselects_recipes_sharing_a_pantry_ingredient():
+    corpus = LocalCorpus(
+        [
+            _recipe("1", "Onion soup", ("red onion", "stock")),
+            _recipe("2", "Fruit salad", ("apple", "pear")),
+            _recipe("3", "Stew", ("beef", "carrot", "onion")),
+        ]
+    )
+    assert corpus.candidates(["onions"]) == [0, 2]
+    assert corpus.candidates(["red onion"]) == [0]
+    assert corpus.candidates(["banana"]) == []
+    for matcher in _matchers(corpus):
+        assert [m.recipe.id for m in matcher.match(["onion", "carrot"])] == ["3", "1"]
+        assert matcher.match(["banana"]) == []
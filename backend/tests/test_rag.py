@@ -0,0 +1,80 @@
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from app import rag
+from app.rag import READY, UNAVAILABLE, RagRetriever
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 500.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FlakyChroma:
+    """
+    Stand-in for the `chromadb` module whose client fails to open the first `failures` times.
+    """
+
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.attempts = 0
+
+    def PersistentClient(self, path):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise RuntimeError("database is locked")
+        return SimpleNamespace(get_or_create_collection=lambda name: SimpleNamespace(name=name))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rag, "time", SimpleNamespace(monotonic=fake))
+    monkeypatch.setattr(rag.settings, "rag_load_retry_seconds", 30.0)
+    monkeypatch.setattr(rag.settings, "rag_load_retry_max_seconds", 100.0)
+    monkeypatch.setattr(rag.settings, "rag_retrieval_mode", "dense")
+    monkeypatch.setattr(rag, "build_embedding_backend", lambda model_name: SimpleNamespace(name="fake"))
+    return fake
+
+
+def _retriever(monkeypatch, failures: int) -> tuple:
+    chroma = FlakyChroma(failures)
+    monkeypatch.setitem(sys.modules, "chromadb", chroma)
+    return RagRetriever(".chroma-test", "recipes", "model"), chroma
+
+
+def test_failed_load_is_retried_after_the_backoff(monkeypatch, clock):
+    retriever, chroma = _retriever(monkeypatch, failures=1)
+
+    assert retriever.load() is False
+    assert retriever.state == UNAVAILABLE
+    assert retriever.status()["error"] == "RuntimeError: database is locked"
+
+    clock.now += 29
+    assert retriever.load() is False
+    assert chroma.attempts == 1
+    assert retriever.status()["retry_in_seconds"] == 1.0
+
+    clock.now += 1
+    assert retriever.load() is True
+    assert chroma.attempts == 2
+    assert retriever.state == READY
+    assert retriever.status()["error"] is None
+
+
+def test_backoff_doubles_up_to_the_max(monkeypatch, clock):
+    retriever, chroma = _retriever(monkeypatch, failures=10)
+    waits = []
+
+    for _ in range(4):
+        assert retriever.load() is False
+        waits.append(retriever.status()["retry_in_seconds"])
+        clock.now += waits[-1]
+
+    assert waits == [30.0, 60.0, 100.0, 100.0]
+    assert chroma.attempts == 4
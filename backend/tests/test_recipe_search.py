@@ -0,0 +1,57 @@
+import asyncio
+
+from app.models import FridgeInput
+from app.tools import recipe_search
+
+
+def _fake_mealdb(calls: list):
+    # TheMealDB matches ingredient names exactly; "Eggs" only answers to the plural.
+    meals = {"eggs": ["1", "2"], "tomato": ["2", "3"], "tomatoes": ["3"]}
+
+    def get(path, params, deadline=None):
+        calls.append((path, params["i"]))
+        if path == "filter.php":
+            return {"meals": [{"idMeal": meal_id} for meal_id in meals.get(params["i"], [])] or None}
+        return {"meals": [{"idMeal": params["i"], "strMeal": f"Meal {params['i']}", "strInstructions": "Cook."}]}
+
+    return get
+
+
+def _fridge(**kwargs) -> FridgeInput:
+    return FridgeInput(time_budget_minutes=30, cuisine_mood="any", **kwargs)
+
+
+def test_filter_terms_keep_the_users_spelling_and_the_normalized_form():
+    groups = recipe_search._mealdb_filter_ingredients(
+        _fridge(proteins=["Eggs"], main_vegetables=["tomatoes", "Tomato", "spinach"])
+    )
+
+    assert groups == [["eggs", "egg"], ["tomatoes", "tomato"], ["spinach"]]
+
+
+def test_search_queries_original_terms_and_counts_each_ingredient_once(monkeypatch):
+    calls: list = []
+    monkeypatch.setattr(recipe_search, "_mealdb_get", _fake_mealdb(calls))
+    monkeypatch.setattr(recipe_search.settings, "mealdb_top_k", 5)
+
+    options = recipe_search._mealdb_search(_fridge(proteins=["Eggs"], main_vegetables=["tomatoes"]))
+
+    assert ("filter.php", "eggs") in calls and ("filter.php", "tomatoes") in calls
+    # Meal 3 matches "tomatoes" and "tomato" but only uses one of the user's ingredients.
+    assert [o.title for o in options] == ["Meal 2", "Meal 1", "Meal 3"]
+    assert sorted(meal_id for path, meal_id in calls if path == "lookup.php") == ["1", "2", "3"]
+
+
+def test_async_search_matches_sync_ranking(monkeypatch):
+    calls: list = []
+    get = _fake_mealdb(calls)
+
+    async def aget(path, params, deadline=None):
+        return get(path, params, deadline)
+
+    monkeypatch.setattr(recipe_search, "_amealdb_get", aget)
+    monkeypatch.setattr(recipe_search.settings, "mealdb_top_k", 5)
+
+    options = asyncio.run(recipe_search._amealdb_search(_fridge(proteins=["Eggs"], main_vegetables=["tomatoes"])))
+
+    assert [o.title for o in options] == ["Meal 2", "Meal 1", "Meal 3"]
@@ -0,0 +1,171 @@
+import pytest
+
+from app.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture(autouse=True)
+def _breaker_settings(monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "breaker_enabled", True)
+    monkeypatch.setattr(settings, "adaptive_timeout_enabled", True)
+    monkeypatch.setattr(settings, "adaptive_timeout_multiplier", 2.0)
+    monkeypatch.setattr(settings, "adaptive_timeout_min_seconds", 0.5)
+    monkeypatch.setattr(settings, "adaptive_timeout_min_samples", 20)
+
+
+def _breaker(clock: FakeClock, **kwargs) -> CircuitBreaker:
+    options = dict(window_seconds=60.0, min_calls=3, failure_rate=0.5, open_seconds=30.0, half_open_probes=1)
+    options.update(kwargs)
+    return CircuitBreaker("test", clock=clock, **options)
+
+
+def _fail(breaker: CircuitBreaker) -> None:
+    with pytest.raises(ValueError):
+        with breaker.attempt():
+            raise ValueError("boom")
+
+
+def _open(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.min_calls):
+        _fail(breaker)
+    assert breaker.state == OPEN
+
+
+def test_opens_after_min_calls_failures_and_rejects():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+
+    _fail(breaker)
+    _fail(breaker)
+    assert breaker.state == CLOSED
+    _fail(breaker)
+    assert breaker.state == OPEN
+
+    with pytest.raises(CircuitOpenError):
+        with breaker.attempt():
+            pass
+    assert breaker.available() is False
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_failures_outside_the_window_do_not_count():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+
+    _fail(breaker)
+    _fail(breaker)
+    clock.advance(61)
+    _fail(breaker)
+
+    assert breaker.state == CLOSED
+
+
+def test_half_open_after_cooldown_allows_a_single_probe():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    _open(breaker)
+
+    clock.advance(29.9)
+    assert breaker.state == OPEN
+    clock.advance(0.1)
+    assert breaker.state == HALF_OPEN
+
+    assert breaker.allow() is True
+    assert breaker.available() is False
+    assert breaker.allow() is False
+
+
+def test_probe_success_closes_with_a_fresh_window():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    _open(breaker)
+    clock.advance(30)
+
+    with breaker.attempt():
+        pass
+
+    assert breaker.state == CLOSED
+    assert breaker.stats()["window_failures"] == 0
+    # The old failures are gone, so one new failure does not reopen it.
+    _fail(breaker)
+    assert breaker.state == CLOSED
+
+
+def test_probe_failure_reopens_for_another_cooldown():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    _open(breaker)
+    clock.advance(30)
+
+    _fail(breaker)
+
+    assert breaker.state == OPEN
+    assert breaker.stats()["opened"] == 2
+    clock.advance(29)
+    assert breaker.state == OPEN
+    clock.advance(1)
+    assert breaker.state == HALF_OPEN
+
+
+def test_cancelled_probe_is_released():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    _open(breaker)
+    clock.advance(30)
+
+    with pytest.raises(KeyboardInterrupt):
+        with breaker.attempt():
+            raise KeyboardInterrupt
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is True
+
+
+def _record_latencies(breaker: CircuitBreaker, latency: float, count: int = 20) -> None:
+    for _ in range(count):
+        breaker.record(True, latency)
+
+
+def test_timeout_is_cap_until_enough_samples():
+    breaker = _breaker(FakeClock())
+    _record_latencies(breaker, 0.1, count=19)
+
+    assert breaker.timeout(5.0) == 5.0
+
+
+def test_timeout_follows_p99_with_headroom():
+    breaker = _breaker(FakeClock())
+    _record_latencies(breaker, 1.0)
+
+    assert breaker.timeout(5.0) == pytest.approx(2.0)
+
+
+def test_timeout_is_clamped_to_cap_and_floor():
+    slow = _breaker(FakeClock())
+    _record_latencies(slow, 4.0)
+    assert slow.timeout(5.0) == 5.0
+
+    fast = _breaker(FakeClock())
+    _record_latencies(fast, 0.01)
+    assert fast.timeout(5.0) == 0.5
+
+
+def test_timeout_ignores_failed_calls():
+    breaker = _breaker(FakeClock(), min_calls=100)
+    _record_latencies(breaker, 1.0)
+    for _ in range(20):
+        breaker.record(False, 30.0)
+
+    assert breaker.timeout(5.0) == pytest.approx(2.0)
@@ -0,0 +1,133 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import cache as cache_module
+from app import main
+from app.cache import build_cache
+from app.models import FridgeInput, RecipeOption, RecipeResponse
+from app.sessions import OptionSessionStore
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=fake, time=fake))
+    return fake
+
+
+def _options(*titles: str) -> list:
+    return [
+        RecipeOption(title=title, cuisine="any", time_minutes=20, difficulty="easy", ingredients=["egg"], steps=["Cook."])
+        for title in titles
+    ]
+
+
+def _store(max_entries: int = 8, ttl_seconds: float = 60.0, db_path=None) -> OptionSessionStore:
+    return OptionSessionStore(build_cache(max_entries=max_entries, ttl_seconds=ttl_seconds, db_path=db_path, table="option_sessions"))
+
+
+def test_session_round_trip_selects_by_index_or_title():
+    store = _store()
+    token = store.create(_options("Shakshuka", "Fried rice"))
+
+    session = store.get(token)
+
+    assert session.token == token
+    assert session.select("1").title == "Fried rice"
+    assert session.select("  SHAKSHUKA ").title == "Shakshuka"
+    assert session.select("5") is None
+    assert session.select("Pancakes") is None
+    assert store.get(None) is None
+    assert store.get("unknown") is None
+
+
+def test_sessions_expire_after_the_ttl(clock):
+    store = _store(ttl_seconds=60.0)
+    token = store.create(_options("Shakshuka"))
+
+    clock.now += 59
+    assert store.get(token) is not None
+    clock.now += 1
+    assert store.get(token) is None
+
+
+def test_least_recently_used_session_is_evicted():
+    store = _store(max_entries=2)
+    first = store.create(_options("One"))
+    second = store.create(_options("Two"))
+    store.get(first)
+
+    third = store.create(_options("Three"))
+
+    assert store.get(second) is None
+    assert store.get(first) is not None and store.get(third) is not None
+    assert store.stats()["memory"]["evictions"] == 1
+
+
+def test_sessions_persist_to_disk_until_they_expire(tmp_path, clock):
+    db_path = str(tmp_path / "sessions.sqlite3")
+    token = _store(db_path=db_path, ttl_seconds=60.0).create(_options("Shakshuka"))
+
+    # A fresh store (e.g. after a restart) reads the session back from SQLite.
+    assert _store(db_path=db_path).get(token).options[0].title == "Shakshuka"
+    clock.now += 61
+    assert _store(db_path=db_path).get(token) is None
+
+
+@pytest.fixture
+def api(monkeypatch):
+    calls: list = []
+    options = {"value": _options("Shakshuka", "Fried rice")}
+
+    async def cached_recipe_options(fridge_input, http_response, deadline):
+        calls.append(fridge_input)
+        return RecipeResponse(options=options["value"])
+
+    monkeypatch.setattr(main, "option_sessions", _store())
+    monkeypatch.setattr(main, "_cached_recipe_options", cached_recipe_options)
+    return SimpleNamespace(client=TestClient(main.app), calls=calls, options=options)
+
+
+def _choose(api, option_id: str, token) -> object:
+    body = {"option_id": option_id, "fridge_input": FridgeInput(proteins=["egg"]).model_dump(), "options_token": token}
+    return api.client.post("/api/recipes/choose", json=body)
+
+
+def test_choose_with_a_known_token_does_not_rerun_the_graph(api):
+    token = main.option_sessions.create(_options("Pancakes", "Omelette"))
+
+    response = _choose(api, "omelette", token)
+
+    assert response.status_code == 200
+    assert response.json()["selected"]["title"] == "Omelette"
+    assert response.json()["options_token"] == token
+    assert api.calls == []
+
+
+@pytest.mark.parametrize("token", ["expired-or-unknown", None])
+def test_choose_with_an_unknown_token_rebuilds_the_options(api, token):
+    response = _choose(api, "1", token)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["selected"]["title"] == "Fried rice"
+    assert len(api.calls) == 1
+    # The rebuilt list gets a fresh token that resolves on the next choice.
+    assert body["options_token"] not in (None, token)
+    assert main.option_sessions.get(body["options_token"]).select("0").title == "Shakshuka"
+
+
+def test_choose_with_an_unknown_token_and_no_options_is_404(api):
+    api.options["value"] = []
+
+    assert _choose(api, "0", "unknown").status_code == 404
@@ -0,0 +1,165 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.singleflight import SingleFlight
+
+
+def _wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for followers"
+        time.sleep(0.001)
+
+
+def _run_concurrently(flight: SingleFlight, key: str, fn, callers: int = 5) -> list:
+    outcomes: list = [None] * callers
+
+    def call(index: int) -> None:
+        try:
+            outcomes[index] = ("ok", flight.do(key, fn))
+        except Exception as exc:
+            outcomes[index] = ("error", exc)
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    runs = []
+
+    def work():
+        runs.append(1)
+        release.wait(2)
+        return {"value": 42}
+
+    threads, outcomes = _run_concurrently(flight, "k", work)
+    _wait_for(lambda: flight.stats()["shared"] == 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(runs) == 1
+    assert all(outcome == ("ok", {"value": 42}) for outcome in outcomes)
+    # Everyone gets the leader's object, not a copy.
+    assert len({id(result) for _, result in outcomes}) == 1
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "shared": 4}
+
+
+def test_leader_exception_reaches_every_follower():
+    flight = SingleFlight()
+    release = threading.Event()
+    error = ValueError("provider down")
+
+    def work():
+        release.wait(2)
+        raise error
+
+    threads, outcomes = _run_concurrently(flight, "k", work)
+    _wait_for(lambda: flight.stats()["shared"] == 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert all(outcome == ("error", error) for outcome in outcomes)
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_key_is_released_after_completion_and_failure():
+    flight = SingleFlight()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    assert flight.do("k", lambda: 1) == 1
+    assert flight.do("k", lambda: 2) == 2
+    with pytest.raises(RuntimeError):
+        flight.do("k", fail)
+    assert flight.do("k", lambda: 3) == 3
+
+    assert flight.stats() == {"in_flight": 0, "leaders": 4, "shared": 0}
+
+
+def test_different_keys_do_not_coalesce():
+    flight = SingleFlight()
+
+    assert [flight.do(key, lambda key=key: key) for key in ("a", "b")] == ["a", "b"]
+    assert flight.stats()["leaders"] == 2
+
+
+def test_async_callers_share_one_execution():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+        runs = []
+
+        async def work():
+            runs.append(1)
+            await release.wait()
+            return "result"
+
+        tasks = [asyncio.create_task(flight.do_async("k", work)) for _ in range(5)]
+        while flight.stats()["shared"] < 4:
+            await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert len(runs) == 1
+        assert results == ["result"] * 5
+        assert flight.stats() == {"in_flight": 0, "leaders": 1, "shared": 4}
+
+        # Released: the next call runs again.
+        assert await flight.do_async("k", work) == "result"
+        assert len(runs) == 2
+
+    asyncio.run(scenario())
+
+
+def test_async_leader_exception_reaches_every_follower():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            raise ValueError("provider down")
+
+        tasks = [asyncio.create_task(flight.do_async("k", work)) for _ in range(5)]
+        while flight.stats()["shared"] < 4:
+            await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert len({id(result) for result in results}) == 1
+        assert flight.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_sync_follower_shares_an_async_leader():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "shared"
+
+        leader = asyncio.create_task(flight.do_async("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.get_running_loop().run_in_executor(None, flight.do, "k", lambda: "own")
+        while flight.stats()["shared"] < 1:
+            await asyncio.sleep(0.001)
+        release.set()
+
+        assert await leader == "shared"
+        assert await follower == "shared"
+
+    asyncio.run(scenario())